@@ -4,6 +4,8 @@ Stock Data - 中国A股行情数据准备工具
 Python代码模块，用于处理股票数据获取、清洗和存储。
 """
 
+import importlib
+
 __version__ = "0.1.0"
 
 # 向后兼容：导出常用模块
@@ -15,20 +17,34 @@ from .core.cache_manager import (
     get_cache_stats
 )
 
-# 导出客户端
-from .clients.akshare_client import AKShareClient
-from .clients.tushare_client import TushareClient, get_tushare_client
-
-# 导出服务
-from .services.limit_service import LimitService
-from .services.stock_service import StockService
-from .services.industry_service import IndustryService
-from .services.shareholder_service import ShareholderService
-from .services.market_value_service import MarketValueService
-from .services.financial_service import FinancialService
-from .services.trading_calendar_service import TradingCalendarService
-from .services.akshare_daily_service import DailyQuoteService
-from .services.tushare_daily_service import TushareDailyService
+# 客户端和服务按需导入（PEP 562），避免仅使用 db_manager 的脚本加载 akshare/tushare/pandas
+_LAZY_IMPORTS = {
+    # 客户端
+    'AKShareClient': ('.clients.akshare_client', 'AKShareClient'),
+    'TushareClient': ('.clients.tushare_client', 'TushareClient'),
+    'get_tushare_client': ('.clients.tushare_client', 'get_tushare_client'),
+    # 服务
+    'LimitService': ('.services.limit_service', 'LimitService'),
+    'StockService': ('.services.stock_service', 'StockService'),
+    'IndustryService': ('.services.industry_service', 'IndustryService'),
+    'ShareholderService': ('.services.shareholder_service', 'ShareholderService'),
+    'MarketValueService': ('.services.market_value_service', 'MarketValueService'),
+    'FinancialService': ('.services.financial_service', 'FinancialService'),
+    'TradingCalendarService': ('.services.trading_calendar_service', 'TradingCalendarService'),
+    'DailyQuoteService': ('.services.akshare_daily_service', 'DailyQuoteService'),
+    'TushareDailyService': ('.services.tushare_daily_service', 'TushareDailyService'),
+}
+
+
+def __getattr__(name):
+    """首次访问时导入客户端/服务类，并缓存到模块命名空间"""
+    if name in _LAZY_IMPORTS:
+        module_name, attr = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     # 版本
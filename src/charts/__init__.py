@@ -5,9 +5,18 @@
 数据源使用 Supabase 数据库。
 """
 
-from .stock_chart import StockChartGenerator
 from .indicators import calculate_indicators
 
+# StockChartGenerator 依赖 matplotlib / mplfinance，导入开销较大；
+# 按需导入（PEP 562），只使用指标计算（如选股条件）时不加载绘图库
+def __getattr__(name):
+    """按需导入 StockChartGenerator"""
+    if name == "StockChartGenerator":
+        from .stock_chart import StockChartGenerator
+        return StockChartGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # 数据获取功能已迁移到 services/fetch_data_service.py
 # 如需使用，请从 src.services.fetch_data_service 导入 fetch_data_service
 
@@ -0,0 +1,171 @@
+"""
+MACD/BOLL 指标的 numba 计算内核
+
+在一次调用中基于收盘价数组计算 EMA12/EMA26/DIF/DEA/MACD 以及 BOLL 上中下轨，
+计算口径与 talib.EMA / talib.BBANDS(matype=0) 保持一致：
+- EMA 以前 N 个有效值的简单平均作为种子，之前的位置为 NaN，并跳过开头的 NaN
+- BOLL 中轨为 N 日简单平均，标准差为总体标准差（除以 N）
+
+另提供绘图用的两个小内核：split_macd 一次遍历拆出 MACD 柱的正负两部分，
+any_valid 遇到第一个非 NaN 值即返回（替代 Series.notna().any() 的整列扫描）。
+
+numba 为可选依赖，未安装时 NUMBA_AVAILABLE 为 False：compute_indicators 由调用方
+回退到 talib 实现，split_macd / any_valid 自动使用等价的 numpy 实现。
+各内核声明了显式签名，导入本模块时即完成编译（cache=True 时编译结果
+写入 __pycache__，之后的进程直接加载），首次绘图不再承担 JIT 编译延迟。
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba 未安装时的占位装饰器，原样返回函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _ema(values, period):
+    """
+    计算 EMA（与 talib.EMA 口径一致）
+
+    Args:
+        values: float64 数组
+        period: 周期
+
+    Returns:
+        EMA 数组，种子之前为 NaN
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+
+    # 跳过开头的 NaN（如 DIF 在慢线种子之前的部分）
+    start = 0
+    while start < n and np.isnan(values[start]):
+        start += 1
+    if n - start < period:
+        return out
+
+    total = 0.0
+    for i in range(start, start + period):
+        total += values[i]
+    prev = total / period
+    out[start + period - 1] = prev
+
+    k = 2.0 / (period + 1)
+    for i in range(start + period, n):
+        prev = (values[i] - prev) * k + prev
+        out[i] = prev
+    return out
+
+
+# compute_indicators 的签名：返回 8 个 float64 数组。close 声明为只读数组，
+# 可写数组也能匹配；pandas 写时复制模式下 Series.to_numpy() 返回的正是只读视图
+_KERNEL_SIGNATURES = [
+    "UniTuple(float64[:], 8)(Array(float64, 1, 'A', readonly=True), int64, int64, int64, int64, float64)",
+]
+
+
+@njit(_KERNEL_SIGNATURES, cache=True)
+def compute_indicators(close, fast, slow, signal, boll_period, boll_dev):
+    """
+    一次性计算 MACD 与 BOLL 指标
+
+    Args:
+        close: 收盘价 float64 数组
+        fast: MACD 快线周期
+        slow: MACD 慢线周期
+        signal: MACD 信号线周期
+        boll_period: BOLL 周期
+        boll_dev: BOLL 标准差倍数
+
+    Returns:
+        (EMA12, EMA26, DIF, DEA, MACD, BOLL_UPPER, BOLL_MIDDLE, BOLL_LOWER) 数组元组
+    """
+    n = close.shape[0]
+
+    ema_fast = _ema(close, fast)
+    ema_slow = _ema(close, slow)
+    dif = ema_fast - ema_slow
+    dea = _ema(dif, signal)
+    macd = 2.0 * (dif - dea)
+
+    # BOLL：滚动维护窗口内的和与平方和
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    if n >= boll_period:
+        total = 0.0
+        total_sq = 0.0
+        for i in range(n):
+            x = close[i]
+            total += x
+            total_sq += x * x
+            if i >= boll_period:
+                old = close[i - boll_period]
+                total -= old
+                total_sq -= old * old
+            if i >= boll_period - 1:
+                mean = total / boll_period
+                var = total_sq / boll_period - mean * mean
+                std = np.sqrt(var) if var > 0.0 else 0.0
+                middle[i] = mean
+                upper[i] = mean + boll_dev * std
+                lower[i] = mean - boll_dev * std
+
+    return ema_fast, ema_slow, dif, dea, macd, upper, middle, lower
+
+
+@njit(["UniTuple(float64[:], 2)(Array(float64, 1, 'A', readonly=True))"], cache=True)
+def _split_macd_nb(macd):
+    """split_macd 的 numba 实现"""
+    n = macd.shape[0]
+    positive = np.empty(n)
+    negative = np.empty(n)
+    for i in range(n):
+        v = macd[i]
+        if v > 0.0:
+            positive[i] = v
+            negative[i] = 0.0
+        elif v < 0.0:
+            positive[i] = 0.0
+            negative[i] = v
+        else:
+            # 0 与 NaN 原样保留在两部分中（与 np.clip 一致）
+            positive[i] = v
+            negative[i] = v
+    return positive, negative
+
+
+@njit(["boolean(Array(float64, 1, 'A', readonly=True))"], cache=True)
+def _any_valid_nb(values):
+    """any_valid 的 numba 实现"""
+    for i in range(values.shape[0]):
+        if not np.isnan(values[i]):
+            return True
+    return False
+
+
+def _split_macd_np(macd):
+    """split_macd 的 numpy 实现"""
+    return np.clip(macd, 0, None), np.clip(macd, None, 0)
+
+
+def _any_valid_np(values):
+    """any_valid 的 numpy 实现"""
+    return bool((~np.isnan(values)).any())
+
+
+# split_macd(macd) -> (正值部分, 负值部分)：另一侧置为 0，NaN 保持不变
+# any_valid(values) -> bool：数组中至少有一个非 NaN 值时为 True
+if NUMBA_AVAILABLE:
+    split_macd = _split_macd_nb
+    any_valid = _any_valid_nb
+else:
+    split_macd = _split_macd_np
+    any_valid = _any_valid_np
@@ -3,10 +3,15 @@
 
 提供MACD和BOLL等技术指标的计算功能。
 """
-from typing import Literal
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Literal, Optional, Tuple
+import numpy as np
 import pandas as pd
 import talib
 
+from ._indicators_nb import NUMBA_AVAILABLE, compute_indicators
+
 # 周期类型定义
 PeriodType = Literal["D", "W", "M", "Q", "Y"]
 PERIOD_NAMES = {
@@ -17,57 +22,60 @@ PERIOD_NAMES = {
     "Y": "年线",
 }
 
+# 指标输出列
+MACD_COLUMNS = ("EMA12", "EMA26", "DIF", "DEA", "MACD")
+BOLL_COLUMNS = ("BOLL_UPPER", "BOLL_MIDDLE", "BOLL_LOWER")
+
 # BOLL参数（日线默认值）
 BOLL_DEV = 2.0  # 布林带标准差倍数
 
-# 不同周期的参数配置
-PERIOD_PARAMS = {
-    "D": {
+# 不同周期的参数配置（只读映射；解析后的参数按 (周期, 数据点数量) 缓存，修改需重启进程）
+PERIOD_PARAMS = MappingProxyType({
+    "D": MappingProxyType({
         "macd_fast": 12,
         "macd_slow": 26,
         "macd_signal": 9,
         "boll_period": 20,
-    },
-    "W": {
+    }),
+    "W": MappingProxyType({
         "macd_fast": 12,  # 周线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_slow": 26,  # 周线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_signal": 9,  # 周线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "boll_period": 20,  # 周线：使用标准BOLL参数(20,2.0)，与同花顺保持一致
-    },
-    "M": {
+    }),
+    "M": MappingProxyType({
         "macd_fast": 12,  # 月线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_slow": 26,  # 月线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_signal": 9,  # 月线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "boll_period": 20,  # 月线：使用标准BOLL参数(20,2.0)，与同花顺保持一致
-    },
-    "Q": {
+    }),
+    "Q": MappingProxyType({
         "macd_fast": 12,  # 季线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_slow": 26,  # 季线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_signal": 9,  # 季线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "boll_period": 20,  # 季线：使用标准BOLL参数(20,2.0)，与同花顺保持一致
-    },
-    "Y": {
+    }),
+    "Y": MappingProxyType({
         "macd_fast": 12,  # 年线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_slow": 26,  # 年线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "macd_signal": 9,  # 年线：使用标准MACD参数(12,26,9)，与同花顺保持一致
         "boll_period": 20,  # 年线：使用标准BOLL参数(20,2.0)，与同花顺保持一致
-    },
-}
+    }),
+})
 
 
-def calculate_macd(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
+@lru_cache(maxsize=64)
+def _macd_params(period: PeriodType, n: int) -> Tuple[int, Optional[Tuple[int, int, int]]]:
     """
-    计算MACD指标（根据周期动态调整参数）
+    按 (周期, 数据点数量) 计算并缓存MACD参数（纯计算，不输出提示）
 
     Args:
-        df: 包含close列的DataFrame
         period: 周期类型，用于选择参数
+        n: 数据点数量
 
     Returns:
-        DataFrame: 添加了MACD相关列的DataFrame
+        (所需最少数据点数, (fast, slow, signal) 参数元组)，数据点太少无法计算时参数元组为 None
     """
-    df = df.copy()
-
     # 根据周期获取参数
     params = PERIOD_PARAMS.get(period, PERIOD_PARAMS["D"])
     fast_period = params["macd_fast"]
@@ -76,95 +84,181 @@ def calculate_macd(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
 
     # 检查数据点数量是否足够计算指标
     min_periods = max(slow_period, signal_period)
-    if len(df) < min_periods:
-        print(
-            f"警告: 数据点数量({len(df)})不足以计算MACD指标(需要至少{min_periods}个数据点，当前周期: {PERIOD_NAMES.get(period, period)})"
-        )
+    if n < min_periods:
         # 如果数据点不足，尝试使用更小的参数
-        if len(df) >= 3:
+        if n >= 3:
             # 至少需要3个数据点才能计算
-            fast_period = min(fast_period, len(df) - 1)
-            slow_period = min(slow_period, len(df))
-            signal_period = min(signal_period, len(df) - 1)
-            print(
-                f"  调整参数: fast={fast_period}, slow={slow_period}, signal={signal_period}"
-            )
+            fast_period = min(fast_period, n - 1)
+            slow_period = min(slow_period, n)
+            signal_period = min(signal_period, n - 1)
         else:
             # 数据点太少，无法计算
-            df["EMA12"] = pd.NA
-            df["EMA26"] = pd.NA
-            df["DIF"] = pd.NA
-            df["DEA"] = pd.NA
-            df["MACD"] = pd.NA
-            return df
+            return min_periods, None
 
     # 确保参数不超过数据长度，且至少为2（talib要求）
-    fast_period = max(2, min(fast_period, len(df)))
-    slow_period = max(2, min(slow_period, len(df)))
-    signal_period = max(2, min(signal_period, len(df)))
+    fast_period = max(2, min(fast_period, n))
+    slow_period = max(2, min(slow_period, n))
+    signal_period = max(2, min(signal_period, n))
 
     # 确保slow_period > fast_period
     if slow_period <= fast_period:
-        slow_period = min(fast_period + 1, len(df))
+        slow_period = min(fast_period + 1, n)
 
-    df["EMA12"] = talib.EMA(df["close"], timeperiod=fast_period)
-    df["EMA26"] = talib.EMA(df["close"], timeperiod=slow_period)
-    df["DIF"] = df["EMA12"] - df["EMA26"]
-    df["DEA"] = talib.EMA(df["DIF"], timeperiod=signal_period)
-    df["MACD"] = 2 * (df["DIF"] - df["DEA"])
-    return df
+    return min_periods, (fast_period, slow_period, signal_period)
 
 
-def calculate_boll(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
+def _resolve_macd_periods(n: int, period: PeriodType) -> Optional[Tuple[int, int, int]]:
     """
-    计算BOLL指标（布林带）（根据周期动态调整参数）
+    根据周期和数据点数量确定MACD参数，数据点不足时输出提示
 
     Args:
-        df: 包含close列的DataFrame
+        n: 数据点数量
         period: 周期类型，用于选择参数
 
     Returns:
-        DataFrame: 添加了BOLL相关列的DataFrame
+        (fast, slow, signal) 参数元组，数据点太少无法计算时返回 None
     """
-    df = df.copy()
+    min_periods, periods = _macd_params(period, n)
+    if n < min_periods:
+        print(
+            f"警告: 数据点数量({n})不足以计算MACD指标(需要至少{min_periods}个数据点，当前周期: {PERIOD_NAMES.get(period, period)})"
+        )
+        if periods is not None:
+            fast_period, slow_period, signal_period = periods
+            print(
+                f"  调整参数: fast={fast_period}, slow={slow_period}, signal={signal_period}"
+            )
+    return periods
+
 
+@lru_cache(maxsize=64)
+def _boll_params(period: PeriodType, n: int) -> Tuple[int, Optional[int]]:
+    """
+    按 (周期, 数据点数量) 计算并缓存BOLL参数（纯计算，不输出提示）
+
+    Args:
+        period: 周期类型，用于选择参数
+        n: 数据点数量
+
+    Returns:
+        (所需最少数据点数, BOLL周期)，数据点太少无法计算时BOLL周期为 None
+    """
     # 根据周期获取参数
-    params = PERIOD_PARAMS.get(period, PERIOD_PARAMS["D"])
-    boll_period = params["boll_period"]
+    boll_period = PERIOD_PARAMS.get(period, PERIOD_PARAMS["D"])["boll_period"]
 
-    # 检查数据点数量是否足够计算指标
-    if len(df) < boll_period:
+    # 数据点不足3个时无法计算；不足一个周期时退化为使用全部数据点
+    if n < boll_period and n < 3:
+        return boll_period, None
+
+    # 确保参数不超过数据长度，且至少为2（talib要求）
+    return boll_period, max(2, min(boll_period, n))
+
+
+def _resolve_boll_period(n: int, period: PeriodType) -> Optional[int]:
+    """
+    根据周期和数据点数量确定BOLL参数，数据点不足时输出提示
+
+    Args:
+        n: 数据点数量
+        period: 周期类型，用于选择参数
+
+    Returns:
+        BOLL周期，数据点太少无法计算时返回 None
+    """
+    required, boll_period = _boll_params(period, n)
+    if n < required:
         print(
-            f"警告: 数据点数量({len(df)})不足以计算BOLL指标(需要至少{boll_period}个数据点，当前周期: {PERIOD_NAMES.get(period, period)})"
+            f"警告: 数据点数量({n})不足以计算BOLL指标(需要至少{required}个数据点，当前周期: {PERIOD_NAMES.get(period, period)})"
         )
-        # 如果数据点不足，尝试使用更小的参数
-        if len(df) >= 3:
-            boll_period = min(boll_period, len(df))
+        if boll_period is not None:
             print(f"  调整参数: boll_period={boll_period}")
-        else:
-            # 数据点太少，无法计算
-            df["BOLL_UPPER"] = pd.NA
-            df["BOLL_MIDDLE"] = pd.NA
-            df["BOLL_LOWER"] = pd.NA
-            return df
+    return boll_period
 
-    # 确保参数不超过数据长度，且至少为2（talib要求）
-    boll_period = max(2, min(boll_period, len(df)))
 
-    df["BOLL_UPPER"], df["BOLL_MIDDLE"], df["BOLL_LOWER"] = talib.BBANDS(
-        df["close"],
+def _macd_columns(close: np.ndarray, periods: Optional[Tuple[int, int, int]]) -> Dict[str, object]:
+    """
+    基于talib计算MACD指标列
+
+    Args:
+        close: 收盘价 float64 数组
+        periods: (fast, slow, signal) 参数元组，None 表示数据点太少无法计算
+
+    Returns:
+        列名到数组（无法计算时为 pd.NA）的字典
+    """
+    if periods is None:
+        return dict.fromkeys(MACD_COLUMNS, pd.NA)
+    fast_period, slow_period, signal_period = periods
+
+    ema_fast = talib.EMA(close, timeperiod=fast_period)
+    ema_slow = talib.EMA(close, timeperiod=slow_period)
+    dif = ema_fast - ema_slow
+    dea = talib.EMA(dif, timeperiod=signal_period)
+    return dict(zip(MACD_COLUMNS, (ema_fast, ema_slow, dif, dea, 2 * (dif - dea))))
+
+
+def _boll_columns(close: np.ndarray, boll_period: Optional[int]) -> Dict[str, object]:
+    """
+    基于talib计算BOLL指标列
+
+    Args:
+        close: 收盘价 float64 数组
+        boll_period: BOLL周期，None 表示数据点太少无法计算
+
+    Returns:
+        列名到数组（无法计算时为 pd.NA）的字典
+    """
+    if boll_period is None:
+        return dict.fromkeys(BOLL_COLUMNS, pd.NA)
+
+    bands = talib.BBANDS(
+        close,
         timeperiod=boll_period,
         nbdevup=BOLL_DEV,
         nbdevdn=BOLL_DEV,
         matype=0,
     )
-    return df
+    return dict(zip(BOLL_COLUMNS, bands))
+
+
+def calculate_macd(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
+    """
+    计算MACD指标（根据周期动态调整参数）
+
+    Args:
+        df: 包含close列的DataFrame
+        period: 周期类型，用于选择参数
+
+    Returns:
+        DataFrame: 添加了MACD相关列的DataFrame
+    """
+    periods = _resolve_macd_periods(len(df), period)
+    return df.assign(**_macd_columns(df["close"].to_numpy(np.float64), periods))
+
+
+def calculate_boll(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
+    """
+    计算BOLL指标（布林带）（根据周期动态调整参数）
+
+    Args:
+        df: 包含close列的DataFrame
+        period: 周期类型，用于选择参数
+
+    Returns:
+        DataFrame: 添加了BOLL相关列的DataFrame
+    """
+    boll_period = _resolve_boll_period(len(df), period)
+    return df.assign(**_boll_columns(df["close"].to_numpy(np.float64), boll_period))
 
 
 def calculate_indicators(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataFrame:
     """
     计算所有技术指标（根据周期动态调整参数）
 
+    先把全部指标列算成数组，再通过一次 df.assign 挂到结果上，只产生一个新DataFrame。
+    安装了 numba 时由 _indicators_nb.compute_indicators 一次遍历收盘价算出全部指标列，
+    否则逐个调用 talib 计算。
+
     Args:
         df: 包含OHLCV数据的DataFrame
         period: 周期类型，用于选择参数
@@ -172,6 +266,18 @@ def calculate_indicators(df: pd.DataFrame, period: PeriodType = "D") -> pd.DataF
     Returns:
         DataFrame: 添加了所有指标列的DataFrame
     """
-    df = calculate_macd(df, period)
-    df = calculate_boll(df, period)
-    return df
+    close = df["close"].to_numpy(np.float64)
+    macd_periods = _resolve_macd_periods(len(df), period)
+    boll_period = _resolve_boll_period(len(df), period)
+
+    if NUMBA_AVAILABLE and macd_periods is not None and boll_period is not None:
+        fast_period, slow_period, signal_period = macd_periods
+        values = compute_indicators(
+            close, fast_period, slow_period, signal_period, boll_period, BOLL_DEV
+        )
+        columns = dict(zip(MACD_COLUMNS + BOLL_COLUMNS, values))
+    else:
+        columns = _macd_columns(close, macd_periods)
+        columns.update(_boll_columns(close, boll_period))
+
+    return df.assign(**columns)
@@ -5,23 +5,23 @@
 """
 
 import os
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Literal, Optional, Tuple
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple
 
 # 支持的图片格式
 ImageFormat = Literal["png", "svg"]
 
-# 添加项目路径以便导入模块
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
-
 import matplotlib.dates as mdates
 import matplotlib.font_manager as fm
 import matplotlib.pyplot as plt
 import mplfinance as mpf
+import numpy as np
 import pandas as pd
 
 from ..services.fetch_data_service import fetch_data_service
+from ._indicators_nb import any_valid, split_macd
 from .indicators import (
     PeriodType,
     PERIOD_NAMES,
@@ -34,6 +34,153 @@ DEFAULT_DPI = 150  # 默认图片分辨率
 DEFAULT_FIGSIZE = (20, 12)  # 默认图表尺寸（增加高度以便MACD更清晰）
 DEFAULT_PERIOD = "D"  # 默认周期（日线）
 DEFAULT_FORMAT: ImageFormat = "svg"  # 默认图片格式
+SVG_MAX_BARS = 2000  # SVG 最多绘制的K线数量，超过时自动改用PNG（SVG 每根K线一个路径元素，文件与渲染开销随数量线性增长）
+PNG_COMPRESS_LEVEL = 1  # PNG 压缩级别（0-9），保存耗时主要在压缩，取低级别换取更快的保存速度
+CHINESE_FONT_NAMES = ("Arial Unicode MS", "STHeiti", "Heiti TC")  # 候选中文字体（按优先级）
+# 面板高度比例（mplfinance要求panel_ratios长度等于面板数量）
+MACD_PANEL_RATIOS = (3, 1, 2)  # K线图, 成交量, MACD（让MACD面板有更多空间）
+BASIC_PANEL_RATIOS = (3, 1)  # K线图, 成交量
+
+
+# ==================== 进程级缓存 ====================
+# 字体列表与mplfinance样式只取决于已安装的字体，每个进程只计算一次，
+# 批量生成图表时不必在每次创建 StockChartGenerator 时重复扫描
+
+@lru_cache(maxsize=1)
+def _chinese_font_prop() -> Optional[fm.FontProperties]:
+    """
+    查找可用的中文字体（结果按进程缓存）
+
+    Returns:
+        FontProperties: 中文字体属性对象，如果找不到则返回None
+    """
+    # 按字体名称查找，由matplotlib的字体缓存完成匹配，不逐个遍历已安装字体
+    for name in CHINESE_FONT_NAMES:
+        try:
+            font_path = fm.findfont(fm.FontProperties(family=name), fallback_to_default=False)
+        except ValueError:
+            continue
+        return fm.FontProperties(fname=font_path)
+    return None
+
+
+@lru_cache(maxsize=8)
+def _custom_mpf_style(sans_serif: Tuple[str, ...]):
+    """
+    创建支持中文的自定义mplfinance样式（按字体列表缓存）
+
+    Args:
+        sans_serif: font.sans-serif 字体列表
+
+    Returns:
+        样式对象，创建失败时返回默认样式名 "charles"
+    """
+    try:
+        return mpf.make_mpf_style(
+            base_mpf_style="charles",
+            marketcolors=mpf.make_marketcolors(
+                up="red",
+                down="green",
+                edge="inherit",
+                wick="inherit",
+                volume="inherit",
+            ),
+            gridstyle=":",
+            y_on_right=False,
+            facecolor="white",
+            edgecolor="black",
+            figcolor="white",
+            gridcolor="lightgray",
+            rc={
+                "font.family": "sans-serif",
+                "font.sans-serif": list(sans_serif),
+                "axes.unicode_minus": False,
+            },
+        )
+    except Exception as e:
+        print(f"创建自定义样式失败，使用默认样式: {e}")
+        return "charles"
+
+
+def _float_values(values) -> np.ndarray:
+    """
+    将Series/DataFrame转换为float64数组
+
+    指标数据不足无法计算时整列为 pd.NA（object 类型），转换时按 NaN 处理
+
+    Args:
+        values: Series 或 DataFrame
+
+    Returns:
+        np.ndarray: float64数组
+    """
+    return values.to_numpy(np.float64, na_value=np.nan)
+
+
+def _ohlcv_agg_map(columns) -> dict:
+    """
+    合并K线时各列的聚合方式
+
+    open取第一个值，high取最大值，low取最小值，close取最后一个值，volume求和；
+    其他列（如openinterest）也保留，取最后一个值
+
+    Args:
+        columns: 数据框的列
+
+    Returns:
+        dict: 列名到聚合方式的映射
+    """
+    agg_map = {
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum",
+    }
+    agg_map.update({col: "last" for col in columns if col not in agg_map})
+    return agg_map
+
+
+# ==================== 多进程批量生成 ====================
+# 每个工作进程持有一个图表生成器，字体查找、样式创建只在进程启动时做一次
+
+_worker_generator = None
+
+
+def _init_chart_worker(
+    chart_dir: str, dpi: int, figsize: Tuple[int, int], image_format: ImageFormat
+) -> None:
+    """
+    进程池工作进程初始化：切换到非交互后端并创建图表生成器
+
+    Args:
+        chart_dir: 图表保存目录
+        dpi: 图片分辨率
+        figsize: 图表尺寸
+        image_format: 默认图片格式
+    """
+    global _worker_generator
+    plt.switch_backend("Agg")
+    _worker_generator = StockChartGenerator(
+        chart_dir=chart_dir, dpi=dpi, figsize=figsize, image_format=image_format
+    )
+
+
+def _render_chart(request: dict) -> Optional[str]:
+    """
+    在工作进程中生成一张图表
+
+    Args:
+        request: generate() 的关键字参数字典
+
+    Returns:
+        保存的图表文件路径，失败时返回None
+    """
+    try:
+        return _worker_generator.generate(**request)
+    except Exception as e:
+        print(f"生成{request.get('stock_code')}的图表失败: {e}")
+        return None
 
 
 class StockChartGenerator:
@@ -53,7 +200,8 @@ class StockChartGenerator:
             chart_dir: 图表保存目录，如果为None则使用默认目录
             dpi: 图片分辨率（仅对PNG格式有效，SVG为矢量格式不需要DPI）
             figsize: 图表尺寸
-            image_format: 图片格式，可选 'png' 或 'svg'（默认: 'png'）
+            image_format: 图片格式，可选 'png' 或 'svg'（默认: 'svg'，
+                          K线数量超过 SVG_MAX_BARS 时自动改用 'png'）
         """
         self.chart_dir = chart_dir or os.path.join(
             os.path.dirname(__file__), "..", "..", DEFAULT_CHART_DIR
@@ -76,20 +224,10 @@ class StockChartGenerator:
         Returns:
             FontProperties: 中文字体属性对象，如果找不到则返回None
         """
-        chinese_font_path = None
-
-        # 查找可用的中文字体文件
-        for font in fm.fontManager.ttflist:
-            if "Arial Unicode" in font.name:
-                chinese_font_path = font.fname
-                break
-            elif "STHeiti" in font.name:
-                chinese_font_path = font.fname
-                break
+        chinese_font_prop = _chinese_font_prop()
 
         # 设置字体
-        if chinese_font_path:
-            chinese_font_prop = fm.FontProperties(fname=chinese_font_path)
+        if chinese_font_prop:
             plt.rcParams["font.family"] = "sans-serif"
             plt.rcParams["font.sans-serif"] = [
                 chinese_font_prop.get_name(),
@@ -99,7 +237,7 @@ class StockChartGenerator:
             return chinese_font_prop
         else:
             # 备用方案：使用字体名称
-            plt.rcParams["font.sans-serif"] = ["Arial Unicode MS", "STHeiti", "Heiti TC"]
+            plt.rcParams["font.sans-serif"] = list(CHINESE_FONT_NAMES)
             return None
 
     def _create_custom_style(self) -> str:
@@ -109,32 +247,7 @@ class StockChartGenerator:
         Returns:
             str: 样式名称或样式对象
         """
-        try:
-            custom_style = mpf.make_mpf_style(
-                base_mpf_style="charles",
-                marketcolors=mpf.make_marketcolors(
-                    up="red",
-                    down="green",
-                    edge="inherit",
-                    wick="inherit",
-                    volume="inherit",
-                ),
-                gridstyle=":",
-                y_on_right=False,
-                facecolor="white",
-                edgecolor="black",
-                figcolor="white",
-                gridcolor="lightgray",
-                rc={
-                    "font.family": "sans-serif",
-                    "font.sans-serif": plt.rcParams["font.sans-serif"],
-                    "axes.unicode_minus": False,
-                },
-            )
-            return custom_style
-        except Exception as e:
-            print(f"创建自定义样式失败，使用默认样式: {e}")
-            return "charles"
+        return _custom_mpf_style(tuple(plt.rcParams["font.sans-serif"]))
     
     def resample_data(self, df: pd.DataFrame, period: PeriodType) -> pd.DataFrame:
         """
@@ -145,7 +258,7 @@ class StockChartGenerator:
             period: 目标周期，可选值：'D'（日线）、'W'（周线）、'M'（月线）、'Q'（季线）、'Y'（年线）
 
         Returns:
-            DataFrame: 转换后的数据框
+            DataFrame: 转换后的数据框（日线直接返回传入的数据框，不复制）
         """
         if df is None or df.empty:
             return df
@@ -153,9 +266,9 @@ class StockChartGenerator:
         if not isinstance(df.index, pd.DatetimeIndex):
             raise ValueError("数据索引必须是 DatetimeIndex 类型")
 
-        # 如果是日线，直接返回
+        # 如果是日线，直接返回（下游的 calculate_indicators 通过 assign 生成新数据框，不会修改原数据）
         if period == "D":
-            return df.copy()
+            return df
 
         # 定义重采样规则（使用新的pandas规则以避免FutureWarning）
         resample_rules = {
@@ -172,30 +285,43 @@ class StockChartGenerator:
 
         rule = resample_rules[period]
 
-        # 重采样：使用OHLC规则
-        # open: 第一个值
-        # high: 最大值
-        # low: 最小值
-        # close: 最后一个值
-        # volume: 总和
-        resampled = pd.DataFrame()
-        resampled["open"] = df["open"].resample(rule).first()
-        resampled["high"] = df["high"].resample(rule).max()
-        resampled["low"] = df["low"].resample(rule).min()
-        resampled["close"] = df["close"].resample(rule).last()
-        resampled["volume"] = df["volume"].resample(rule).sum()
-
-        # 如果有其他列，也保留（如openinterest）
-        other_cols = [col for col in df.columns if col not in resampled.columns]
-        for col in other_cols:
-            if col in df.columns:
-                resampled[col] = df[col].resample(rule).last()
+        # 重采样：使用OHLC规则，一次 resample().agg 完成所有列的分箱与聚合
+        resampled = df.resample(rule).agg(_ohlcv_agg_map(df.columns))
 
         # 删除包含NaN的行
         resampled = resampled.dropna()
 
         return resampled
-    
+
+    def downsample_data(self, df: pd.DataFrame, max_bars: int) -> pd.DataFrame:
+        """
+        将K线数量压缩到不超过 max_bars：每 k 根相邻K线按OHLC规则合并为一根
+
+        与 resample_data 的聚合规则相同，只是按固定根数而不是日历周期分组，
+        合并后的K线以组内最后一个交易日为索引。
+
+        Args:
+            df: K线数据，索引为DatetimeIndex
+            max_bars: 最多保留的K线数量
+
+        Returns:
+            DataFrame: 合并后的数据框（数量未超过 max_bars 时直接返回原数据框）
+        """
+        bar_count = len(df)
+        if max_bars <= 0 or bar_count <= max_bars:
+            return df
+
+        bin_size = -(-bar_count // max_bars)  # 向上取整
+        downsampled = df.groupby(np.arange(bar_count) // bin_size).agg(
+            _ohlcv_agg_map(df.columns)
+        )
+        # 每组最后一根K线的位置（最后一组可能不满 bin_size 根）
+        last_positions = np.minimum(
+            np.arange(1, len(downsampled) + 1) * bin_size, bar_count
+        ) - 1
+        downsampled.index = df.index[last_positions]
+        return downsampled
+
     def _get_date_format_string(self, date_range_days: int) -> str:
         """
         根据数据跨度选择合适的日期格式字符串
@@ -224,35 +350,34 @@ class StockChartGenerator:
             plot_data: 绘图数据（包含日期索引）
             bottom_ax: 底部axes（用于设置日期标签）
         """
-        if not isinstance(plot_data.index, pd.DatetimeIndex):
+        dates = plot_data.index
+        if not isinstance(dates, pd.DatetimeIndex):
             return
 
+        n = len(dates)
+
         try:
-            x_ticks = bottom_ax.get_xticks()
+            date_range = (dates[-1] - dates[0]).days
             x_lim = bottom_ax.get_xlim()
 
             # mplfinance使用数字索引，需要转换为日期
-            if x_lim[1] < len(plot_data) * 2:
+            if x_lim[1] < n * 2:
                 # X轴是数字索引，需要转换为日期
-                valid_ticks = [tick for tick in x_ticks if 0 <= tick < len(plot_data)]
+                # 在刻度数组上一次筛选出落在数据范围内的位置（截断取整与 int() 一致）
+                x_ticks = np.asarray(bottom_ax.get_xticks(), dtype=np.float64)
+                tick_indices = x_ticks[(x_ticks >= 0) & (x_ticks < n)].astype(np.int64)
 
-                if len(valid_ticks) > 0:
-                    # 使用现有的刻度位置
-                    tick_indices = [int(tick) for tick in valid_ticks]
-                    tick_dates = [plot_data.index[idx] for idx in tick_indices]
-                else:
+                if tick_indices.size == 0:
                     # 创建新的刻度位置
-                    num_ticks = min(12, max(5, len(plot_data) // 100))
-                    tick_indices = [
-                        int(i * (len(plot_data) - 1) / (num_ticks - 1))
-                        for i in range(num_ticks)
-                    ]
-                    tick_dates = [plot_data.index[idx] for idx in tick_indices]
+                    num_ticks = min(12, max(5, n // 100))
+                    tick_indices = (
+                        np.arange(num_ticks) * (n - 1) / (num_ticks - 1)
+                    ).astype(np.int64)
 
-                # 根据数据跨度选择合适的日期格式
-                date_range = (plot_data.index[-1] - plot_data.index[0]).days
+                # 根据数据跨度选择合适的日期格式，整批格式化刻度标签
                 date_format_str = self._get_date_format_string(date_range)
-                date_labels = [date.strftime(date_format_str) for date in tick_dates]
+                date_labels = dates[tick_indices].strftime(date_format_str).tolist()
+                tick_indices = tick_indices.tolist()
 
                 # 对所有axes设置相同的日期刻度
                 for ax in axes_list:
@@ -265,7 +390,6 @@ class StockChartGenerator:
                 for ax in axes_list:
                     ax.xaxis_date()
 
-                date_range = (plot_data.index[-1] - plot_data.index[0]).days
                 date_format = mdates.DateFormatter(self._get_date_format_string(date_range))
 
                 # 对所有axes设置格式化器
@@ -275,7 +399,7 @@ class StockChartGenerator:
         except Exception as e:
             print(f"设置日期格式化失败: {e}，使用默认格式")
 
-    def _create_add_plots(self, df: pd.DataFrame) -> list:
+    def _create_add_plots(self, df: pd.DataFrame) -> Tuple[list, bool, bool]:
         """
         创建需要添加到图表的额外绘图对象
 
@@ -283,17 +407,19 @@ class StockChartGenerator:
             df: 包含指标数据的DataFrame
 
         Returns:
-            list: addplot对象列表
+            tuple: (addplot对象列表, 是否添加了BOLL, 是否添加了MACD面板)
         """
         add_plots = []
+        boll_valid = False
+        macd_valid = False
 
         # BOLL指标添加到主图（panel=0）
         # 检查BOLL指标是否存在且有效
         if all(col in df.columns for col in ["BOLL_UPPER", "BOLL_MIDDLE", "BOLL_LOWER"]):
             boll_valid = (
-                df["BOLL_UPPER"].notna().any()
-                and df["BOLL_MIDDLE"].notna().any()
-                and df["BOLL_LOWER"].notna().any()
+                any_valid(_float_values(df["BOLL_UPPER"]))
+                and any_valid(_float_values(df["BOLL_MIDDLE"]))
+                and any_valid(_float_values(df["BOLL_LOWER"]))
             )
             if boll_valid:
                 add_plots.extend(
@@ -328,18 +454,18 @@ class StockChartGenerator:
         # MACD指标添加到独立面板（panel=2，与成交量panel=1分离）
         # 检查MACD指标是否存在且有效
         if all(col in df.columns for col in ["DIF", "DEA", "MACD"]):
+            macd_values = _float_values(df["MACD"])
             macd_valid = (
-                df["DIF"].notna().any()
-                and df["DEA"].notna().any()
-                and df["MACD"].notna().any()
+                any_valid(_float_values(df["DIF"]))
+                and any_valid(_float_values(df["DEA"]))
+                and any_valid(macd_values)
             )
             if macd_valid:
                 # MACD柱需要根据正负值设置不同颜色
-                # 创建正负值分别的Series
-                macd_positive = df["MACD"].copy()
-                macd_positive[macd_positive < 0] = 0  # 负值设为0
-                macd_negative = df["MACD"].copy()
-                macd_negative[macd_negative > 0] = 0  # 正值设为0
+                # 在底层数组上一次遍历拆出正负两部分（另一侧设为0，NaN保持不变）
+                positive_values, negative_values = split_macd(macd_values)
+                macd_positive = pd.Series(positive_values, index=df.index)
+                macd_negative = pd.Series(negative_values, index=df.index)
 
                 add_plots.extend(
                     [
@@ -372,7 +498,7 @@ class StockChartGenerator:
                     ]
                 )
 
-        return add_plots
+        return add_plots, boll_valid, macd_valid
 
     def _apply_chinese_fonts(
         self, fig, axes_list: list
@@ -387,36 +513,21 @@ class StockChartGenerator:
         if not self.chinese_font_prop:
             return
 
+        # 收集所有axes上的文本对象（文本、标题、坐标轴标签、刻度标签），一次 setp 统一设置；
+        # 空文本设置字体不影响显示，无需逐个判断
+        text_objects = []
         for ax in axes_list:
-            # 设置所有文本对象
-            for text in ax.texts:
-                text.set_fontproperties(self.chinese_font_prop)
-
-            # 设置axes标题
-            title = ax.get_title()
-            if title:
-                ax.title.set_fontproperties(self.chinese_font_prop)
-
-            # 设置坐标轴标签
-            xlabel = ax.get_xlabel()
-            ylabel = ax.get_ylabel()
-            if xlabel:
-                ax.xaxis.label.set_fontproperties(self.chinese_font_prop)
-            if ylabel:
-                ax.yaxis.label.set_fontproperties(self.chinese_font_prop)
-
-            # 设置刻度标签字体
-            for label in ax.get_xticklabels():
-                if label.get_text():
-                    label.set_fontproperties(self.chinese_font_prop)
-            for label in ax.get_yticklabels():
-                if label.get_text():
-                    label.set_fontproperties(self.chinese_font_prop)
+            text_objects.extend(ax.texts)
+            text_objects.extend((ax.title, ax.xaxis.label, ax.yaxis.label))
+            text_objects.extend(ax.get_xticklabels())
+            text_objects.extend(ax.get_yticklabels())
+        plt.setp(text_objects, fontproperties=self.chinese_font_prop)
 
     def _plot_stock_chart(
         self,
         plot_data: pd.DataFrame,
         add_plots: list,
+        has_macd: bool,
         title: str,
         filepath: str,
     ) -> None:
@@ -426,6 +537,7 @@ class StockChartGenerator:
         Args:
             plot_data: 绘图数据（OHLCV）
             add_plots: 额外绘图对象列表（可以为空）
+            has_macd: add_plots 中是否包含MACD面板（panel=2）
             title: 图表标题
             filepath: 保存路径
         """
@@ -442,18 +554,14 @@ class StockChartGenerator:
         }
 
         # 如果有额外绘图对象，添加addplot和panel_ratios
+        # panel=0: K线图, panel=1: 成交量, panel=2: MACD
+        addplot_kwargs = {}
         if add_plots:
-            plot_kwargs["addplot"] = add_plots
-            # 检查是否有MACD指标（panel=2）
-            has_macd = any(hasattr(ap, "panel") and ap.panel == 2 for ap in add_plots)
-            if has_macd:
-                # 如果有MACD，使用(3, 1, 2)让MACD面板有更多空间
-                # mplfinance要求panel_ratios长度等于面板数量
-                # panel=0: K线图, panel=1: 成交量, panel=2: MACD
-                plot_kwargs["panel_ratios"] = (3, 1, 2)  # K线图, 成交量, MACD
-            else:
-                # 如果没有MACD，只有K线图和成交量
-                plot_kwargs["panel_ratios"] = (3, 1)  # K线图, 成交量
+            addplot_kwargs = {
+                "addplot": add_plots,
+                "panel_ratios": MACD_PANEL_RATIOS if has_macd else BASIC_PANEL_RATIOS,
+            }
+        plot_kwargs.update(addplot_kwargs)
 
         # 使用mplfinance绘制图表
         fig, axes = mpf.plot(plot_data, **plot_kwargs)
@@ -470,25 +578,37 @@ class StockChartGenerator:
                 "show_nontrading": False,
                 "savefig": dict(fname=filepath, dpi=self.dpi, bbox_inches="tight"),
                 "warn_too_much_data": 10000,
+                **addplot_kwargs,
             }
-            if add_plots:
-                fallback_kwargs["addplot"] = add_plots
-                # 检查是否有MACD指标（panel=2）
-                has_macd = any(hasattr(ap, "panel") and ap.panel == 2 for ap in add_plots)
-                if has_macd:
-                    fallback_kwargs["panel_ratios"] = (3, 1, 2)
-                else:
-                    fallback_kwargs["panel_ratios"] = (3, 1)
             mpf.plot(plot_data, **fallback_kwargs)
             return
 
+        self._decorate_figure(fig, fig.get_axes(), plot_data, has_macd, title)
+        self._save_figure(fig, filepath)
+        plt.close(fig)
+
+    def _decorate_figure(
+        self,
+        fig,
+        axes_list: list,
+        plot_data: pd.DataFrame,
+        has_macd: bool,
+        title: str,
+    ) -> None:
+        """
+        为已绘制K线的图表添加标题、MACD面板说明、日期刻度和中文字体
+
+        Args:
+            fig: matplotlib figure对象
+            axes_list: axes列表（顺序为K线图、成交量、MACD）
+            plot_data: 绘图数据（OHLCV）
+            has_macd: 是否绘制了MACD面板
+            title: 图表标题
+        """
         # 设置中文标题
         if self.chinese_font_prop:
             fig.suptitle(title, fontproperties=self.chinese_font_prop, fontsize=16, y=0.995)
 
-        # 获取所有axes
-        axes_list = fig.get_axes()
-
         # 为MACD面板添加标题和分隔线，使其更清晰独立
         if len(axes_list) >= 3 and self.chinese_font_prop:
             # axes_list顺序通常是：K线图、成交量、MACD
@@ -499,43 +619,31 @@ class StockChartGenerator:
             )
 
             # 在MACD面板上方添加分隔线，使其与成交量面板更明显分开
-            # 获取MACD面板的位置
-            pos = macd_ax.get_position()
-            # 在MACD面板上方绘制一条分隔线
-            fig.add_artist(
-                plt.Line2D(
-                    [pos.x0, pos.x1],
-                    [pos.y1, pos.y1],
-                    transform=fig.transFigure,
-                    color="gray",
-                    linewidth=2,
-                    linestyle="--",
-                    alpha=0.5,
-                )
-            )
+            # 直接把面板的上边框画成虚线（面板上可能叠有副坐标轴，位置相同的axes一并设置），
+            # 不在figure上另加一条线
+            macd_bounds = macd_ax.get_position().bounds
+            for ax in axes_list:
+                if ax.get_position().bounds == macd_bounds:
+                    ax.spines["top"].set(
+                        color="gray", linewidth=2, linestyle="--", alpha=0.5
+                    )
 
             # 添加图例说明（如果MACD数据存在）
-            if add_plots:
-                # 检查是否有MACD相关的addplot
-                has_macd = any(
-                    "DIF" in str(ap) or "DEA" in str(ap) or "MACD" in str(ap)
-                    for ap in add_plots
+            if has_macd:
+                # 在MACD面板右上角添加图例说明
+                macd_ax.text(
+                    0.98,
+                    0.95,
+                    "DIF(蓝) | DEA(橙) | MACD柱(红/绿)",
+                    transform=macd_ax.transAxes,
+                    fontproperties=self.chinese_font_prop,
+                    fontsize=9,
+                    verticalalignment="top",
+                    horizontalalignment="right",
+                    bbox=dict(
+                        boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.3
+                    ),
                 )
-                if has_macd:
-                    # 在MACD面板右上角添加图例说明
-                    macd_ax.text(
-                        0.98,
-                        0.95,
-                        "DIF(蓝) | DEA(橙) | MACD柱(红/绿)",
-                        transform=macd_ax.transAxes,
-                        fontproperties=self.chinese_font_prop,
-                        fontsize=9,
-                        verticalalignment="top",
-                        horizontalalignment="right",
-                        bbox=dict(
-                            boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.3
-                        ),
-                    )
 
         # 格式化X轴日期
         if axes_list:
@@ -544,6 +652,14 @@ class StockChartGenerator:
         # 应用中文字体
         self._apply_chinese_fonts(fig, axes_list)
 
+    def _save_figure(self, fig, filepath: str) -> None:
+        """
+        按当前图片格式保存图表
+
+        Args:
+            fig: matplotlib figure对象
+            filepath: 保存路径
+        """
         # 保存图片
         # SVG是矢量格式，不需要DPI参数
         save_kwargs = {"bbox_inches": "tight"}
@@ -551,9 +667,25 @@ class StockChartGenerator:
             save_kwargs["format"] = "svg"
         else:
             save_kwargs["dpi"] = self.dpi
-        
+            save_kwargs["pil_kwargs"] = {"compress_level": PNG_COMPRESS_LEVEL}
+
         fig.savefig(filepath, **save_kwargs)
-        plt.close(fig)
+
+    def _resolve_image_format(self, image_format: ImageFormat, bar_count: int) -> ImageFormat:
+        """
+        根据K线数量确定实际输出格式：SVG 只用于较小的图表
+
+        Args:
+            image_format: 请求的图片格式
+            bar_count: K线数量
+
+        Returns:
+            实际使用的图片格式
+        """
+        if image_format == "svg" and bar_count > SVG_MAX_BARS:
+            print(f"K线数量({bar_count})超过{SVG_MAX_BARS}，改用PNG格式输出")
+            return "png"
+        return image_format
 
     def generate_filename(
         self,
@@ -586,26 +718,26 @@ class StockChartGenerator:
         filename = f"{stock_code}_{start_date_str}_{end_date_str}_{period_name}_{data_source}_MACD_BOLL.{format_ext}"
         return os.path.join(self.chart_dir, filename)
 
-    def generate(
+    def _prepare_chart(
         self,
         stock_code: str,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        period: PeriodType = DEFAULT_PERIOD,
-        image_format: Optional[ImageFormat] = None,
-    ) -> str:
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: PeriodType,
+        image_format: Optional[ImageFormat],
+    ) -> tuple:
         """
-        生成股票K线图
+        获取数据、计算指标并确定标题与输出路径（不绘图）
 
         Args:
             stock_code: 股票代码
             start_date: 开始日期 (YYYY-MM-DD)，如果为None则使用该股票的最早交易日期
             end_date: 结束日期 (YYYY-MM-DD)，如果为None则使用该股票的最新交易日期
-            period: 周期类型，可选值：'D'（日线）、'W'（周线）、'M'（月线）、'Q'（季线）、'Y'（年线）
-            image_format: 图片格式，可选 'png' 或 'svg'，如果为None则使用实例的默认格式
+            period: 周期类型
+            image_format: 图片格式，如果为None则使用实例的默认格式
 
         Returns:
-            str: 保存的图表文件路径
+            tuple: (plot_data, add_plots, has_macd, title, filepath, output_format)
         """
         # 检查股票代码
         if not stock_code:
@@ -638,11 +770,31 @@ class StockChartGenerator:
             df = self.resample_data(df, period)
             print(f"重采样后数据点数量: {len(df)}")
 
+        # 确定输出格式（如果指定了格式，使用指定的格式，否则使用实例的默认格式；数据量大时SVG改为PNG）
+        output_format = self._resolve_image_format(
+            image_format or self.image_format, len(df)
+        )
+
+        # PNG的宽度像素数固定，超过像素数的K线会挤在同一列像素里，先合并到像素分辨率再绘制
+        if output_format == "png":
+            max_bars = int(self.figsize[0] * self.dpi)
+            if len(df) > max_bars:
+                df = self.downsample_data(df, max_bars)
+                print(f"K线数量超过图片宽度({max_bars}像素)，合并后数据点数量: {len(df)}")
+
         # 计算技术指标（在重采样后计算，确保指标基于正确的周期）
         df = calculate_indicators(df, period)
 
         # 准备绘图数据
-        plot_data = df[["open", "high", "low", "close", "volume"]].copy()
+        # 合并为单个float64块：mplfinance 按列读取 data[col].values，
+        # 按列连续存放（块数组为C连续）时每列都是无需复制的连续视图
+        ohlcv_columns = ["open", "high", "low", "close", "volume"]
+        plot_data = pd.DataFrame(
+            np.asfortranarray(_float_values(df[ohlcv_columns])),
+            index=df.index,
+            columns=ohlcv_columns,
+            copy=False,
+        )
         if not isinstance(plot_data.index, pd.DatetimeIndex):
             plot_data.index = pd.to_datetime(plot_data.index)
 
@@ -653,7 +805,7 @@ class StockChartGenerator:
         print(f"数据列: {plot_data.columns.tolist()}")
 
         # 创建额外绘图对象
-        add_plots = self._create_add_plots(df)
+        add_plots, _, has_macd = self._create_add_plots(df)
 
         # 获取股票名称
         stock_name = fetch_data_service.get_stock_name_from_supabase(stock_code)
@@ -662,8 +814,7 @@ class StockChartGenerator:
         else:
             display_name = stock_code
 
-        # 生成文件名（如果指定了格式，使用指定的格式，否则使用实例的默认格式）
-        output_format = image_format or self.image_format
+        # 生成文件名
         filepath = self.generate_filename(
             stock_code,
             start_date,
@@ -677,15 +828,42 @@ class StockChartGenerator:
             f"{display_name}从{start_date}至{end_date}的{period_name}行情数据"
         )
 
-        # 临时设置输出格式（如果指定了格式参数）
+        return plot_data, add_plots, has_macd, title, filepath, output_format
+
+    def generate(
+        self,
+        stock_code: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        period: PeriodType = DEFAULT_PERIOD,
+        image_format: Optional[ImageFormat] = None,
+    ) -> str:
+        """
+        生成股票K线图
+
+        Args:
+            stock_code: 股票代码
+            start_date: 开始日期 (YYYY-MM-DD)，如果为None则使用该股票的最早交易日期
+            end_date: 结束日期 (YYYY-MM-DD)，如果为None则使用该股票的最新交易日期
+            period: 周期类型，可选值：'D'（日线）、'W'（周线）、'M'（月线）、'Q'（季线）、'Y'（年线）
+            image_format: 图片格式，可选 'png' 或 'svg'，如果为None则使用实例的默认格式；
+                          K线数量超过 SVG_MAX_BARS 时 SVG 自动改为 PNG（文件扩展名随之改变）
+
+        Returns:
+            str: 保存的图表文件路径
+        """
+        plot_data, add_plots, has_macd, title, filepath, output_format = self._prepare_chart(
+            stock_code, start_date, end_date, period, image_format
+        )
+
+        # 临时设置输出格式
         original_format = self.image_format
-        if image_format:
-            self.image_format = image_format
+        self.image_format = output_format
         
         try:
             # 绘制图表
             self._plot_stock_chart(
-                plot_data, add_plots, title, filepath
+                plot_data, add_plots, has_macd, title, filepath
             )
         finally:
             # 恢复原始格式
@@ -694,3 +872,134 @@ class StockChartGenerator:
         print(f"图表已保存到: {filepath}")
         return filepath
 
+    def generate_batch(self, requests: List[dict]) -> List[str]:
+        """
+        批量生成股票K线图，所有图表复用同一个Figure
+
+        只创建一次Figure和K线图/成交量/MACD三个axes，每张图之前清空axes后
+        以mplfinance外部axes模式重新绘制，省去逐张创建、布局和销毁Figure的开销。
+
+        Args:
+            requests: 请求列表，每项为 generate() 的关键字参数字典，
+                      如 {"stock_code": "600519", "period": "W"}
+
+        Returns:
+            List[str]: 成功保存的图表文件路径列表（失败的请求打印原因后跳过）
+        """
+        filepaths = []
+        if not requests:
+            return filepaths
+
+        fig = mpf.figure(style=self.custom_style, figsize=self.figsize)
+        layouts = {
+            True: fig.add_gridspec(3, 1, height_ratios=MACD_PANEL_RATIOS, hspace=0.05),
+            False: fig.add_gridspec(2, 1, height_ratios=BASIC_PANEL_RATIOS, hspace=0.05),
+        }
+        price_ax = fig.add_subplot(layouts[True][0])
+        volume_ax = fig.add_subplot(layouts[True][1])
+        macd_ax = fig.add_subplot(layouts[True][2])
+        base_axes = (price_ax, volume_ax, macd_ax)
+
+        try:
+            for request in requests:
+                stock_code = request.get("stock_code")
+                try:
+                    (
+                        plot_data, add_plots, has_macd, title, filepath, output_format
+                    ) = self._prepare_chart(
+                        stock_code,
+                        request.get("start_date"),
+                        request.get("end_date"),
+                        request.get("period", DEFAULT_PERIOD),
+                        request.get("image_format"),
+                    )
+
+                    # 清空上一张图的内容（addplot使用副坐标轴时会新建twinx axes，一并移除）
+                    for ax in fig.get_axes():
+                        if ax not in base_axes:
+                            ax.remove()
+                    for ax in base_axes:
+                        ax.clear()
+
+                    # 按是否有MACD面板调整布局
+                    axes_list = list(base_axes) if has_macd else [price_ax, volume_ax]
+                    grid = layouts[has_macd]
+                    for i, ax in enumerate(axes_list):
+                        ax.set_subplotspec(grid[i])
+                        ax.set_position(grid[i].get_position(fig))
+                    macd_ax.set_visible(has_macd)
+
+                    # 外部axes模式下addplot通过ax指定目标axes；
+                    # 指标无法计算（数据点太少）时不传addplot（mplfinance不接受None）
+                    panel_axes = {0: price_ax, 1: volume_ax, 2: macd_ax}
+                    addplot_kwargs = {}
+                    if add_plots:
+                        addplot_kwargs["addplot"] = [
+                            {**ap, "ax": panel_axes[ap["panel"]]} for ap in add_plots
+                        ]
+                    mpf.plot(
+                        plot_data,
+                        type="candle",
+                        ax=price_ax,
+                        volume=volume_ax,
+                        ylabel="价格",
+                        show_nontrading=False,
+                        warn_too_much_data=10000,
+                        **addplot_kwargs,
+                    )
+                    # 各axes对齐K线图的X轴范围，只在最底部的axes显示日期标签
+                    # （不使用sharex：清空后隐藏的MACD axes仍保留旧的数据范围，会影响共享轴的自动缩放）
+                    x_lim = price_ax.get_xlim()
+                    for ax in axes_list[1:]:
+                        ax.set_xlim(x_lim)
+                    for ax in axes_list[:-1]:
+                        ax.tick_params(labelbottom=False)
+
+                    self._decorate_figure(fig, axes_list, plot_data, has_macd, title)
+
+                    original_format = self.image_format
+                    self.image_format = output_format
+                    try:
+                        self._save_figure(fig, filepath)
+                    finally:
+                        self.image_format = original_format
+                except Exception as e:
+                    print(f"生成{stock_code}的图表失败: {e}")
+                    continue
+
+                print(f"图表已保存到: {filepath}")
+                filepaths.append(filepath)
+        finally:
+            plt.close(fig)
+
+        return filepaths
+
+    def generate_many(self, requests: List[dict], workers: Optional[int] = None) -> List[str]:
+        """
+        使用多进程并行生成股票K线图
+
+        matplotlib 渲染期间大部分时间持有 GIL，多线程无法并行，因此按进程并行。
+        工作进程在启动时创建一次图表生成器，之后复用处理分到的所有请求。
+
+        Args:
+            requests: 请求列表，每项为 generate() 的关键字参数字典，
+                      如 {"stock_code": "600519", "period": "W"}
+            workers: 进程数，默认为CPU核数（不超过请求数量）
+
+        Returns:
+            List[str]: 成功保存的图表文件路径列表（失败的请求打印原因后跳过）
+        """
+        if not requests:
+            return []
+
+        workers = min(workers or os.cpu_count() or 1, len(requests))
+        # 每次派发多个请求，减少进程间通信次数
+        chunksize = max(1, len(requests) // (4 * workers))
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_chart_worker,
+            initargs=(self.chart_dir, self.dpi, self.figsize, self.image_format),
+        ) as executor:
+            results = executor.map(_render_chart, requests, chunksize=chunksize)
+            return [filepath for filepath in results if filepath]
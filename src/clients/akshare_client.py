@@ -3,26 +3,67 @@ AKShare数据获取模块
 
 使用AKShare API获取A股股票列表和基本信息。
 """
+import importlib.util
 import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
 from functools import lru_cache
 
 import akshare as ak
+import numpy as np
+import pandas as pd
+from .models import StockRecord
 from ..core.cache_manager import (
-    cached_api_call, _cache_stock_basic_info, _cache_stock_list,
+    CACHE_MISS, cached_api_call, _cache_stock_basic_info, _cache_basic_info_source,
+    _cache_stock_list,
     _cache_stock_controller, _cache_stock_shareholders, 
-    _cache_stock_market_value, _cache_stock_financial,
+    _cache_stock_market_value, _cache_stock_financial, _cache_profit_sheet,
     clear_all_caches as clear_caches, get_cache_stats
 )
 
 logger = logging.getLogger(__name__)
 
+# 可选：pyarrow 可用时，接口返回的大表转换为 Arrow 后端（字符串列更省内存、扫描更快）
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# 整列文本清洗使用的类型：pyarrow 可用时用 Arrow 字符串（.str 方法走 Arrow compute 内核）
+_TEXT_DTYPE = 'string[pyarrow]' if PYARROW_AVAILABLE else str
+
+# 基本信息 item 名称中用于识别字段的关键词（item 包含任一关键词即命中）
+_COMPANY_TYPE_KEYS = ('企业性质', '所有制', '公司性质')
+_CONTROLLER_KEYS = ('实际控制人', '控股股东', '控制人')
+_MAIN_BUSINESS_KEYS = ('主营业务', '主营产品', '经营范围')
+_XQ_COMPANY_TYPE_KEYS = ('性质', '类型', '分类', '所有制')
+# 雪球接口能补充的字段；东方财富已全部取得时不再请求雪球
+_XQ_SUPPLEMENT_KEYS = ('list_date', 'company_type', 'actual_controller', 'main_business')
+
+# 报告期名称中的年份（如：2024三季报）
+_YEAR_RE = re.compile(r'(\d{4})')
+
+# 数值解析：一次 str.translate 去除单位/分隔符，表示空值的字符串
+_FLOAT_STRIP_TABLE = str.maketrans('', '', '元万亿%,')
+_INT_STRIP_TABLE = str.maketrans('', '', ',股')
+_NULL_STRINGS = frozenset(('nan', 'none', 'null', ''))
+# 控制人数据中转为分类类型的低基数文本列
+_CONTROLLER_CATEGORY_COLUMNS = ('证券代码', '控制类型', '直接控制人名称')
+# 整列数值解析时去除的单位、百分号、千分位分隔符和空白
+_NUMERIC_STRIP_RE = r'[元万亿%,，\s股]'
+
+# pd.to_datetime 逐元素推断格式（pandas 2.0 起需显式指定 format='mixed'）
+_MIXED_DATE_KWARGS = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+# 股票代码首位 -> 市场（92开头单独判断），查表替代逐个 startswith 判断
+_MARKET_BY_FIRST_CHAR = {'6': 'SH', '0': 'SZ', '3': 'SZ', '8': 'BJ'}
+
 
 class AKShareClient:
     """AKShare客户端类"""
     
     @staticmethod
+    @lru_cache(maxsize=16384)
     def _get_market_from_code(code: str) -> str:
         """
         根据股票代码判断市场
@@ -35,19 +76,15 @@ class AKShareClient:
             - 0、3开头 -> SZ（深圳证券交易所）
             - 6开头 -> SH（上海证券交易所）
             - 8、92开头 -> BJ（北京证券交易所）
-            - 其他 -> SH（默认）
+            - 其他 -> SZ（默认）
         """
-        if code.startswith('6'):
-            return 'SH'
-        elif code.startswith(('0', '3')):
-            return 'SZ'
-        elif code.startswith(('8', '92')):
+        # 92开头（北交所新代码段）需要看前两位，其余只看首位
+        if code[:2] == '92':
             return 'BJ'
-        else:
-            # 如果无法判断，默认使用上海
-            return 'SH' if len(code) == 6 and code[0] == '6' else 'SZ'
+        return _MARKET_BY_FIRST_CHAR.get(code[:1], 'SZ')
     
     @staticmethod
+    @lru_cache(maxsize=16384)
     def _convert_code_to_symbol(code: str) -> str:
         """
         将股票代码转换为带市场标识的格式
@@ -60,10 +97,222 @@ class AKShareClient:
             - 0、3开头 -> SZ（深圳证券交易所）
             - 6开头 -> SH（上海证券交易所）
             - 8、92开头 -> BJ（北京证券交易所）
-            - 其他 -> SH（默认）
+            - 其他 -> SZ（默认）
+        """
+        return AKShareClient._get_market_from_code(code) + code
+    
+    @staticmethod
+    def _find_item(items: Dict[str, any], keys: tuple) -> any:
+        """
+        在 item/value 字典中查找第一个名称包含任一关键词的项
+        
+        Args:
+            items: item 名称到值的字典（保持原数据行顺序）
+            keys: 关键词元组
+            
+        Returns:
+            第一个命中项的值，未命中返回None
+        """
+        for item, value in items.items():
+            if isinstance(item, str) and any(key in item for key in keys):
+                return value
+        return None
+    
+    @staticmethod
+    def _as_arrow(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        将接口返回的DataFrame转换为 pyarrow 后端（pyarrow 未安装时原样返回）
+        
+        Args:
+            df: 接口返回的数据表
+            
+        Returns:
+            转换后的数据表
+        """
+        if not PYARROW_AVAILABLE or df is None or df.empty:
+            return df
+        try:
+            return df.convert_dtypes(dtype_backend='pyarrow')
+        except (TypeError, ValueError) as e:
+            # pandas < 2.0 不支持 dtype_backend 参数
+            logger.debug(f"转换为 pyarrow 后端失败，使用原数据: {e}")
+            return df
+    
+    @staticmethod
+    def _is_missing(value: any) -> bool:
+        """
+        判断单个值是否为缺失值：None、NaN/NA，或空白、"nan"、"None"、"null" 等文本（不区分大小写）
+        
+        Args:
+            value: 待判断的值
+            
+        Returns:
+            是否为缺失值
+        """
+        if value is None:
+            return True
+        if isinstance(value, str):
+            return value.strip().lower() in _NULL_STRINGS
+        return pd.api.types.is_scalar(value) and bool(pd.isna(value))
+    
+    @staticmethod
+    def _first(row: Dict[str, any], keys: tuple, default: any = None) -> any:
+        """
+        按候选键顺序返回第一个有效值（兼容不同版本的列名）
+        
+        Args:
+            row: 数据行字典
+            keys: 候选键元组
+            default: 所有候选键都没有有效值时的默认值
+            
+        Returns:
+            第一个非缺失（见 _is_missing）的值
+        """
+        for key in keys:
+            value = row.get(key)
+            if not AKShareClient._is_missing(value):
+                return value
+        return default
+    
+    @staticmethod
+    def _first_column(df: pd.DataFrame, names: tuple, default: any = 0) -> pd.Series:
+        """
+        按候选列名顺序返回第一个存在的列
+        
+        Args:
+            df: 数据表
+            names: 候选列名元组（兼容不同版本的列名）
+            default: 所有候选列都不存在时填充的默认值
+            
+        Returns:
+            对应的列；都不存在时返回填充默认值的列
         """
-        market = AKShareClient._get_market_from_code(code)
-        return f'{market}{code}'
+        for name in names:
+            if name in df.columns:
+                return df[name]
+        return pd.Series(default, index=df.index)
+    
+    @staticmethod
+    @cached_api_call(_cache_basic_info_source)
+    def _basic_info_em(code: str) -> Optional[Dict[str, any]]:
+        """
+        使用 stock_individual_info_em (东方财富) 获取股票基本信息
+        
+        结果按代码在内存中缓存1小时（见 cache_manager._cache_basic_info_source），
+        请求失败（抛出异常）或未取得数据（返回None）时不缓存；调用方不要原地修改返回的字典。
+        
+        Args:
+            code: 股票代码
+            
+        Returns:
+            基本信息字典（list_date、industry_name、company_type、actual_controller、
+            main_business、concept、area 中取得的字段），未取得任何字段时返回None
+        """
+        basic_info = {}
+        stock_info = ak.stock_individual_info_em(symbol=code)
+        if stock_info is None or stock_info.empty:
+            return None
+        
+        # 数据只有十几行 item/value，转成字典后逐项 O(1) 查找，避免每个字段做一次整表过滤
+        items = dict(zip(stock_info['item'].tolist(), stock_info['value'].tolist()))
+        
+        # 提取上市日期
+        date_str = str(items.get('上市时间', ''))
+        # 格式: 19910403 -> 1991-04-03
+        if len(date_str) == 8 and date_str.isdigit():
+            basic_info['list_date'] = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        
+        # 提取行业信息
+        if '行业' in items:
+            basic_info['industry_name'] = items['行业']
+        
+        # 提取企业性质
+        value = AKShareClient._find_item(items, _COMPANY_TYPE_KEYS)
+        if value is not None:
+            basic_info['company_type'] = value
+        
+        # 提取实际控制人
+        value = AKShareClient._find_item(items, _CONTROLLER_KEYS)
+        if value is not None:
+            basic_info['actual_controller'] = value
+        
+        # 提取主营产品/主营业务
+        value = AKShareClient._find_item(items, _MAIN_BUSINESS_KEYS)
+        if value is not None:
+            basic_info['main_business'] = value
+        
+        # 提取概念
+        if '概念板块' in items:
+            basic_info['concept'] = items['概念板块']
+        
+        # 提取地区
+        if '所属地域' in items:
+            basic_info['area'] = items['所属地域']
+        
+        return basic_info or None
+    
+    @staticmethod
+    @cached_api_call(_cache_basic_info_source)
+    def _basic_info_xq(code: str) -> Optional[Dict[str, any]]:
+        """
+        使用 stock_individual_basic_info_xq (雪球) 获取股票基本信息
+        
+        结果按代码在内存中缓存1小时（见 cache_manager._cache_basic_info_source），
+        请求失败（抛出异常）或未取得数据（返回None）时不缓存；调用方不要原地修改返回的字典。
+        
+        Args:
+            code: 股票代码
+            
+        Returns:
+            基本信息字典（list_date、company_type、actual_controller、main_business 中取得的字段），
+            未取得任何字段时返回None
+        """
+        basic_info = {}
+        # 转换代码格式：000001 -> SZ000001, 600519 -> SH600519, 920139 -> BJ920139
+        symbol_code = AKShareClient._convert_code_to_symbol(code)
+        basic_info_xq = ak.stock_individual_basic_info_xq(symbol=symbol_code)
+        if basic_info_xq is None or basic_info_xq.empty:
+            return None
+        
+        items = dict(zip(basic_info_xq['item'].tolist(), basic_info_xq['value'].tolist()))
+        
+        # 上市日期（毫秒时间戳）
+        timestamp = items.get('established_date')
+        if timestamp and not AKShareClient._is_missing(timestamp):
+            try:
+                dt = datetime.fromtimestamp(int(timestamp) / 1000)
+                basic_info['list_date'] = dt.strftime('%Y-%m-%d')
+            except:
+                pass
+        
+        # 企业性质（classi_name字段）
+        value = items.get('classi_name')
+        if not AKShareClient._is_missing(value):
+            basic_info['company_type'] = str(value).strip()
+        else:
+            # 如果classi_name不存在，尝试查找所有包含"性质"、"类型"、"分类"等关键词的字段
+            value = AKShareClient._find_item(items, _XQ_COMPANY_TYPE_KEYS)
+            if not AKShareClient._is_missing(value):
+                basic_info['company_type'] = str(value).strip()
+        
+        # 实际控制人
+        value = items.get('actual_controller')
+        if not AKShareClient._is_missing(value):
+            # 提取实际控制人名称（去除持股比例）
+            controller_str = str(value).strip()
+            # 格式可能是: "贵州省人民政府国有资产监督管理委员会 (48.91%)"
+            if '(' in controller_str:
+                controller_str = controller_str.split('(')[0].strip()
+            basic_info['actual_controller'] = controller_str
+        
+        # 主营业务，没有时使用公司简介
+        for item in ('main_operation_business', 'org_cn_introduction'):
+            value = items.get(item)
+            if not AKShareClient._is_missing(value):
+                basic_info['main_business'] = str(value)
+                break
+        
+        return basic_info or None
     
     @staticmethod
     @cached_api_call(_cache_stock_basic_info, ttl=86400)  # 24小时缓存
@@ -88,150 +337,27 @@ class AKShareClient:
         
         # 方法1: 尝试使用 stock_individual_info_em (东方财富)
         try:
-            stock_info = ak.stock_individual_info_em(symbol=code)
-            
-            if stock_info is not None and not stock_info.empty:
-                # 提取上市日期
-                list_date_row = stock_info[stock_info['item'] == '上市时间']
-                if not list_date_row.empty:
-                    date_str = str(list_date_row.iloc[0]['value'])
-                    # 格式: 19910403 -> 1991-04-03
-                    if len(date_str) == 8 and date_str.isdigit():
-                        basic_info['list_date'] = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-                
-                # 提取行业信息
-                industry_row = stock_info[stock_info['item'] == '行业']
-                if not industry_row.empty:
-                    basic_info['industry_name'] = industry_row.iloc[0]['value']
-                
-                # 提取企业性质
-                company_type_row = stock_info[stock_info['item'].str.contains('企业性质|所有制|公司性质', na=False)]
-                if not company_type_row.empty:
-                    basic_info['company_type'] = company_type_row.iloc[0]['value']
-                
-                # 提取实际控制人
-                controller_row = stock_info[stock_info['item'].str.contains('实际控制人|控股股东|控制人', na=False)]
-                if not controller_row.empty:
-                    basic_info['actual_controller'] = controller_row.iloc[0]['value']
-                
-                # 提取主营产品/主营业务
-                business_row = stock_info[stock_info['item'].str.contains('主营业务|主营产品|经营范围', na=False)]
-                if not business_row.empty:
-                    basic_info['main_business'] = business_row.iloc[0]['value']
-                
-                # 提取概念
-                concept_row = stock_info[stock_info['item'] == '概念板块']
-                if not concept_row.empty:
-                    basic_info['concept'] = concept_row.iloc[0]['value']
-                
-                # 提取地区
-                area_row = stock_info[stock_info['item'] == '所属地域']
-                if not area_row.empty:
-                    basic_info['area'] = area_row.iloc[0]['value']
-                
-                logger.debug(f"成功使用 stock_individual_info_em 获取股票 {code} 基本信息")
-            
-                logger.debug(f"成功使用 stock_individual_info_em 获取股票 {code} 基本信息")
+            basic_info.update(AKShareClient._basic_info_em(code) or {})
+            logger.debug(f"成功使用 stock_individual_info_em 获取股票 {code} 基本信息")
         except Exception as e:
             logger.debug(f"使用 stock_individual_info_em 获取股票 {code} 基本信息失败: {e}")
         
         # 方法2: 如果方法1失败或数据不完整，使用 stock_individual_basic_info_xq (雪球) 作为备用
-        try:
-            # 转换代码格式：000001 -> SZ000001, 600519 -> SH600519, 920139 -> BJ920139
-            symbol_code = AKShareClient._convert_code_to_symbol(code)
-            basic_info_xq = ak.stock_individual_basic_info_xq(symbol=symbol_code)
-            
-            if basic_info_xq is not None and not basic_info_xq.empty:
-                # 补充缺失的上市日期
-                if 'list_date' not in basic_info:
-                    established_row = basic_info_xq[basic_info_xq['item'] == 'established_date']
-                    if not established_row.empty:
-                        timestamp = established_row.iloc[0]['value']
-                        if timestamp and str(timestamp) != 'None' and str(timestamp) != 'nan':
-                            try:
-                                from datetime import datetime
-                                dt = datetime.fromtimestamp(int(timestamp) / 1000)
-                                basic_info['list_date'] = dt.strftime('%Y-%m-%d')
-                            except:
-                                pass
-                
-                # 补充缺失的企业性质（classi_name字段）
-                if 'company_type' not in basic_info:
-                    classi_row = basic_info_xq[basic_info_xq['item'] == 'classi_name']
-                    if not classi_row.empty:
-                        value = classi_row.iloc[0]['value']
-                        if value and str(value) != 'None' and str(value) != 'nan' and str(value).strip():
-                            basic_info['company_type'] = str(value).strip()
-                    
-                    # 如果classi_name不存在，尝试其他可能的字段名
-                    if 'company_type' not in basic_info:
-                        # 尝试查找所有包含"性质"、"类型"、"分类"等关键词的字段
-                        possible_items = basic_info_xq[
-                            basic_info_xq['item'].str.contains('性质|类型|分类|所有制', na=False, case=False)
-                        ]
-                        if not possible_items.empty:
-                            value = possible_items.iloc[0]['value']
-                            if value and str(value) != 'None' and str(value) != 'nan' and str(value).strip():
-                                basic_info['company_type'] = str(value).strip()
-                
-                # 补充缺失的实际控制人（如果actual_controller字段有值）
-                if 'actual_controller' not in basic_info:
-                    controller_row = basic_info_xq[basic_info_xq['item'] == 'actual_controller']
-                    if not controller_row.empty:
-                        value = controller_row.iloc[0]['value']
-                        if value and str(value) != 'None' and str(value) != 'nan' and str(value).strip():
-                            # 提取实际控制人名称（去除持股比例）
-                            controller_str = str(value).strip()
-                            # 格式可能是: "贵州省人民政府国有资产监督管理委员会 (48.91%)"
-                            if '(' in controller_str:
-                                controller_str = controller_str.split('(')[0].strip()
-                            basic_info['actual_controller'] = controller_str
-                
-                # 补充缺失的主营业务
-                if 'main_business' not in basic_info:
-                    main_business_row = basic_info_xq[basic_info_xq['item'] == 'main_operation_business']
-                    if not main_business_row.empty:
-                        value = main_business_row.iloc[0]['value']
-                        if value and str(value) != 'None' and str(value) != 'nan':
-                            basic_info['main_business'] = str(value)
-                
-                # 补充公司简介（如果没有主营业务）
-                if 'main_business' not in basic_info:
-                    intro_row = basic_info_xq[basic_info_xq['item'] == 'org_cn_introduction']
-                    if not intro_row.empty:
-                        value = intro_row.iloc[0]['value']
-                        if value and str(value) != 'None' and str(value) != 'nan':
-                            basic_info['main_business'] = str(value)
-                
+        if not all(key in basic_info for key in _XQ_SUPPLEMENT_KEYS):
+            try:
+                for key, value in (AKShareClient._basic_info_xq(code) or {}).items():
+                    basic_info.setdefault(key, value)
                 logger.debug(f"成功使用 stock_individual_basic_info_xq 补充股票 {code} 基本信息")
-        except Exception as e:
-            logger.debug(f"使用 stock_individual_basic_info_xq 获取股票 {code} 基本信息失败: {e}")
+            except Exception as e:
+                logger.debug(f"使用 stock_individual_basic_info_xq 获取股票 {code} 基本信息失败: {e}")
         
         # 方法3: 如果企业性质仍然缺失，尝试从控制人信息推断（仅对92开头的股票）
         if 'company_type' not in basic_info and code.startswith('92'):
             try:
-                controller_info = AKShareClient.get_stock_controller_info(code)
-                if controller_info:
-                    actual_controller = controller_info.get('actual_controller')
-                    if actual_controller:
-                        # 根据实际控制人推断企业性质
-                        controller_str = str(actual_controller).strip()
-                        if '国务院' in controller_str or '国资委' in controller_str or '国有资产' in controller_str:
-                            basic_info['company_type'] = '央企国资控股'
-                        elif '省' in controller_str and ('国资委' in controller_str or '国有资产' in controller_str):
-                            basic_info['company_type'] = '地方国资控股'
-                        elif '市' in controller_str and ('国资委' in controller_str or '国有资产' in controller_str):
-                            basic_info['company_type'] = '地方国资控股'
-                        elif '人民政府' in controller_str:
-                            basic_info['company_type'] = '地方国资控股'
-                        elif '集体' in controller_str:
-                            basic_info['company_type'] = '集体企业'
-                        elif '外资' in controller_str or '外商' in controller_str:
-                            basic_info['company_type'] = '外资企业'
-                        else:
-                            # 默认为民企
-                            basic_info['company_type'] = '民企'
-                        logger.debug(f"从控制人信息推断股票 {code} 企业性质: {basic_info['company_type']}")
+                company_type = (AKShareClient.get_company_type_guesses() or {}).get(code)
+                if company_type:
+                    basic_info['company_type'] = company_type
+                    logger.debug(f"从控制人信息推断股票 {code} 企业性质: {company_type}")
             except Exception as e:
                 logger.debug(f"从控制人信息推断股票 {code} 企业性质失败: {e}")
         
@@ -239,18 +365,18 @@ class AKShareClient:
     
     @staticmethod
     @cached_api_call(_cache_stock_list, ttl=3600)  # 1小时缓存
-    def get_stock_list() -> List[Dict[str, any]]:
+    def get_stock_list() -> List[StockRecord]:
         """
         获取A股股票列表
         
         Returns:
-            股票列表，每个元素包含股票代码、名称等信息
+            股票列表，每个元素为 StockRecord（code、name、market，支持字典式读取）
         """
         try:
             logger.info("开始获取A股股票列表...")
             
             # 获取A股股票列表
-            stock_info = ak.stock_info_a_code_name()
+            stock_info = AKShareClient._as_arrow(ak.stock_info_a_code_name())
             
             if stock_info is None or stock_info.empty:
                 logger.warning("未获取到股票数据")
@@ -258,25 +384,29 @@ class AKShareClient:
             
             logger.info(f"成功获取 {len(stock_info)} 只股票")
             
-            # 转换为字典列表
-            stocks = []
-            for _, row in stock_info.iterrows():
-                # 处理不同的列名可能（code/code, name/name）
-                code = str(row.get('code', row.get('股票代码', ''))).strip()
-                name = str(row.get('name', row.get('股票名称', ''))).strip()
-                
-                if not code or not name:
-                    continue
-                
-                # 解析市场代码（SH/SZ/BJ）
-                # 6开头是上海，0/3开头是深圳，8/92开头是北京
-                market = AKShareClient._get_market_from_code(code)
-                
-                stocks.append({
-                    'code': code,
-                    'name': name,
-                    'market': market,
-                })
+            # 按列整体处理（不同版本可能为 code/name 或 股票代码/股票名称）
+            df = stock_info.rename(columns={'股票代码': 'code', '股票名称': 'name'})
+            codes = df['code'].fillna('').astype(str).str.strip()
+            names = df['name'].fillna('').astype(str).str.strip()
+            
+            # 跳过代码或名称为空的行
+            valid = (codes != '') & (names != '')
+            codes = codes[valid]
+            names = names[valid]
+            
+            # 解析市场代码（SH/SZ/BJ）
+            # 6开头是上海，0/3开头是深圳，8/92开头是北京，其他默认深圳
+            # 与 _get_market_from_code 使用同一张首位查找表
+            markets = np.where(
+                codes.str[:2] == '92',
+                'BJ',
+                codes.str[:1].map(_MARKET_BY_FIRST_CHAR).fillna('SZ')
+            )
+            
+            stocks = [
+                StockRecord(code=code, name=name, market=market)
+                for code, name, market in zip(codes.tolist(), names.tolist(), markets.tolist())
+            ]
             
             logger.info(f"成功解析 {len(stocks)} 只股票")
             return stocks
@@ -305,14 +435,18 @@ class AKShareClient:
         return basic_info.get('list_date') if basic_info else None
     
     @staticmethod
-    def enrich_stock_info(stocks: List[Dict[str, any]], 
-                          include_list_date: bool = True) -> List[Dict[str, any]]:
+    def enrich_stock_info(stocks: List[StockRecord], 
+                          include_list_date: bool = True,
+                          max_workers: int = 16) -> List[StockRecord]:
         """
         丰富股票信息，添加上市日期等
         
+        各股票的基本信息请求互不依赖且以网络等待为主，使用线程池并发获取。
+        
         Args:
-            stocks: 股票列表
+            stocks: 股票列表（StockRecord 或字典）
             include_list_date: 是否包含上市日期
+            max_workers: 并发请求的线程数（受数据源限流约束，不宜过大）
             
         Returns:
             丰富后的股票列表
@@ -321,22 +455,40 @@ class AKShareClient:
             return stocks
         
         logger.info("开始获取股票上市日期...")
-        enriched_stocks = []
         
-        for i, stock in enumerate(stocks, 1):
+        # 先直接查内存缓存，只有未命中的股票才进入线程池
+        results = {}
+        misses = []
+        for stock in stocks:
             code = stock['code']
-            if i % 100 == 0:
-                logger.info(f"已处理 {i}/{len(stocks)} 只股票")
-            
-            # 使用统一方法获取基本信息（包含上市日期）
-            basic_info = AKShareClient.get_stock_basic_info(code)
+            cached = AKShareClient.get_stock_basic_info.peek(code)
+            if cached is CACHE_MISS:
+                misses.append(code)
+            else:
+                results[code] = cached
+        logger.info(f"缓存命中 {len(results)} 只，需要请求 {len(misses)} 只")
+        
+        if misses:
+            # 92开头的股票可能需要从控制人数据推断企业性质；先在主线程加载一次批量数据，
+            # 避免多个工作线程同时缓存未命中而重复请求整表
+            if any(code.startswith('92') for code in misses):
+                AKShareClient.get_company_type_guesses()
+            
+            # 使用统一方法获取基本信息（包含上市日期）；map 按输入顺序返回结果
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = executor.map(AKShareClient.get_stock_basic_info, misses)
+                for i, (code, basic_info) in enumerate(zip(misses, fetched), 1):
+                    results[code] = basic_info
+                    if i % 100 == 0:
+                        logger.info(f"已处理 {i}/{len(misses)} 只股票")
+        
+        for stock in stocks:
+            basic_info = results.get(stock['code'])
             if basic_info:
                 stock['list_date'] = basic_info.get('list_date')
-            
-            enriched_stocks.append(stock)
         
         logger.info("股票信息丰富完成")
-        return enriched_stocks
+        return stocks
     
     @staticmethod
     def get_stock_company_info(code: str, basic_info: Optional[Dict[str, any]] = None) -> Optional[Dict[str, any]]:
@@ -416,37 +568,46 @@ class AKShareClient:
             if shareholders_df is None or shareholders_df.empty:
                 return []
             
-            shareholders = []
-            for _, row in shareholders_df.iterrows():
-                # 使用实际的列名
-                shareholder_name = str(row.get('股东名称', '')).strip()
-                holding_ratio = AKShareClient._parse_float(row.get('持股比例', 0))
-                holding_amount = AKShareClient._parse_int(row.get('持股数量', 0))
-                report_date = AKShareClient._parse_date(row.get('截至日期', row.get('公告日期', '')))
-                
-                if not shareholder_name or shareholder_name == 'nan':
-                    continue
-                
-                shareholder = {
+            # 跳过股东名称为空的行
+            names = shareholders_df['股东名称'].fillna('').astype(str).str.strip()
+            df = shareholders_df[~names.str.lower().isin(_NULL_STRINGS)]
+            names = names[df.index]
+            
+            # 报告日期整列一次解析
+            report_dates = AKShareClient._parse_dates(
+                AKShareClient._first_column(df, ('截至日期', '公告日期'), None)
+            )
+            holding_ratios = AKShareClient._none_if_na(
+                AKShareClient._parse_float_series(AKShareClient._first_column(df, ('持股比例',)))
+            )
+            holding_amounts = AKShareClient._none_if_na(
+                AKShareClient._parse_int_series(AKShareClient._first_column(df, ('持股数量',)))
+            )
+            
+            # 判断股东类型：机构 > 法人 > 个人
+            institution = names.str.contains('银行|基金|保险|投资', regex=True)
+            corporation = names.str.contains('公司|集团|有限', regex=True)
+            shareholder_types = np.where(institution, '机构', np.where(corporation, '法人', '个人'))
+            
+            shareholders = [
+                {
                     'code': code,
-                    'shareholder_name': shareholder_name,
+                    'shareholder_name': name,
                     'holding_ratio': holding_ratio,
                     'holding_amount': holding_amount,
                     'change_amount': None,  # stock_main_stock_holder不提供变化数据
                     'change_ratio': None,
                     'report_date': report_date,
+                    'shareholder_type': str(shareholder_type),
                 }
-                
-                # 判断股东类型
-                name = shareholder['shareholder_name']
-                if '银行' in name or '基金' in name or '保险' in name or '投资' in name:
-                    shareholder['shareholder_type'] = '机构'
-                elif '公司' in name or '集团' in name or '有限' in name:
-                    shareholder['shareholder_type'] = '法人'
-                else:
-                    shareholder['shareholder_type'] = '个人'
-                
-                shareholders.append(shareholder)
+                for name, holding_ratio, holding_amount, report_date, shareholder_type in zip(
+                    names.tolist(),
+                    holding_ratios,
+                    holding_amounts,
+                    report_dates.tolist(),
+                    shareholder_types,
+                )
+            ]
             
             return shareholders
             
@@ -477,23 +638,20 @@ class AKShareClient:
             
             if spot_xq is not None and not spot_xq.empty:
                 # 转换为字典格式便于查找
-                spot_dict = {}
-                for _, row in spot_xq.iterrows():
-                    item = str(row.get('item', ''))
-                    value = row.get('value', '')
-                    spot_dict[item] = value
+                spot_dict = dict(zip(spot_xq['item'].astype(str).tolist(), spot_xq['value'].tolist()))
+                first = AKShareClient._first
                 
                 # 提取市值信息
                 # 总市值: "资产净值/总市值"
-                total_market_cap = AKShareClient._parse_float(spot_dict.get('资产净值/总市值', spot_dict.get('总市值', 0)))
+                total_market_cap = AKShareClient._parse_float(first(spot_dict, ('资产净值/总市值', '总市值'), 0))
                 # 流通市值: "流通值"
-                circulating_market_cap = AKShareClient._parse_float(spot_dict.get('流通值', spot_dict.get('流通市值', 0)))
+                circulating_market_cap = AKShareClient._parse_float(first(spot_dict, ('流通值', '流通市值'), 0))
                 # 总股本: "基金份额/总股本"
-                total_shares = AKShareClient._parse_int(spot_dict.get('基金份额/总股本', spot_dict.get('总股本', 0)))
+                total_shares = AKShareClient._parse_int(first(spot_dict, ('基金份额/总股本', '总股本'), 0))
                 # 流通股: "流通股"
                 circulating_shares = AKShareClient._parse_int(spot_dict.get('流通股', 0))
                 # 最新价: "最新" 或 "现价"
-                price = AKShareClient._parse_float(spot_dict.get('最新', spot_dict.get('现价', spot_dict.get('最新价', 0))))
+                price = AKShareClient._parse_float(first(spot_dict, ('最新', '现价', '最新价'), 0))
                 
                 if total_market_cap or circulating_market_cap:
                     market_value = {
@@ -532,41 +690,29 @@ class AKShareClient:
         try:
             logger.info("批量获取所有A股市值信息...")
             # 尝试使用 stock_zh_a_spot_em 批量获取
-            spot_df = ak.stock_zh_a_spot_em()
+            spot_df = AKShareClient._as_arrow(ak.stock_zh_a_spot_em())
             
             if spot_df is not None and not spot_df.empty:
-                market_values = []
-                for _, row in spot_df.iterrows():
-                    code = str(row.get('代码', row.get('code', ''))).strip()
-                    if not code:
-                        continue
-                    
-                    # 提取市值信息
-                    total_market_cap = AKShareClient._parse_float(
-                        row.get('总市值', row.get('总市值(元)', 0))
-                    )
-                    circulating_market_cap = AKShareClient._parse_float(
-                        row.get('流通市值', row.get('流通市值(元)', 0))
-                    )
-                    price = AKShareClient._parse_float(
-                        row.get('最新价', row.get('现价', 0))
-                    )
-                    total_shares = AKShareClient._parse_int(
-                        row.get('总股本', row.get('总股本(股)', 0))
-                    )
-                    circulating_shares = AKShareClient._parse_int(
-                        row.get('流通股', row.get('流通股(股)', 0))
-                    )
-                    
-                    if total_market_cap or circulating_market_cap:
-                        market_values.append({
-                            'code': code,
-                            'total_market_cap': total_market_cap,
-                            'circulating_market_cap': circulating_market_cap,
-                            'price': price,
-                            'total_shares': total_shares,
-                            'circulating_shares': circulating_shares,
-                        })
+                column = AKShareClient._first_column
+                parse_float = AKShareClient._parse_float_series
+                parse_int = AKShareClient._parse_int_series
+                df = pd.DataFrame({
+                    'code': column(spot_df, ('代码', 'code'), '').fillna('').astype(str).str.strip(),
+                    'total_market_cap': parse_float(column(spot_df, ('总市值', '总市值(元)'))),
+                    'circulating_market_cap': parse_float(column(spot_df, ('流通市值', '流通市值(元)'))),
+                    'price': parse_float(column(spot_df, ('最新价', '现价'))),
+                    'total_shares': parse_int(column(spot_df, ('总股本', '总股本(股)'))),
+                    'circulating_shares': parse_int(column(spot_df, ('流通股', '流通股(股)'))),
+                })
+                
+                # 只保留有代码且总市值或流通市值非零的股票
+                has_value = (df['total_market_cap'].fillna(0) != 0) | (df['circulating_market_cap'].fillna(0) != 0)
+                df = df[(df['code'] != '') & has_value]
+                # 原始行情表已不再需要（几十列），尽早释放
+                del spot_df
+                
+                # 缺失值统一转为 None
+                market_values = df.astype(object).where(df.notna(), None).to_dict('records')
                 
                 logger.info(f"成功批量获取 {len(market_values)} 只股票的市值信息")
                 return market_values
@@ -575,6 +721,49 @@ class AKShareClient:
         
         return None
     
+    @staticmethod
+    @cached_api_call(_cache_profit_sheet)
+    def _fetch_profit_sheet(code: str) -> Optional[pd.DataFrame]:
+        """
+        获取股票利润表原始数据（按报告期）
+        
+        get_stock_income_statements 与 get_stock_financial_data 共用同一份数据，
+        前者失败回退到后者时不会再次请求同一接口。原始数据只在内存中缓存1小时
+        （见 cache_manager._cache_profit_sheet），长期缓存的是两个接口解析后的结果。
+        
+        Args:
+            code: 股票代码
+            
+        Returns:
+            利润表DataFrame（调用方只读，不要原地修改），未取得数据时返回None（不缓存）
+        """
+        # 转换代码格式：000001 -> SZ000001, 600519 -> SH600519, 920139 -> BJ920139
+        symbol_code = AKShareClient._convert_code_to_symbol(code)
+        df = ak.stock_profit_sheet_by_report_em(symbol=symbol_code)
+        if df is None or df.empty:
+            return None
+        return df
+    
+    @staticmethod
+    def get_batch_income_statements(codes: List[str],
+                                    max_workers: int = 4) -> Dict[str, Optional[List[Dict[str, any]]]]:
+        """
+        并发获取多只股票的利润表数据
+        
+        各股票的请求互不依赖，使用线程池重叠网络等待；结果同时写入
+        get_stock_income_statements 的缓存，后续逐只处理时直接命中。
+        
+        Args:
+            codes: 股票代码列表
+            max_workers: 并发请求的线程数（受数据源限流约束，不宜过大）
+            
+        Returns:
+            股票代码到利润表数据列表的字典（获取失败的为None）
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(AKShareClient.get_stock_income_statements, codes)
+            return dict(zip(codes, results))
+    
     @staticmethod
     @cached_api_call(_cache_stock_financial, ttl=86400)  # 24小时缓存
     def get_stock_financial_data(code: str, period: str = "latest") -> Optional[Dict[str, any]]:
@@ -593,26 +782,25 @@ class AKShareClient:
             
             # 获取利润表
             try:
-                # 转换代码格式：000001 -> SZ000001, 600519 -> SH600519, 920139 -> BJ920139
-                symbol_code = AKShareClient._convert_code_to_symbol(code)
-                income_statement = ak.stock_profit_sheet_by_report_em(symbol=symbol_code)
+                income_statement = AKShareClient._fetch_profit_sheet(code)
                 if income_statement is not None and not income_statement.empty:
-                    latest_row = income_statement.iloc[-1]
+                    # 最新一期转为字典一次，之后按候选列名 O(1) 查找
+                    row = income_statement.iloc[-1].to_dict()
                     financial_data['income'] = {
                         'report_date': AKShareClient._parse_date(
-                            latest_row.get('REPORT_DATE', latest_row.get('报告日期', latest_row.get('日期', '')))
+                            AKShareClient._first(row, ('REPORT_DATE', '报告日期', '日期'), '')
                         ),
                         'total_revenue': AKShareClient._parse_float(
-                            latest_row.get('OPERATE_INCOME', latest_row.get('营业总收入', latest_row.get('营业收入', 0)))
+                            AKShareClient._first(row, ('OPERATE_INCOME', '营业总收入', '营业收入'), 0)
                         ),
                         'operating_revenue': AKShareClient._parse_float(
-                            latest_row.get('OPERATE_INCOME', latest_row.get('营业收入', latest_row.get('营收', 0)))
+                            AKShareClient._first(row, ('OPERATE_INCOME', '营业收入', '营收'), 0)
                         ),
                         'net_profit': AKShareClient._parse_float(
-                            latest_row.get('NETPROFIT', latest_row.get('净利润', latest_row.get('净利', 0)))
+                            AKShareClient._first(row, ('NETPROFIT', '净利润', '净利'), 0)
                         ),
                         'net_profit_attributable': AKShareClient._parse_float(
-                            latest_row.get('PARENT_NETPROFIT', latest_row.get('归属于母公司所有者的净利润', latest_row.get('归母净利润', 0)))
+                            AKShareClient._first(row, ('PARENT_NETPROFIT', '归属于母公司所有者的净利润', '归母净利润'), 0)
                         ),
                     }
             except Exception as e:
@@ -639,9 +827,7 @@ class AKShareClient:
             利润表数据列表，每个元素包含一个报告期的数据
         """
         try:
-            # 转换代码格式：000001 -> SZ000001, 600519 -> SH600519, 920139 -> BJ920139
-            symbol_code = AKShareClient._convert_code_to_symbol(code)
-            income_statement_df = ak.stock_profit_sheet_by_report_em(symbol=symbol_code)
+            income_statement_df = AKShareClient._fetch_profit_sheet(code)
             
             if income_statement_df is None or income_statement_df.empty:
                 logger.debug(f"股票 {code} 未获取到利润表数据")
@@ -649,24 +835,23 @@ class AKShareClient:
             
             income_statements = []
             
-            for _, row in income_statement_df.iterrows():
+            for row in income_statement_df.to_dict('records'):
                 # 解析报告日期
                 report_date = AKShareClient._parse_date(
-                    row.get('REPORT_DATE', row.get('报告日期', row.get('日期', '')))
+                    AKShareClient._first(row, ('REPORT_DATE', '报告日期', '日期'), '')
                 )
                 if not report_date:
                     continue
                 
                 # 解析报告类型和报告期
-                report_type = row.get('REPORT_TYPE', row.get('报告类型', ''))
-                report_date_name = row.get('REPORT_DATE_NAME', row.get('报告期名称', ''))
+                report_type = AKShareClient._first(row, ('REPORT_TYPE', '报告类型'), '')
+                report_date_name = AKShareClient._first(row, ('REPORT_DATE_NAME', '报告期名称'), '')
                 
                 # 从报告日期名称中提取报告期（如：2024三季报 -> 2024Q3）
                 report_period = None
                 if report_date_name:
                     # 尝试从报告期名称中提取年份和季度
-                    import re
-                    year_match = re.search(r'(\d{4})', str(report_date_name))
+                    year_match = _YEAR_RE.search(str(report_date_name))
                     if year_match:
                         year = year_match.group(1)
                         if '一季报' in str(report_date_name) or 'Q1' in str(report_date_name):
@@ -687,31 +872,31 @@ class AKShareClient:
                     'report_period': report_period,
                     'report_type': str(report_type) if report_type else None,
                     'total_revenue': AKShareClient._parse_float(
-                        row.get('OPERATE_INCOME', row.get('营业总收入', row.get('营业收入', None)))
+                        AKShareClient._first(row, ('OPERATE_INCOME', '营业总收入', '营业收入'))
                     ),
                     'operating_revenue': AKShareClient._parse_float(
-                        row.get('OPERATE_INCOME', row.get('营业收入', None))
+                        AKShareClient._first(row, ('OPERATE_INCOME', '营业收入'))
                     ),
                     'operating_cost': AKShareClient._parse_float(
-                        row.get('OPERATE_EXPENSE', row.get('营业成本', row.get('营业支出', None)))
+                        AKShareClient._first(row, ('OPERATE_EXPENSE', '营业成本', '营业支出'))
                     ),
                     'operating_profit': AKShareClient._parse_float(
-                        row.get('OPERATE_PROFIT', row.get('营业利润', None))
+                        AKShareClient._first(row, ('OPERATE_PROFIT', '营业利润'))
                     ),
                     'total_profit': AKShareClient._parse_float(
-                        row.get('TOTAL_PROFIT', row.get('利润总额', None))
+                        AKShareClient._first(row, ('TOTAL_PROFIT', '利润总额'))
                     ),
                     'net_profit': AKShareClient._parse_float(
-                        row.get('NETPROFIT', row.get('净利润', None))
+                        AKShareClient._first(row, ('NETPROFIT', '净利润'))
                     ),
                     'net_profit_attributable': AKShareClient._parse_float(
-                        row.get('PARENT_NETPROFIT', row.get('归属于母公司所有者的净利润', row.get('归母净利润', None)))
+                        AKShareClient._first(row, ('PARENT_NETPROFIT', '归属于母公司所有者的净利润', '归母净利润'))
                     ),
                     'basic_eps': AKShareClient._parse_float(
-                        row.get('BASIC_EPS', row.get('基本每股收益', None))
+                        AKShareClient._first(row, ('BASIC_EPS', '基本每股收益'))
                     ),
                     'diluted_eps': AKShareClient._parse_float(
-                        row.get('DILUTED_EPS', row.get('稀释每股收益', None))
+                        AKShareClient._first(row, ('DILUTED_EPS', '稀释每股收益'))
                     ),
                 }
                 
@@ -727,8 +912,6 @@ class AKShareClient:
     @staticmethod
     def _parse_float(value: any) -> Optional[float]:
         """解析浮点数，将NaN转换为None"""
-        import math
-        
         if value is None:
             return None
         
@@ -742,14 +925,10 @@ class AKShareClient:
         try:
             if isinstance(value, str):
                 # 检查字符串是否为NaN
-                if value.lower() in ['nan', 'none', 'null', '']:
+                if value.lower() in _NULL_STRINGS:
                     return None
-                # 移除可能的单位符号
-                value = value.replace('元', '').replace('万', '').replace('亿', '').strip()
-                # 处理百分比
-                if '%' in value:
-                    value = value.replace('%', '').strip()
-                result = float(value)
+                # 移除可能的单位符号、百分号和千分位分隔符
+                result = float(value.translate(_FLOAT_STRIP_TABLE).strip())
                 # 再次检查结果是否为NaN
                 if math.isnan(result):
                     return None
@@ -769,8 +948,7 @@ class AKShareClient:
             return None
         try:
             if isinstance(value, str):
-                value = value.replace(',', '').replace('股', '').strip()
-                return int(float(value))
+                return int(float(value.translate(_INT_STRIP_TABLE).strip()))
             return int(float(value))
         except (ValueError, TypeError):
             return None
@@ -778,7 +956,7 @@ class AKShareClient:
     @staticmethod
     def _parse_date(value: any) -> Optional[str]:
         """解析日期"""
-        if value is None:
+        if AKShareClient._is_missing(value):
             return None
         try:
             # 如果是 datetime 对象，直接格式化
@@ -807,6 +985,69 @@ class AKShareClient:
         except Exception:
             return None
     
+    @staticmethod
+    def _parse_float_series(values: pd.Series) -> pd.Series:
+        """
+        批量解析浮点数列（_parse_float 的整列版本）
+        
+        Args:
+            values: 数值列（可能包含带单位的字符串）
+            
+        Returns:
+            float64 列，无法解析的值为NaN
+        """
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str).str.replace(_NUMERIC_STRIP_RE, '', regex=True)
+        return pd.to_numeric(values, errors='coerce').astype('float64')
+    
+    @staticmethod
+    def _parse_int_series(values: pd.Series) -> pd.Series:
+        """
+        批量解析整数列（_parse_int 的整列版本，小数部分截断）
+        
+        Args:
+            values: 数值列（可能包含带单位的字符串）
+            
+        Returns:
+            Int64 列，无法解析的值为NA
+        """
+        return np.trunc(AKShareClient._parse_float_series(values)).astype('Int64')
+    
+    @staticmethod
+    def _none_if_na(values: pd.Series) -> list:
+        """
+        将列转换为 Python 对象列表，缺失值（NaN/NA）转为None
+        
+        Args:
+            values: 数据列
+            
+        Returns:
+            值列表
+        """
+        return values.astype(object).where(values.notna(), None).tolist()
+    
+    @staticmethod
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """
+        批量解析日期列（_parse_date 的整列版本）
+        
+        先用 pd.to_datetime 整列解析，无法识别的非空值（如"2024年12月31日"）
+        再逐个交给 _parse_date 处理。
+        
+        Args:
+            values: 日期值列
+            
+        Returns:
+            YYYY-MM-DD 格式的字符串列，空值为None
+        """
+        parsed = pd.to_datetime(values, errors='coerce', **_MIXED_DATE_KWARGS)
+        result = parsed.dt.strftime('%Y-%m-%d').astype(object).where(parsed.notna(), None)
+        
+        unparsed = parsed.isna() & values.notna()
+        if unparsed.any():
+            result[unparsed] = values[unparsed].map(AKShareClient._parse_date)
+        return result
+    
     @staticmethod
     @cached_api_call(_cache_stock_controller, ttl=86400)  # 24小时缓存
     def get_all_controller_data():
@@ -821,22 +1062,50 @@ class AKShareClient:
             df = ak.stock_hold_control_cninfo(symbol='全部')
             if df is not None and not df.empty:
                 logger.info(f"成功获取 {len(df)} 条控制人数据")
+                # 重复值多的文本列转为分类类型：缓存（含磁盘缓存）占用更小，按列比较变为整数比较
+                for column in _CONTROLLER_CATEGORY_COLUMNS:
+                    if column in df.columns:
+                        df[column] = df[column].astype('category')
             return df
         except Exception as e:
             logger.error(f"批量获取所有股票控制人数据失败: {e}")
             return None
     
     @staticmethod
-    @lru_cache(maxsize=1)
     def _get_all_controller_data():
         """
-        获取所有股票的控制人数据（缓存整个数据集）- 内部方法，保留以兼容旧代码
+        获取所有股票的控制人数据 - 内部方法，保留以兼容旧代码
+        
+        数据集只由 get_all_controller_data 的 TimedCache 缓存（24小时过期），
+        过期或清除缓存后即可释放，不再额外用 lru_cache 长期持有。
+        TTL 为24小时的结果同时写入磁盘缓存（见 cache_manager.DiskCache），
+        新进程启动后直接从磁盘读取，不再重新请求接口；clear_caches() 会一并清除。
         
         Returns:
             所有股票的控制人DataFrame
         """
         return AKShareClient.get_all_controller_data()
     
+    @staticmethod
+    def _clean_text_column(df, column: str, null_values: tuple = ()) -> pd.Series:
+        """
+        整列清洗文本字段：去除首尾空白，缺失值、空白及 "nan"/"None"/"null" 文本、null_values 中的值转为缺失
+        
+        Args:
+            df: 数据表
+            column: 列名（不存在时返回全缺失的列）
+            null_values: 额外视为无值的文本
+            
+        Returns:
+            object 类型的列，无值处为 None
+        """
+        if column not in df.columns:
+            return pd.Series(None, index=df.index, dtype=object)
+        values = df[column]
+        text = values.astype(_TEXT_DTYPE).str.strip()
+        invalid = values.isna() | text.str.lower().isin(_NULL_STRINGS) | text.isin(null_values)
+        return text.astype(object).where(~invalid, None)
+    
     @staticmethod
     def parse_all_controller_data(df) -> Dict[str, Dict[str, any]]:
         """
@@ -851,67 +1120,119 @@ class AKShareClient:
         if df is None or df.empty:
             return {}
         
-        controller_dict = {}
+        # 每只股票取变动日期最新的记录：只对日期的 int64 视图做一次稳定 argsort，
+        # 倒序后每个代码第一次出现的位置即最新记录，最后只按选中的行号取一次子表
+        # （变动日期缺失/无法解析的视为最早，只有全部缺失时才会被选中；同日期取靠后的行）
+        change_dates = pd.to_datetime(df['变动日期'], errors='coerce', **_MIXED_DATE_KWARGS)
+        order = np.argsort(change_dates.to_numpy(dtype='datetime64[ns]').view('i8'), kind='stable')[::-1]
+        first_seen = ~pd.Series(df['证券代码'].to_numpy()[order]).duplicated().to_numpy()
+        picked = np.sort(order[first_seen])
+        latest = df.iloc[picked]
         
-        # 按股票代码分组，获取每个股票的最新记录
-        for code in df['证券代码'].unique():
-            stock_data = df[df['证券代码'] == code]
-            if stock_data.empty:
-                continue
-            
-            # 获取最新的记录（按变动日期排序）
-            latest = stock_data.sort_values('变动日期', ascending=False).iloc[0]
-            
-            controller_info = {
-                'actual_controller': None,
-                'direct_controller': None,
-                'control_ratio': None,
-                'control_type': None,
-                'change_date': None,
+        # 整列清洗文本字段（缺失、空白及 "nan"/"None"/"null" 文本视为无值；实际控制人另外排除"无"）
+        actual_controller = AKShareClient._clean_text_column(latest, '实际控制人名称', ('无',))
+        direct_controller = AKShareClient._clean_text_column(latest, '直接控制人名称')
+        control_type = AKShareClient._clean_text_column(latest, '控制类型')
+        
+        # 控股比例：已是数值列时直接使用；否则去掉百分号后整列转数值，无法解析的为空
+        if '控股比例' not in latest.columns:
+            control_ratio = pd.Series(np.nan, index=latest.index)
+        elif pd.api.types.is_numeric_dtype(latest['控股比例']):
+            control_ratio = latest['控股比例'].astype('float64')
+        else:
+            ratios = pd.to_numeric(
+                latest['控股比例'].astype(_TEXT_DTYPE).str.rstrip('%').str.strip(),
+                errors='coerce'
+            )
+            control_ratio = pd.Series(ratios.to_numpy(dtype='float64', na_value=np.nan), index=latest.index)
+        
+        # 变动日期：能解析的统一为 YYYY-MM-DD，其他非空值保留原文
+        raw_dates = latest['变动日期']
+        parsed_dates = change_dates.iloc[picked]
+        change_date = parsed_dates.dt.strftime('%Y-%m-%d').astype(object)
+        unparsed = parsed_dates.isna() & raw_dates.notna() & (raw_dates.astype(str) != '')
+        change_date[unparsed] = raw_dates[unparsed].astype(str)
+        
+        # 只有当有实际控制人或直接控制人时才添加
+        keep = (actual_controller.notna() | direct_controller.notna()).to_numpy()
+        
+        controller_dict = {
+            str(code): {
+                'actual_controller': actual,
+                'direct_controller': direct,
+                'control_ratio': ratio,
+                'control_type': ctype,
+                'change_date': changed,
             }
-            
-            # 提取实际控制人（如果不是"无"）
-            actual_controller = latest.get('实际控制人名称', '')
-            if actual_controller and str(actual_controller).strip() != '无' and str(actual_controller).strip() != 'nan':
-                controller_info['actual_controller'] = str(actual_controller).strip()
-            
-            # 提取直接控制人
-            direct_controller = latest.get('直接控制人名称', '')
-            if direct_controller and str(direct_controller).strip() != 'nan':
-                controller_info['direct_controller'] = str(direct_controller).strip()
-            
-            # 提取控股比例
-            control_ratio = latest.get('控股比例', None)
-            if control_ratio is not None:
-                try:
-                    ratio_str = str(control_ratio).replace('%', '').strip()
-                    controller_info['control_ratio'] = float(ratio_str) if ratio_str else None
-                except (ValueError, TypeError):
-                    pass
-            
-            # 提取控制类型
-            control_type = latest.get('控制类型', '')
-            if control_type and str(control_type).strip() != 'nan':
-                controller_info['control_type'] = str(control_type).strip()
-            
-            # 提取变动日期
-            change_date = latest.get('变动日期', '')
-            if change_date:
-                try:
-                    if isinstance(change_date, str):
-                        date_obj = datetime.strptime(change_date, '%Y-%m-%d')
-                        controller_info['change_date'] = date_obj.strftime('%Y-%m-%d')
-                    else:
-                        controller_info['change_date'] = str(change_date)
-                except (ValueError, TypeError):
-                    controller_info['change_date'] = str(change_date)
-            
-            # 只有当有实际控制人或直接控制人时才添加
-            if controller_info['actual_controller'] or controller_info['direct_controller']:
-                controller_dict[str(code)] = controller_info
+            for code, actual, direct, ratio, ctype, changed in zip(
+                latest['证券代码'].to_numpy()[keep],
+                AKShareClient._none_if_na(actual_controller[keep]),
+                AKShareClient._none_if_na(direct_controller[keep]),
+                AKShareClient._none_if_na(control_ratio[keep]),
+                AKShareClient._none_if_na(control_type[keep]),
+                AKShareClient._none_if_na(change_date[keep]),
+            )
+        }
         
         return controller_dict
     
+    @staticmethod
+    @cached_api_call(_cache_stock_controller, ttl=86400)  # 24小时缓存
+    def get_all_controller_info() -> Optional[Dict[str, Dict[str, any]]]:
+        """
+        获取所有股票解析后的控制人信息（带缓存）
+        
+        整表只解析一次，之后按代码查找控制人信息都是字典查找。
+        
+        Returns:
+            字典，key为股票代码，value为控制人信息字典；批量数据获取失败时返回None（不缓存）
+        """
+        df = AKShareClient._get_all_controller_data()
+        if df is None:
+            return None
+        return AKShareClient.parse_all_controller_data(df)
+    
+    @staticmethod
+    @cached_api_call(_cache_stock_controller, ttl=86400)  # 24小时缓存
+    def get_company_type_guesses() -> Optional[Dict[str, str]]:
+        """
+        根据实际控制人批量推断所有股票的企业性质
+        
+        对整列实际控制人名称做一次向量化匹配（按顺序取第一个命中的规则）：
+        - 国务院/国资委/国有资产 -> 央企国资控股
+        - 人民政府 -> 地方国资控股
+        - 集体 -> 集体企业
+        - 外资/外商 -> 外资企业
+        - 其他 -> 民企
+        
+        Returns:
+            字典，key为股票代码，value为推断的企业性质（仅包含有实际控制人的股票）；
+            控制人数据获取失败时返回None（不缓存，下次调用重新获取）
+        """
+        controller_dict = AKShareClient.get_all_controller_info()
+        if controller_dict is None:
+            return None
+        
+        controllers = pd.Series(
+            {code: info['actual_controller'] for code, info in controller_dict.items()
+             if info.get('actual_controller')},
+            dtype=object
+        )
+        if controllers.empty:
+            return {}
+        
+        guesses = np.select(
+            [
+                controllers.str.contains('国务院|国资委|国有资产', regex=True),
+                controllers.str.contains('人民政府', regex=False),
+                controllers.str.contains('集体', regex=False),
+                controllers.str.contains('外资|外商', regex=True),
+            ],
+            ['央企国资控股', '地方国资控股', '集体企业', '外资企业'],
+            default='民企'
+        )
+        return dict(zip(controllers.index, guesses.tolist()))
+    
     @staticmethod
     def get_stock_controller_info(code: str) -> Optional[Dict[str, any]]:
         """
@@ -931,67 +1252,9 @@ class AKShareClient:
             - change_date: 变动日期
         """
         try:
-            # 从缓存获取所有股票的控制人信息
-            df = AKShareClient._get_all_controller_data()
-            
-            if df is not None and not df.empty:
-                # 查找对应股票的数据
-                stock_data = df[df['证券代码'] == code]
-                
-                if not stock_data.empty:
-                    # 获取最新的记录（按变动日期排序）
-                    latest = stock_data.sort_values('变动日期', ascending=False).iloc[0]
-                    
-                    controller_info = {
-                        'actual_controller': None,
-                        'direct_controller': None,
-                        'control_ratio': None,
-                        'control_type': None,
-                        'change_date': None,
-                    }
-                    
-                    # 提取实际控制人（如果不是"无"）
-                    actual_controller = latest.get('实际控制人名称', '')
-                    if actual_controller and str(actual_controller).strip() != '无' and str(actual_controller).strip() != 'nan':
-                        controller_info['actual_controller'] = str(actual_controller).strip()
-                    
-                    # 提取直接控制人
-                    direct_controller = latest.get('直接控制人名称', '')
-                    if direct_controller and str(direct_controller).strip() != 'nan':
-                        controller_info['direct_controller'] = str(direct_controller).strip()
-                    
-                    # 提取控股比例
-                    control_ratio = latest.get('控股比例', None)
-                    if control_ratio is not None:
-                        try:
-                            # 移除百分号并转换为浮点数
-                            ratio_str = str(control_ratio).replace('%', '').strip()
-                            controller_info['control_ratio'] = float(ratio_str) if ratio_str else None
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # 提取控制类型
-                    control_type = latest.get('控制类型', '')
-                    if control_type and str(control_type).strip() != 'nan':
-                        controller_info['control_type'] = str(control_type).strip()
-                    
-                    # 提取变动日期
-                    change_date = latest.get('变动日期', '')
-                    if change_date:
-                        try:
-                            # 尝试解析日期
-                            if isinstance(change_date, str):
-                                date_obj = datetime.strptime(change_date, '%Y-%m-%d')
-                                controller_info['change_date'] = date_obj.strftime('%Y-%m-%d')
-                            else:
-                                controller_info['change_date'] = str(change_date)
-                        except (ValueError, TypeError):
-                            controller_info['change_date'] = str(change_date)
-                    
-                    logger.debug(f"成功获取股票 {code} 控制人信息")
-                    return controller_info if (controller_info['actual_controller'] or controller_info['direct_controller']) else None
-            
-            return None
+            # 从缓存的解析结果中按代码直接查找
+            controller_index = AKShareClient.get_all_controller_info()
+            return controller_index.get(str(code)) if controller_index else None
             
         except Exception as e:
             logger.debug(f"获取股票 {code} 控制人信息失败: {e}")
@@ -1002,16 +1265,12 @@ class AKShareClient:
         """清除所有缓存"""
         # 清除TimedCache缓存
         clear_caches()
-        # 清除lru_cache缓存
-        AKShareClient._get_all_controller_data.cache_clear()
         logger.info("所有AKShare API缓存已清除")
     
     @staticmethod
     def get_cache_stats() -> Dict[str, any]:
         """获取缓存统计信息"""
-        stats = get_cache_stats()
-        stats['controller_data_cache'] = AKShareClient._get_all_controller_data.cache_info()
-        return stats
+        return get_cache_stats()
     
     # ============================================
     # ETF（交易型开放式指数基金）相关方法
@@ -1039,9 +1298,9 @@ class AKShareClient:
             
             logger.info(f"成功获取 {len(etf_df)} 只 ETF")
             
-            # 转换为字典列表
+            # 转换为字典列表（to_dict('records') 一次性转为普通字典，避免 iterrows 逐行构造 Series）
             etfs = []
-            for _, row in etf_df.iterrows():
+            for row in etf_df.to_dict('records'):
                 # 兼容不同的列名
                 code = str(row.get('基金代码', row.get('代码', ''))).strip()
                 name = str(row.get('基金简称', row.get('名称', ''))).strip()
@@ -1175,27 +1434,32 @@ class AKShareClient:
                 logger.debug(f"ETF {code} 未获取到日线数据")
                 return None
             
-            daily_data = []
-            for _, row in daily_df.iterrows():
-                trade_date = AKShareClient._parse_date(row.get('日期', ''))
-                if not trade_date:
-                    continue
-                
-                data = {
-                    'code': code,
-                    'trade_date': trade_date,
-                    'open_price': AKShareClient._parse_float(row.get('开盘', None)),
-                    'high_price': AKShareClient._parse_float(row.get('最高', None)),
-                    'low_price': AKShareClient._parse_float(row.get('最低', None)),
-                    'close_price': AKShareClient._parse_float(row.get('收盘', None)),
-                    'volume': AKShareClient._parse_int(row.get('成交量', None)),
-                    'amount': AKShareClient._parse_float(row.get('成交额', None)),
-                    'change_amount': AKShareClient._parse_float(row.get('涨跌额', None)),
-                    'change_rate': AKShareClient._parse_float(row.get('涨跌幅', None)),
-                    'turnover': AKShareClient._parse_float(row.get('换手率', None)),
-                }
-                
-                daily_data.append(data)
+            # 整列解析日期和数值（与逐行 _parse_date/_parse_float/_parse_int 结果一致），
+            # 跳过日期无法解析的行，最后一次性组装记录
+            trade_dates = AKShareClient._parse_dates(AKShareClient._first_column(daily_df, ('日期',), None))
+            valid = trade_dates.notna().to_numpy()
+            
+            float_series = AKShareClient._parse_float_series
+            int_series = AKShareClient._parse_int_series
+            columns = {
+                'code': [code] * int(valid.sum()),
+                'trade_date': trade_dates[valid].tolist(),
+            }
+            for field, column, parse in (
+                ('open_price', '开盘', float_series),
+                ('high_price', '最高', float_series),
+                ('low_price', '最低', float_series),
+                ('close_price', '收盘', float_series),
+                ('volume', '成交量', int_series),
+                ('amount', '成交额', float_series),
+                ('change_amount', '涨跌额', float_series),
+                ('change_rate', '涨跌幅', float_series),
+                ('turnover', '换手率', float_series),
+            ):
+                values = parse(AKShareClient._first_column(daily_df, (column,), None))
+                columns[field] = AKShareClient._none_if_na(values[valid])
+            
+            daily_data = [dict(zip(columns, row)) for row in zip(*columns.values())]
             
             logger.debug(f"成功获取 ETF {code} 的 {len(daily_data)} 条日线数据")
             return daily_data if daily_data else None
@@ -1243,22 +1507,27 @@ class AKShareClient:
                 logger.debug(f"ETF {code} 未获取到净值数据")
                 return None
             
+            # to_dict('records') 一次性转为普通字典，避免 iterrows 逐行构造 Series
             net_values = []
-            for _, row in net_value_df.iterrows():
+            for row in net_value_df.to_dict('records'):
                 net_value_date = AKShareClient._parse_date(
                     row.get('净值日期', row.get('日期', ''))
                 )
                 if not net_value_date:
                     continue
                 
+                # 每个字段只取一次值
+                subscription_status = row.get('申购状态')
+                redemption_status = row.get('赎回状态')
+                
                 data = {
                     'code': code,
                     'net_value_date': net_value_date,
                     'unit_net_value': AKShareClient._parse_float(row.get('单位净值', None)),
                     'accumulated_net_value': AKShareClient._parse_float(row.get('累计净值', None)),
                     'daily_growth_rate': AKShareClient._parse_float(row.get('日增长率', None)),
-                    'subscription_status': str(row.get('申购状态', '')).strip() if row.get('申购状态') else None,
-                    'redemption_status': str(row.get('赎回状态', '')).strip() if row.get('赎回状态') else None,
+                    'subscription_status': None if AKShareClient._is_missing(subscription_status) else str(subscription_status).strip(),
+                    'redemption_status': None if AKShareClient._is_missing(redemption_status) else str(redemption_status).strip(),
                 }
                 
                 net_values.append(data)
@@ -0,0 +1,44 @@
+"""
+数据源客户端数据模型
+
+定义从数据源获取的记录结构。
+"""
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+
+@dataclass(slots=True)
+class StockRecord:
+    """
+    股票列表记录
+    
+    使用 __slots__，数千条记录时比字典占用更少内存。
+    同时支持 record['code'] / record.get('list_date') / record['list_date'] = ... 的字典式访问，
+    兼容按字典处理股票列表的代码。
+    """
+    code: str
+    name: str
+    market: str
+    list_date: Optional[str] = None
+    
+    def __getitem__(self, key: str) -> Any:
+        """按字段名读取（字典式访问）"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        """按字段名赋值（字典式访问）"""
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """按字段名读取，字段不存在时返回默认值"""
+        return getattr(self, key, default)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
@@ -5,6 +5,7 @@ Tushare数据获取客户端
 """
 import os
 import logging
+import threading
 import time
 from typing import Optional
 from datetime import datetime, timedelta
@@ -17,21 +18,7 @@ try:
     from dotenv import load_dotenv
 except ImportError:
     # 如果没有安装python-dotenv，使用简单的实现
-    def load_dotenv(dotenv_path=None):
-        """简单的.env文件加载实现"""
-        import os
-        if dotenv_path is None:
-            project_root = Path(__file__).parent.parent
-            dotenv_path = project_root / "database" / ".env"
-        
-        env_file = Path(dotenv_path)
-        if env_file.exists():
-            with open(env_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        os.environ[key.strip()] = value.strip()
+    from ..core._dotenv_fallback import load_dotenv
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +69,9 @@ class TushareClient:
             raise ValueError("TUSHARE_TOKEN未配置，请检查环境变量")
         self.pro = ts.pro_api()
         self.api_delay = api_delay if api_delay is not None else self.DEFAULT_API_DELAY
-        self._last_api_call_time = 0
+        # 下一次允许调用的时间（time.monotonic，不受系统时间调整影响），多线程共享客户端时加锁领取
+        self._next_call_time = 0.0
+        self._rate_lock = threading.Lock()
         logger.debug(f"Tushare客户端初始化成功，API延迟设置为 {self.api_delay} 秒")
     
     def convert_code_to_ts_code(self, code: str) -> str:
@@ -117,14 +106,20 @@ class TushareClient:
     
     def _wait_for_rate_limit(self):
         """
-        等待以确保不超过API调用频率限制
+        等待以确保不超过API调用频率限制（线程安全）
+        
+        加锁领取下一个调用时间段，在锁外等待，多线程并发时调用间隔仍不小于 api_delay。
         """
-        if self.api_delay > 0:
-            elapsed = time.time() - self._last_api_call_time
-            if elapsed < self.api_delay:
-                sleep_time = self.api_delay - elapsed
-                time.sleep(sleep_time)
-            self._last_api_call_time = time.time()
+        if self.api_delay <= 0:
+            return
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(self._next_call_time, now)
+            self._next_call_time = slot + self.api_delay
+        
+        if slot > now:
+            time.sleep(slot - now)
     
     def get_daily_data(
         self,
@@ -0,0 +1,38 @@
+"""
+python-dotenv 未安装时使用的简单 .env 文件加载实现
+
+只支持 KEY=VALUE 形式的行，忽略空行和 # 开头的注释行。
+"""
+import os
+from pathlib import Path
+
+
+def load_dotenv(dotenv_path=None, override: bool = False) -> bool:
+    """
+    简单的.env文件加载实现
+
+    Args:
+        dotenv_path: .env 文件路径，为None时使用项目根目录下的 .env
+        override: 是否覆盖已存在的环境变量（与 python-dotenv 一致，默认不覆盖）
+
+    Returns:
+        bool: 是否读取到了变量
+    """
+    if dotenv_path is None:
+        dotenv_path = Path(__file__).parent.parent.parent / ".env"
+
+    env_file = Path(dotenv_path)
+    if not env_file.exists():
+        return False
+
+    # 一次读入整个文件，解析出全部变量后一次性写入环境变量
+    pairs = (
+        line.split('=', 1)
+        for line in map(str.strip, env_file.read_text(encoding='utf-8').splitlines())
+        if line and not line.startswith('#') and '=' in line
+    )
+    values = {key.strip(): value.strip() for key, value in pairs}
+    if not override:
+        values = {key: value for key, value in values.items() if key not in os.environ}
+    os.environ.update(values)
+    return bool(values)
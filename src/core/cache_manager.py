@@ -4,9 +4,15 @@
 为AKShare API调用提供统一的缓存机制。
 """
 import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from functools import lru_cache, wraps
-from datetime import datetime, timedelta
-from typing import Callable, Any, Optional, Dict
+from pathlib import Path
+from typing import Callable, Any, Optional, Dict, Hashable, Tuple
 import hashlib
 import json
 
@@ -14,62 +20,73 @@ logger = logging.getLogger(__name__)
 
 
 class TimedCache:
-    """带过期时间的缓存类"""
+    """
+    带过期时间的缓存类（线程安全，可在线程池中共享）
+    
+    条目存为 (值, 过期时刻) 元组，过期时刻基于 time.monotonic()，不受系统时间调整影响。
+    设置 maxsize 后按最近使用顺序淘汰：命中时移到末尾，超出容量时淘汰最久未使用的条目。
+    """
     
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(self, default_ttl: int = 3600, maxsize: Optional[int] = None):
         """
         初始化缓存
         
         Args:
             default_ttl: 默认过期时间（秒），默认1小时
+            maxsize: 最大条目数，None 表示不限制
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
         self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: Hashable) -> Optional[Any]:
         """
         获取缓存值
         
         Args:
-            key: 缓存键
+            key: 缓存键（任意可哈希对象）
             
         Returns:
             缓存值，如果不存在或已过期返回None
         """
-        if key not in self._cache:
-            return None
-        
-        entry = self._cache[key]
-        expire_time = entry.get('expire_time')
-        
-        if expire_time and datetime.now() > expire_time:
-            # 缓存已过期，删除
-            del self._cache[key]
-            return None
-        
-        return entry.get('value')
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            value, expire_at = entry
+            if time.monotonic() > expire_at:
+                # 缓存已过期，删除
+                del self._cache[key]
+                return None
+            
+            if self.maxsize is not None:
+                self._cache.move_to_end(key)
+            return value
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+    def set(self, key: Hashable, value: Any, ttl: Optional[int] = None) -> None:
         """
         设置缓存值
         
         Args:
-            key: 缓存键
+            key: 缓存键（任意可哈希对象）
             value: 缓存值
             ttl: 过期时间（秒），如果为None则使用默认值
         """
         ttl = ttl or self.default_ttl
-        expire_time = datetime.now() + timedelta(seconds=ttl)
-        
-        self._cache[key] = {
-            'value': value,
-            'expire_time': expire_time,
-            'created_at': datetime.now()
-        }
+        entry = (value, time.monotonic() + ttl)
+        with self._lock:
+            self._cache[key] = entry
+            if self.maxsize is not None:
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
     
     def clear(self) -> None:
         """清除所有缓存"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.info("缓存已清除")
     
     def clear_expired(self) -> int:
@@ -79,14 +96,15 @@ class TimedCache:
         Returns:
             清除的缓存数量
         """
-        now = datetime.now()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.get('expire_time') and now > entry['expire_time']
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
+        now = time.monotonic()
+        with self._lock:
+            expired_keys = [
+                key for key, (_, expire_at) in self._cache.items()
+                if now > expire_at
+            ]
+            
+            for key in expired_keys:
+                del self._cache[key]
         
         if expired_keys:
             logger.debug(f"清除了 {len(expired_keys)} 个过期缓存")
@@ -98,20 +116,218 @@ class TimedCache:
         return len(self._cache)
 
 
+class DiskCache:
+    """
+    基于 SQLite 的持久化缓存
+    
+    进程重启后仍然有效，用于长TTL的接口数据（如股票基本信息），
+    重跑任务时不必重新请求远程接口。值使用 pickle 序列化。
+    """
+    
+    def __init__(self, path: Path, version: int = 1):
+        """
+        初始化磁盘缓存
+        
+        Args:
+            path: SQLite 数据库文件路径
+            version: 缓存格式版本号，作为键前缀；数据结构变化时递增即可使旧缓存失效
+        """
+        self.path = Path(path)
+        self.version = version
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """获取（首次使用时创建）数据库连接，打开时删除已过期的条目"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expire_at REAL NOT NULL)"
+            )
+            conn.execute("DELETE FROM cache WHERE expire_at < ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    def _full_key(self, key: str) -> str:
+        """带版本前缀的缓存键"""
+        return f"v{self.version}:{key}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存值
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            缓存值，如果不存在或已过期返回None
+        """
+        full_key = self._full_key(key)
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT value, expire_at FROM cache WHERE key = ?", (full_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                # 缓存已过期，删除
+                conn.execute("DELETE FROM cache WHERE key = ?", (full_key,))
+                conn.commit()
+                return None
+        return pickle.loads(row[0])
+    
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """
+        设置缓存值
+        
+        Args:
+            key: 缓存键
+            value: 缓存值（需可 pickle）
+            ttl: 过期时间（秒）
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expire_at) VALUES (?, ?, ?)",
+                (self._full_key(key), data, time.time() + ttl)
+            )
+            conn.commit()
+    
+    def clear(self) -> None:
+        """清除所有缓存"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+        logger.info("磁盘缓存已清除")
+    
+    def clear_expired(self) -> int:
+        """
+        清除已过期的缓存
+        
+        Returns:
+            清除的缓存数量
+        """
+        with self._lock:
+            conn = self._get_conn()
+            count = conn.execute(
+                "DELETE FROM cache WHERE expire_at < ?", (time.time(),)
+            ).rowcount
+            conn.commit()
+        
+        if count:
+            logger.debug(f"清除了 {count} 个过期磁盘缓存")
+        
+        return count
+    
+    def size(self) -> int:
+        """返回缓存数量"""
+        with self._lock:
+            return self._get_conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+# 磁盘缓存：TTL 不小于该值（秒）的接口调用会同时写入磁盘
+DISK_CACHE_MIN_TTL = 86400
+# 磁盘缓存格式版本（缓存的数据结构变化时递增）
+DISK_CACHE_VERSION = 1
+# 缓存目录，可通过环境变量 AKSHARE_CACHE_DIR 指定，默认项目根目录下 .cache/akshare
+_disk_cache_dir = Path(os.getenv(
+    'AKSHARE_CACHE_DIR',
+    Path(__file__).parent.parent.parent / '.cache' / 'akshare'
+))
+_disk_cache = DiskCache(_disk_cache_dir / 'cache.sqlite3', version=DISK_CACHE_VERSION)
+
 # 全局缓存实例
 # 不同API使用不同的缓存时间
-_cache_stock_basic_info = TimedCache(default_ttl=86400)  # 24小时
-_cache_stock_list = TimedCache(default_ttl=3600)  # 1小时
-_cache_stock_controller = TimedCache(default_ttl=86400)  # 24小时
-_cache_stock_shareholders = TimedCache(default_ttl=86400)  # 24小时
-_cache_stock_market_value = TimedCache(default_ttl=300)  # 5分钟（市值数据变化较快）
-_cache_stock_financial = TimedCache(default_ttl=86400)  # 24小时
+# 按代码缓存的实例容量覆盖全部A股（约5500只）并留有余量，超出时淘汰最久未使用的条目
+_cache_stock_basic_info = TimedCache(default_ttl=86400, maxsize=8192)  # 24小时
+# 基本信息各数据源（东方财富/雪球）的原始结果，只用于合并前的预取，合并结果见 _cache_stock_basic_info
+_cache_basic_info_source = TimedCache(default_ttl=3600, maxsize=16384)  # 1小时（仅内存）
+_cache_stock_list = TimedCache(default_ttl=3600, maxsize=16)  # 1小时
+_cache_stock_controller = TimedCache(default_ttl=86400, maxsize=64)  # 24小时
+_cache_stock_shareholders = TimedCache(default_ttl=86400, maxsize=16384)  # 24小时
+_cache_stock_market_value = TimedCache(default_ttl=300, maxsize=8192)  # 5分钟（市值数据变化较快）
+_cache_stock_financial = TimedCache(default_ttl=86400, maxsize=16384)  # 24小时（财务数据与利润表共用）
+# 利润表原始 DataFrame，只在两个利润表接口之间共享，解析后的结果见 _cache_stock_financial
+_cache_profit_sheet = TimedCache(default_ttl=3600, maxsize=64)  # 1小时（仅内存）
+
+
+# peek() 未命中时返回的哨兵对象
+CACHE_MISS = object()
+
+
+def make_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
+    """
+    生成缓存键：函数名 + 参数，以 "|" 连接
+    
+    Args:
+        func_name: 函数名
+        args: 位置参数
+        kwargs: 关键字参数（排序以确保一致性）
+        
+    Returns:
+        缓存键，如 "get_stock_basic_info|000001"
+    """
+    cache_key_parts = [func_name]
+    cache_key_parts.extend(str(arg) for arg in args)
+    if kwargs:
+        cache_key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    return "|".join(cache_key_parts)
+
+
+def _memory_key(func_name: str, args: tuple, kwargs: dict) -> Hashable:
+    """
+    生成内存缓存键：直接使用 (函数名, 位置参数, 排序后的关键字参数) 元组，不拼接字符串
+    
+    参数中含不可哈希对象（如 DataFrame）时退回 make_cache_key 的字符串形式。
+    
+    Args:
+        func_name: 函数名
+        args: 位置参数
+        kwargs: 关键字参数
+        
+    Returns:
+        可哈希的缓存键
+    """
+    key = (func_name, args, tuple(sorted(kwargs.items())) if kwargs else ())
+    try:
+        hash(key)
+    except TypeError:
+        return make_cache_key(func_name, args, kwargs)
+    return key
+
+
+def _is_empty(value: Any) -> bool:
+    """
+    判断结果是否为空容器（空列表、空字典、空 DataFrame 等）
+    
+    Args:
+        value: 函数返回值
+        
+    Returns:
+        有长度且长度为0时返回True
+    """
+    try:
+        return len(value) == 0
+    except TypeError:
+        return False
 
 
 def cached_api_call(cache_instance: TimedCache, ttl: Optional[int] = None):
     """
     装饰器：为API调用添加缓存
     
+    TTL 不小于 DISK_CACHE_MIN_TTL 的非空结果会同时写入磁盘缓存，
+    内存未命中时先查磁盘，进程重启后仍可命中。
+    
+    被装饰的函数附带 peek(*args, **kwargs)：只查内存缓存，命中返回缓存值，
+    否则返回 CACHE_MISS，便于批量调用方先分出命中与未命中。
+    
     Args:
         cache_instance: 缓存实例
         ttl: 缓存过期时间（秒），如果为None则使用缓存实例的默认值
@@ -121,43 +337,62 @@ def cached_api_call(cache_instance: TimedCache, ttl: Optional[int] = None):
         def get_stock_info(code: str):
             ...
     """
+    use_disk = (ttl or cache_instance.default_ttl) >= DISK_CACHE_MIN_TTL
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # 生成缓存键：函数名 + 参数
-            cache_key_parts = [func.__name__]
-            
-            # 添加位置参数
-            for arg in args:
-                cache_key_parts.append(str(arg))
-            
-            # 添加关键字参数（排序以确保一致性）
-            if kwargs:
-                sorted_kwargs = sorted(kwargs.items())
-                cache_key_parts.extend([f"{k}={v}" for k, v in sorted_kwargs])
-            
-            cache_key = "|".join(cache_key_parts)
+            memory_key = _memory_key(func.__name__, args, kwargs)
             
             # 尝试从缓存获取
-            cached_value = cache_instance.get(cache_key)
+            cached_value = cache_instance.get(memory_key)
             if cached_value is not None:
-                logger.debug(f"缓存命中: {func.__name__}({cache_key})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"缓存命中: {func.__name__}({make_cache_key(func.__name__, args, kwargs)})")
                 return cached_value
             
+            # 以下均为未命中路径，才构造字符串形式的缓存键（磁盘缓存与日志使用）
+            cache_key = make_cache_key(func.__name__, args, kwargs)
+            
+            # 内存未命中时查询磁盘缓存
+            if use_disk:
+                try:
+                    cached_value = _disk_cache.get(cache_key)
+                except Exception as e:
+                    logger.debug(f"读取磁盘缓存失败: {func.__name__}({cache_key}): {e}")
+                    cached_value = None
+                if cached_value is not None:
+                    cache_instance.set(memory_key, cached_value, ttl)
+                    logger.debug(f"磁盘缓存命中: {func.__name__}({cache_key})")
+                    return cached_value
+            
             # 调用原函数
             try:
                 result = func(*args, **kwargs)
                 
                 # 如果结果不为None，则缓存
                 if result is not None:
-                    cache_instance.set(cache_key, result, ttl)
+                    cache_instance.set(memory_key, result, ttl)
                     logger.debug(f"缓存设置: {func.__name__}({cache_key})")
+                    # 空结果（多为请求失败时的兜底返回值）只缓存在内存中，不持久化，
+                    # 避免一次临时失败在进程重启、次日重跑后仍然命中
+                    if use_disk and not _is_empty(result):
+                        try:
+                            _disk_cache.set(cache_key, result, ttl or cache_instance.default_ttl)
+                        except Exception as e:
+                            logger.debug(f"写入磁盘缓存失败: {func.__name__}({cache_key}): {e}")
                 
                 return result
             except Exception as e:
                 logger.error(f"API调用失败: {func.__name__}({cache_key}): {e}")
                 raise
         
+        def peek(*args, **kwargs):
+            """只读内存缓存，不调用原函数也不查磁盘；未命中返回 CACHE_MISS"""
+            cached_value = cache_instance.get(_memory_key(func.__name__, args, kwargs))
+            return CACHE_MISS if cached_value is None else cached_value
+        
+        wrapper.peek = peek
         return wrapper
     return decorator
 
@@ -165,11 +400,17 @@ def cached_api_call(cache_instance: TimedCache, ttl: Optional[int] = None):
 def clear_all_caches():
     """清除所有缓存"""
     _cache_stock_basic_info.clear()
+    _cache_basic_info_source.clear()
     _cache_stock_list.clear()
     _cache_stock_controller.clear()
     _cache_stock_shareholders.clear()
     _cache_stock_market_value.clear()
     _cache_stock_financial.clear()
+    _cache_profit_sheet.clear()
+    try:
+        _disk_cache.clear()
+    except Exception as e:
+        logger.warning(f"清除磁盘缓存失败: {e}")
     logger.info("所有缓存已清除")
 
 
@@ -177,10 +418,12 @@ def get_cache_stats() -> Dict[str, Any]:
     """获取缓存统计信息"""
     return {
         'stock_basic_info': _cache_stock_basic_info.size(),
+        'basic_info_source': _cache_basic_info_source.size(),
         'stock_list': _cache_stock_list.size(),
         'stock_controller': _cache_stock_controller.size(),
         'stock_shareholders': _cache_stock_shareholders.size(),
         'stock_market_value': _cache_stock_market_value.size(),
         'stock_financial': _cache_stock_financial.size(),
+        'profit_sheet': _cache_profit_sheet.size(),
     }
 
@@ -3,29 +3,14 @@
 
 从环境变量或配置文件读取 Supabase (PostgreSQL) 数据库连接信息。
 """
-import os
 from pathlib import Path
-from typing import Optional
+from typing import Mapping, Optional
 
 try:
     from dotenv import load_dotenv
 except ImportError:
     # 如果没有安装python-dotenv，使用简单的实现
-    def load_dotenv(dotenv_path=None):
-        """简单的.env文件加载实现"""
-        if dotenv_path is None:
-            # 默认从项目根目录读取
-            project_root = Path(__file__).parent.parent.parent
-            dotenv_path = project_root / ".env"
-        
-        env_file = Path(dotenv_path)
-        if env_file.exists():
-            with open(env_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        os.environ[key.strip()] = value.strip()
+    from ._dotenv_fallback import load_dotenv
 
 
 # 加载.env文件（从项目根目录读取）
@@ -45,14 +30,24 @@ class DatabaseConfig:
         self.db_type = 'supabase'
         self._config = SupabaseConfig()
     
+    @property
+    def connection_params(self) -> Mapping:
+        """
+        数据库连接参数（只读，由底层配置对象缓存）
+        
+        Returns:
+            包含连接参数的只读映射
+        """
+        return self._config.connection_params
+    
     def get_connection_params(self) -> dict:
         """
         获取数据库连接参数字典
         
         Returns:
-            包含连接参数的字典
+            包含连接参数的字典（副本，调用方可以修改）
         """
-        return self._config.get_connection_params()
+        return dict(self._config.connection_params)
     
     def __repr__(self) -> str:
         """返回配置的字符串表示"""
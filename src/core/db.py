@@ -34,6 +34,23 @@ class DatabaseManager:
         """
         return self._connection.get_connection()
     
+    def connection(self, repeatable_read: bool = False):
+        """
+        获取共享单个连接的会话上下文管理器
+        
+        Usage:
+            with db_manager.connection() as conn:
+                conn.execute_query(sql1)
+                conn.execute_query(sql2)
+        
+        Args:
+            repeatable_read: 是否使用 REPEATABLE READ 隔离级别（会话内读取同一快照）
+            
+        Yields:
+            会话对象，提供 execute_query / execute_query_tuples / execute_update
+        """
+        return self._connection.connection(repeatable_read)
+    
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> list:
         """
         执行查询语句
@@ -47,6 +64,36 @@ class DatabaseManager:
         """
         return self._connection.execute_query(sql, params)
     
+    def execute_query_tuples(self, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询语句，结果行为元组
+        
+        Args:
+            sql: SQL查询语句（PostgreSQL 语法）
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        return self._connection.execute_query_tuples(sql, params)
+    
+    def execute_prepared(self, name: str, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询，结果行为元组
+        
+        不在会话中时连接用完即关，直接普通执行；在 connection() 会话中调用
+        SupabaseSession.execute_prepared 才会 PREPARE 并在该连接上复用。
+        
+        Args:
+            name: 预备语句名
+            sql: SQL查询语句（PostgreSQL 语法，%s 占位符）
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        return self._connection.execute_prepared(name, sql, params)
+    
     def execute_update(self, sql: str, params: Optional[tuple] = None) -> int:
         """
         执行更新语句（INSERT, UPDATE, DELETE）
@@ -73,6 +120,20 @@ class DatabaseManager:
         """
         return self._connection.execute_many(sql, params_list)
     
+    def execute_values(self, sql: str, params_list: list, page_size: int = 500) -> int:
+        """
+        批量执行多行 VALUES 语句（多行拼成一条语句，减少数据库往返）
+        
+        Args:
+            sql: 使用单个 VALUES %s 占位符的SQL语句（PostgreSQL 语法）
+            params_list: 参数列表
+            page_size: 每条语句包含的行数
+            
+        Returns:
+            受影响的行数
+        """
+        return self._connection.execute_values(sql, params_list, page_size)
+    
     def test_connection(self) -> bool:
         """
         测试数据库连接
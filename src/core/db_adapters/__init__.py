@@ -5,9 +5,10 @@
 """
 
 from .supabase_config import SupabaseConfig
-from .supabase_connection import SupabaseConnection
+from .supabase_connection import SupabaseConnection, SupabaseSession
 
 __all__ = [
     'SupabaseConfig',
     'SupabaseConnection',
+    'SupabaseSession',
 ]
@@ -2,8 +2,10 @@
 Supabase (PostgreSQL) 数据库配置模块
 """
 import os
+from functools import cached_property
+from types import MappingProxyType
 from urllib.parse import urlparse
-from typing import Optional, Dict
+from typing import Optional, Dict, Mapping
 
 
 class SupabaseConfig:
@@ -30,22 +32,32 @@ class SupabaseConfig:
             self.password = parsed.password or ''
             self.database = parsed.path.lstrip('/') if parsed.path else 'postgres'
     
-    def get_connection_params(self) -> Dict:
+    @cached_property
+    def connection_params(self) -> Mapping:
         """
-        获取数据库连接参数字典
+        数据库连接参数（只读，进程内只构造一次）
         
         Returns:
-            包含连接参数的字典
+            包含连接参数的只读映射
         """
         if self.uri:
-            return {'uri': self.uri}
-        return {
+            return MappingProxyType({'uri': self.uri})
+        return MappingProxyType({
             'host': self.host,
             'port': self.port,
             'user': self.user,
             'password': self.password,
             'database': self.database,
-        }
+        })
+    
+    def get_connection_params(self) -> Dict:
+        """
+        获取数据库连接参数字典
+        
+        Returns:
+            包含连接参数的字典（副本，调用方可以修改）
+        """
+        return dict(self.connection_params)
     
     def __repr__(self) -> str:
         """返回配置的字符串表示"""
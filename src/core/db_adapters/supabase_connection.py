@@ -1,9 +1,11 @@
 """
 Supabase (PostgreSQL) 数据库连接模块
 """
+import itertools
 import logging
+import re
 from contextlib import contextmanager
-from typing import Optional
+from typing import Iterator, Optional
 
 from .supabase_config import SupabaseConfig
 
@@ -12,12 +14,128 @@ logger = logging.getLogger(__name__)
 # 尝试导入 PostgreSQL 驱动
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_values
     POSTGRESQL_AVAILABLE = True
 except ImportError:
     POSTGRESQL_AVAILABLE = False
     psycopg2 = None
     RealDictCursor = None
+    execute_values = None
+
+
+# psycopg2 占位符 %s（不匹配转义的 %%s）
+_PLACEHOLDER_PATTERN = re.compile(r'(?<!%)%s')
+
+
+def _to_positional_params(sql: str) -> str:
+    """
+    将 psycopg2 的 %s 占位符转换为 PREPARE 使用的 $1, $2, ...
+    
+    Args:
+        sql: 使用 %s 占位符的 SQL
+        
+    Returns:
+        使用 $n 占位符的 SQL
+    """
+    counter = itertools.count(1)
+    return _PLACEHOLDER_PATTERN.sub(lambda _: f"${next(counter)}", sql).replace('%%', '%')
+
+
+class SupabaseSession:
+    """
+    共享同一个数据库连接的会话
+    
+    由 SupabaseConnection.connection() 创建，会话内的多条语句复用同一连接、
+    处于同一事务中，退出上下文时统一提交。
+    """
+    
+    def __init__(self, conn):
+        """
+        初始化会话
+        
+        Args:
+            conn: 数据库连接对象
+        """
+        self.conn = conn
+        # 本连接上已 PREPARE 的语句名
+        self._prepared = set()
+    
+    def execute_query(self, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询语句
+        
+        Args:
+            sql: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表
+        """
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    
+    def execute_query_tuples(self, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询语句，结果行为元组
+        
+        Args:
+            sql: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    
+    def execute_update(self, sql: str, params: Optional[tuple] = None) -> int:
+        """
+        执行更新语句（在会话结束时随事务一起提交）
+        
+        Args:
+            sql: SQL更新语句
+            params: 更新参数
+            
+        Returns:
+            受影响的行数
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+    
+    def execute_prepared(self, name: str, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        以预备语句方式执行查询，结果行为元组
+        
+        同一连接上首次调用时执行 PREPARE，之后只执行 EXECUTE，
+        服务端复用已解析、已规划的语句。
+        
+        Args:
+            name: 预备语句名（连接内唯一）
+            sql: 使用 %s 占位符的 SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        params = tuple(params or ())
+        with self.conn.cursor() as cursor:
+            if name not in self._prepared:
+                cursor.execute(f"PREPARE {name} AS {_to_positional_params(sql)}")
+                self._prepared.add(name)
+            if params:
+                placeholders = ', '.join(['%s'] * len(params))
+                cursor.execute(f"EXECUTE {name}({placeholders})", params)
+            else:
+                cursor.execute(f"EXECUTE {name}")
+            return cursor.fetchall()
+    
+    def rollback(self) -> None:
+        """回滚当前事务（语句失败后需回滚才能继续使用该会话）"""
+        # 预备语句属于连接而不属于事务，ROLLBACK 后仍然存在，已准备的记录保持不变
+        self.conn.rollback()
 
 
 class SupabaseConnection:
@@ -67,7 +185,7 @@ class SupabaseConnection:
         """
         conn = None
         try:
-            params = self.config.get_connection_params()
+            params = self.config.connection_params
             
             if 'uri' in params:
                 conn = psycopg2.connect(params['uri'])
@@ -94,6 +212,25 @@ class SupabaseConnection:
                 conn.close()
                 logger.debug("Supabase 数据库连接已关闭")
     
+    @contextmanager
+    def connection(self, repeatable_read: bool = False) -> Iterator[SupabaseSession]:
+        """
+        获取共享单个连接的会话上下文管理器
+        
+        多条相关查询放在同一会话中执行，只建立一次连接、只有一次 BEGIN/COMMIT。
+        
+        Args:
+            repeatable_read: 是否使用 REPEATABLE READ 隔离级别，
+                使会话内的所有查询读取同一快照
+            
+        Yields:
+            SupabaseSession 会话对象
+        """
+        with self.get_connection() as conn:
+            if repeatable_read:
+                conn.set_session(isolation_level='REPEATABLE READ')
+            yield SupabaseSession(conn)
+    
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> list:
         """
         执行查询语句
@@ -110,6 +247,39 @@ class SupabaseConnection:
                 cursor.execute(sql, params)
                 return cursor.fetchall()
     
+    def execute_query_tuples(self, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询语句，结果行为元组（不构造字典，适合按位置解包的热点查询）
+        
+        Args:
+            sql: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+    
+    def execute_prepared(self, name: str, sql: str, params: Optional[tuple] = None) -> list:
+        """
+        执行查询，结果行为元组（与会话的 execute_prepared 接口一致）
+        
+        单独调用时每次都是新连接、用完即关，PREPARE 无法被复用，只会多一次往返，
+        因此直接普通执行；需要复用预备语句时请在 connection() 会话中调用。
+        
+        Args:
+            name: 预备语句名（此处不使用）
+            sql: 使用 %s 占位符的 SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果列表，每行为按SELECT列顺序排列的元组
+        """
+        return self.execute_query_tuples(sql, params)
+    
     def execute_update(self, sql: str, params: Optional[tuple] = None) -> int:
         """
         执行更新语句（INSERT, UPDATE, DELETE）
@@ -146,6 +316,27 @@ class SupabaseConnection:
                 conn.commit()
                 return affected_rows
     
+    def execute_values(self, sql: str, params_list: list, page_size: int = 500) -> int:
+        """
+        批量执行多行 VALUES 语句（每 page_size 行拼成一条语句，所有批次一次提交）
+        
+        Args:
+            sql: 使用单个 VALUES %s 占位符的SQL语句
+            params_list: 参数列表，每个元素为一行的参数元组
+            page_size: 每条语句包含的行数
+            
+        Returns:
+            受影响的行数
+        """
+        affected_rows = 0
+        with self.get_connection() as conn:
+            with self._get_cursor(conn) as cursor:
+                for start in range(0, len(params_list), page_size):
+                    execute_values(cursor, sql, params_list[start:start + page_size], page_size=page_size)
+                    affected_rows += cursor.rowcount
+                conn.commit()
+                return affected_rows
+    
     def test_connection(self) -> bool:
         """
         测试数据库连接
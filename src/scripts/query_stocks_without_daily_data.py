@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+查询没有日线数据的股票统计
+
+统计 stocks 表中在 stock_daily 表里没有任何日线记录的股票，
+输出总数、按市场分布以及按企业性质分布（前10）。
+
+统计读取物化视图 mv_stocks_without_daily（见 supabase/003_mv_stocks_without_daily.sql），
+日线数据批量更新脚本结束时会自动刷新，也可以使用 --refresh 手动刷新后再统计。
+
+刷新视图依赖的索引（见 supabase/002_stocks_without_daily_indexes.sql）：
+- idx_stock_daily_code ON stock_daily(code)：反连接时的代码集合可走索引扫描
+- idx_stocks_market_code ON stocks(market, code)：按市场分组时可直接读索引
+
+用法（在项目根目录执行）:
+    python -m src.scripts.query_stocks_without_daily_data [--refresh]
+
+作为模块导入时没有副作用（不修改 sys.path、不配置日志），可直接调用
+query_stocks_without_daily_data()。
+"""
+import argparse
+import logging
+import sys
+
+from src.core.db import db_manager
+from src.services.stock_service import StockService
+
+logger = logging.getLogger(__name__)
+
+# 预编译的输出行模板（绑定的 format_map，避免每行重新解析 f-string 格式说明）
+_MARKET_LINE = "  {market:<8}: {count:>5} 只 ({percentage:>5.1f}%)".format_map
+_COMPANY_TYPE_LINE = "  {company_type:<12}: {count:>5} 只 ({percentage:>5.1f}%)".format_map
+
+
+def query_stocks_without_daily_data(refresh: bool = False):
+    """
+    查询并输出没有日线数据的股票统计
+    
+    Args:
+        refresh: 统计前是否先刷新物化视图
+    """
+    service = StockService()
+    if refresh:
+        # 刷新与统计共用一个连接、一个事务，统计读取的正是刚刷新的视图
+        with db_manager.connection() as conn:
+            service.refresh_stocks_without_daily(session=conn)
+            stats = service.get_stocks_without_daily_stats(session=conn)
+    else:
+        stats = service.get_stocks_without_daily_stats()
+    
+    total_count = stats['total_count']
+    logger.info(f"没有日线数据的股票总数: {total_count} 只")
+    
+    if total_count == 0:
+        logger.info("所有股票都有日线数据")
+        return stats
+    
+    # 每个分组块只输出一条日志（一次 handler.emit），避免逐行格式化与写入
+    logger.info("按市场分布:\n" + "\n".join(
+        _MARKET_LINE({'market': market, 'count': count, 'percentage': pct})
+        for market, count, pct in stats['market_stats']
+    ))
+    
+    logger.info("按企业性质分布（前10）:\n" + "\n".join(
+        _COMPANY_TYPE_LINE({'company_type': company_type, 'count': count, 'percentage': pct})
+        for company_type, count, pct in stats['company_type_stats']
+    ))
+    
+    return stats
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='统计没有日线数据的股票')
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='统计前先刷新物化视图 mv_stocks_without_daily'
+    )
+    args = parser.parse_args()
+    
+    try:
+        query_stocks_without_daily_data(refresh=args.refresh)
+    except Exception as e:
+        logger.error(f"查询失败: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    # 配置日志
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    main()
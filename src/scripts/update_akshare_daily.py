@@ -9,6 +9,7 @@ import argparse
 import logging
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -41,7 +42,7 @@ def update_single_stock(code: str, start_date: str = None, end_date: str = None,
         start_date: 开始日期
         end_date: 结束日期
         adjust: 复权方式
-        use_minute: 是否使用分时API
+        use_minute: 是否直接使用东方财富数据源（日线接口优先，分时聚合兜底）
         use_sina: 是否使用新浪API
         delay: API调用延迟（秒），单只股票更新通常不需要延迟
     """
@@ -84,19 +85,22 @@ def update_single_stock(code: str, start_date: str = None, end_date: str = None,
 def update_all_stocks(start_date: str = None, end_date: str = None,
                      adjust: str = 'qfq', use_minute: bool = False,
                      use_sina: bool = True,
-                     batch_size: int = 10, delay: float = 2.0):
+                     batch_size: int = 10, delay: float = 2.0,
+                     workers: int = 4):
     """
     批量更新所有股票的日线数据
     
     优化策略：
-    1. 自动检测每只股票的最新日期，只获取新数据
+    1. 自动检测每只股票的最新日期（一次批量查询），只获取新数据
     2. 跳过已是最新数据的股票（不调用API）
     3. 添加延迟避免API限流（默认2秒，新浪API建议更保守）
     4. 记录跳过和失败的统计
     5. 服务类内置延迟控制，确保API调用间隔
+    6. 多线程并发处理：同一数据源的调用间隔仍由服务类统一控制，
+       并发只是让网络等待、数据库写入与限流等待重叠
     """
     stock_service = StockService()
-    # 创建服务实例，设置API延迟（服务类内部也会控制延迟）
+    # 创建服务实例，设置API延迟（服务类内部也会控制延迟，多个线程共享）
     quote_service = DailyQuoteService(api_delay=delay)
     
     # 获取所有股票列表
@@ -108,30 +112,38 @@ def update_all_stocks(start_date: str = None, end_date: str = None,
         return
     
     logger.info(f"找到 {len(stocks)} 只股票，开始批量更新...")
-    logger.info(f"API延迟设置: {delay} 秒（建议 >= 2.0 秒以避免新浪API封IP）")
+    logger.info(f"API延迟设置: {delay} 秒（建议 >= 2.0 秒以避免新浪API封IP），并发线程数: {workers}")
     
-    success_count = 0
-    failed_count = 0
-    skipped_count = 0  # 跳过的股票（已是最新数据）
+    # 没有指定开始日期时，一次查询所有股票的最新日期，逐只处理时直接查找
+    latest_dates = None
+    if start_date is None:
+        try:
+            latest_dates = quote_service.get_latest_dates([stock['code'] for stock in stocks])
+            logger.info(f"已有日线数据的股票: {len(latest_dates)} 只")
+        except Exception as e:
+            logger.warning(f"批量查询最新日期失败，改为逐只查询: {e}")
     
-    for i, stock in enumerate(stocks, 1):
-        code = stock['code']
-        
-        if i % batch_size == 0:
-            logger.info(f"已处理 {i}/{len(stocks)} 只股票（成功: {success_count}, 失败: {failed_count}, 跳过: {skipped_count}）...")
-        
+    # 最近交易日（周末、节假日运行时为上一交易日），已更新到该日的股票直接跳过
+    last_trading_date = quote_service.get_last_trading_date(datetime.now().date())
+    if last_trading_date:
+        logger.info(f"最近交易日: {last_trading_date}")
+    
+    def update_one(code: str) -> str:
+        """更新单只股票，返回 success / failed / skipped"""
         try:
             # 优化：在调用API前先检查是否需要更新（减少不必要的API调用）
             if start_date is None:
                 # 如果没有指定开始日期，检查是否已是最新数据
-                latest_date = quote_service.get_latest_date(code)
+                if latest_dates is not None:
+                    latest_date = latest_dates.get(code)
+                else:
+                    latest_date = quote_service.get_latest_date(code)
                 if latest_date:
                     latest_dt = datetime.strptime(latest_date, '%Y-%m-%d')
-                    end_dt = datetime.now().date()
-                    # 如果最新日期 >= 今天，说明已是最新数据，跳过API调用
+                    # 如果最新日期 >= 最近交易日（交易日历不可用时为今天），说明已是最新数据，跳过API调用
+                    end_dt = last_trading_date or datetime.now().date()
                     if latest_dt.date() >= end_dt:
-                        skipped_count += 1
-                        continue
+                        return 'skipped'
             
             # 注意：延迟控制由服务类内部处理
             # 服务类的 _wait_for_rate_limit() 会确保API调用间隔
@@ -142,23 +154,40 @@ def update_all_stocks(start_date: str = None, end_date: str = None,
                 end_date=end_date,
                 adjust=adjust,
                 use_minute=use_minute,
-                use_sina=use_sina
+                use_sina=use_sina,
+                latest_dates=latest_dates
             )
             
-            if success:
-                success_count += 1
-            else:
-                # fetch_and_save 返回 False 可能是：
-                # 1. 已是最新数据（在fetch_and_save内部已检查并返回True）
-                # 2. API调用失败
-                # 3. 日期范围无效
-                # 这里简化处理，计入失败（实际可能是跳过，但已在fetch_and_save中处理）
-                failed_count += 1
+            # fetch_and_save 返回 False 可能是：
+            # 1. 已是最新数据（在fetch_and_save内部已检查并返回True）
+            # 2. API调用失败
+            # 3. 日期范围无效
+            # 这里简化处理，计入失败（实际可能是跳过，但已在fetch_and_save中处理）
+            return 'success' if success else 'failed'
                 
         except Exception as e:
             logger.error(f"更新股票 {code} 失败: {e}")
-            failed_count += 1
-            continue
+            return 'failed'
+    
+    success_count = 0
+    failed_count = 0
+    skipped_count = 0  # 跳过的股票（已是最新数据）
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(update_one, [stock['code'] for stock in stocks])
+        for i, status in enumerate(results, 1):
+            if status == 'success':
+                success_count += 1
+            elif status == 'skipped':
+                skipped_count += 1
+            else:
+                failed_count += 1
+            
+            if i % batch_size == 0:
+                logger.info(f"已处理 {i}/{len(stocks)} 只股票（成功: {success_count}, 失败: {failed_count}, 跳过: {skipped_count}）...")
+    
+    # 日线数据已更新，刷新“没有日线数据的股票”物化视图
+    stock_service.refresh_stocks_without_daily()
     
     logger.info("="*60)
     logger.info("批量更新完成")
@@ -187,7 +216,10 @@ def main():
   # 更新所有股票（自定义延迟，建议 >= 2.0 秒以避免新浪API封IP）
   python src/update_akshare_daily.py --all --delay 2.5
   
-  # 使用分时API获取成交量数据（如果新浪API失败）
+  # 更新所有股票（8个线程并发，调用间隔仍按 --delay 控制）
+  python src/update_akshare_daily.py --all --workers 8
+  
+  # 直接使用东方财富数据源获取成交量数据（日线接口失败时才用分时数据聚合）
   python src/update_akshare_daily.py --code 000001 --use-minute
   
   # 不使用新浪API（使用腾讯API作为备选）
@@ -233,7 +265,7 @@ def main():
     parser.add_argument(
         '--use-minute',
         action='store_true',
-        help='使用分时API（可以获取成交量数据，但速度较慢）'
+        help='直接使用东方财富数据源获取成交量（日线接口优先，失败时用分时数据聚合，较慢）'
     )
     
     parser.add_argument(
@@ -256,6 +288,13 @@ def main():
         help='每次API调用之间的延迟（秒，默认: 2.0）。新浪API建议 >= 2.0 秒以避免封IP'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='批量更新时的并发线程数（默认: 4）。API调用间隔仍受 --delay 控制'
+    )
+    
     parser.add_argument(
         '--test-connection',
         action='store_true',
@@ -309,7 +348,8 @@ def main():
                 use_minute=args.use_minute,
                 use_sina=use_sina,
                 batch_size=args.batch_size,
-                delay=args.delay
+                delay=args.delay,
+                workers=args.workers
             )
     
     except KeyboardInterrupt:
@@ -97,13 +97,11 @@ def batch_update_controller_info(stocks: List[Dict], stock_service: StockService
     """
     try:
         logger.info("批量获取所有股票的控制人信息...")
-        df = AKShareClient.get_all_controller_data()
-        if df is None or df.empty:
+        controller_dict = AKShareClient.get_all_controller_info()
+        if not controller_dict:
             logger.warning("未获取到批量控制人数据，将使用单独更新")
             return 0
         
-        # 解析批量数据
-        controller_dict = AKShareClient.parse_all_controller_data(df)
         logger.info(f"成功解析 {len(controller_dict)} 只股票的控制人信息")
         
         # 批量更新
@@ -454,6 +452,19 @@ def main():
                 batch_count = batch_update_market_value(stocks, market_value_service)
                 stats['market_value'] += batch_count
         
+            # 并发预取需要更新的股票的利润表（写入缓存，逐只更新时直接命中）
+            if args.data_type in ['all', 'financial'] and stocks_to_update_financial:
+                logger.info(f"并发预取 {len(stocks_to_update_financial)} 只股票的利润表数据...")
+                AKShareClient.get_batch_income_statements(sorted(stocks_to_update_financial))
+        
+        # 批量更新时预先解析一次控制人数据，逐只处理时按代码直接查找
+        controller_dict = {}
+        if is_batch_update and args.data_type in ['all', 'company_info']:
+            try:
+                controller_dict = AKShareClient.get_all_controller_info() or {}
+            except Exception as e:
+                logger.debug(f"预先解析控制人数据失败: {e}")
+        
         # ========== 单独更新部分 ==========
         # 对于没有批量API的数据，或者单个股票更新，使用单独更新
         for i, stock in enumerate(stocks, 1):
@@ -484,14 +495,8 @@ def main():
                 # 批量更新时，控制人信息已更新，这里只更新其他信息
                 controller_info = None
                 if is_batch_update:
-                    # 尝试从批量数据中获取控制人信息（避免重复调用）
-                    try:
-                        df = AKShareClient.get_all_controller_data()
-                        if df is not None and not df.empty:
-                            controller_dict = AKShareClient.parse_all_controller_data(df)
-                            controller_info = controller_dict.get(code)
-                    except:
-                        pass
+                    # 从预先解析的批量数据中获取控制人信息（避免重复调用和重复解析）
+                    controller_info = controller_dict.get(code)
                 
                 # 对于92开头的股票（北交所），需要特别处理企业性质更新
                 # 因为批量控制人API可能不包含这些股票，但仍需要更新企业性质
@@ -191,8 +191,8 @@ def load_failed_codes(input_file: str) -> list:
 
 def update_all_stocks(start_date: str = None, end_date: str = None,
                      batch_size: int = 10, delay: float = 0.0,
-                     save_failed: bool = True):
-    """批量更新所有股票的日线数据"""
+                     save_failed: bool = True, workers: int = 1):
+    """批量更新所有股票的日线数据（每个批次内使用 workers 个线程并发更新）"""
     stock_service = StockService()
     quote_service = TushareDailyService()
     
@@ -237,7 +237,8 @@ def update_all_stocks(start_date: str = None, end_date: str = None,
             start_date=start_date,
             end_date=end_date,
             delay=delay,
-            failed_codes_file=failed_codes_file
+            failed_codes_file=failed_codes_file,
+            workers=workers
         )
         
         success_count += result['success_count']
@@ -251,6 +252,9 @@ def update_all_stocks(start_date: str = None, end_date: str = None,
             logger.info(f"等待 {batch_delay:.1f} 秒后继续下一批次...")
             time.sleep(batch_delay)
     
+    # 日线数据已更新，刷新“没有日线数据的股票”物化视图
+    stock_service.refresh_stocks_without_daily()
+    
     logger.info("="*60)
     logger.info("批量更新完成")
     logger.info(f"成功: {success_count} 只")
@@ -292,6 +296,9 @@ def main():
   # 自定义批次大小和延迟
   python src/update_tushare_daily.py --all --batch-size 20 --delay 0.0
   
+  # 使用4个线程并发更新（API调用频率仍受客户端限流约束）
+  python src/update_tushare_daily.py --all --workers 4
+  
   # 从文件读取失败的股票代码并重新更新
   python src/update_tushare_daily.py --failed-codes-file failed_codes_20231212_200000.txt
   
@@ -338,6 +345,13 @@ def main():
         help='每次API调用之间的额外延迟（秒，默认: 0.0）。客户端已有1.3秒默认延迟，确保每分钟不超过50次。如需更保守可设置额外延迟。'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='批量更新时的并发线程数（默认: 1）。各线程共享客户端限流，每分钟调用次数不变，只重叠网络与数据库等待。'
+    )
+    
     parser.add_argument(
         '--test-connection',
         action='store_true',
@@ -412,7 +426,8 @@ def main():
                 start_date=args.start_date,
                 end_date=args.end_date,
                 delay=args.delay,
-                failed_codes_file=retry_failed_codes_file
+                failed_codes_file=retry_failed_codes_file,
+                workers=args.workers
             )
             
             logger.info("="*60)
@@ -446,7 +461,8 @@ def main():
                 end_date=args.end_date,
                 batch_size=args.batch_size,
                 delay=args.delay,
-                save_failed=not args.no_save_failed
+                save_failed=not args.no_save_failed,
+                workers=args.workers
             )
     
     except KeyboardInterrupt:
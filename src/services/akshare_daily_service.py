@@ -5,19 +5,27 @@ AKShare日线行情数据服务模块
 优先使用 stock_zh_a_daily (新浪)，包含成交量和更多字段。
 备选方案：stock_zh_a_hist_tx (腾讯) 和 stock_zh_a_hist_min_em (东方财富) API。
 """
+import itertools
 import logging
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Optional
+import numpy as np
 import pandas as pd
 
 import akshare as ak
 from ..core.db import db_manager
 from .sql_queries import sql_manager
 from .sql_queries import akshare_daily_sql
+from .trading_calendar_service import TradingCalendarService
 
 logger = logging.getLogger(__name__)
 
+# 日期/时间字符串按 ISO8601 走 C 解析快路径，不逐元素推断格式（pandas 2.0 起支持 format='ISO8601'）
+_ISO_DATE_KWARGS = {'format': 'ISO8601'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
 
 class DailyQuoteService:
     """
@@ -34,10 +42,14 @@ class DailyQuoteService:
     # 新浪API建议延迟 >= 2.0 秒以避免封IP
     DEFAULT_API_DELAY = 2.0
     
+    # 多行 INSERT 每批的行数
+    INSERT_BATCH_SIZE = 500
+    
     def __init__(self, api_delay: float = None):
         """初始化服务，加载 SQL 语句"""
         self.INSERT_DAILY_QUOTE_SQL = sql_manager.get_sql(akshare_daily_sql, 'INSERT_DAILY_QUOTE')
         self.SELECT_LATEST_DATE_SQL = sql_manager.get_sql(akshare_daily_sql, 'SELECT_LATEST_DATE')
+        self.SELECT_LATEST_DATES_SQL = sql_manager.get_sql(akshare_daily_sql, 'SELECT_LATEST_DATES')
         """
         初始化服务
         
@@ -45,20 +57,35 @@ class DailyQuoteService:
             api_delay: API调用延迟（秒），如果为None则使用默认值
         """
         self.api_delay = api_delay if api_delay is not None else self.DEFAULT_API_DELAY
-        self._last_api_call_time = 0
+        # 各数据源下一次允许调用的时间（time.monotonic，不受系统时间调整影响；
+        # 多个线程共享同一个服务实例时按数据源统一排队）
+        self._next_call_time: Dict[str, float] = {}
+        self._rate_lock = threading.Lock()
+        # 按日期缓存的最近交易日（批量更新时每个结束日期只查询一次交易日历）
+        self._last_trading_dates: Dict[date, Optional[date]] = {}
     
-    def _wait_for_rate_limit(self):
+    def _wait_for_rate_limit(self, source: str = 'sina'):
         """
-        等待以确保不超过API调用频率限制
+        等待以确保不超过API调用频率限制（线程安全）
+        
+        每个数据源独立计算调用间隔：加锁领取下一个调用时间段，在锁外等待，
+        多线程并发时同一数据源的调用间隔仍不小于 api_delay。
         
         注意：新浪API大量抓取容易封IP，建议延迟 >= 2.0 秒
+        
+        Args:
+            source: 数据源名称（sina、tx、em）
         """
-        if self.api_delay > 0:
-            elapsed = time.time() - self._last_api_call_time
-            if elapsed < self.api_delay:
-                sleep_time = self.api_delay - elapsed
-                time.sleep(sleep_time)
-            self._last_api_call_time = time.time()
+        if self.api_delay <= 0:
+            return
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(self._next_call_time.get(source, 0.0), now)
+            self._next_call_time[source] = slot + self.api_delay
+        
+        if slot > now:
+            time.sleep(slot - now)
     
     def get_daily_quote_sina(
         self,
@@ -82,7 +109,7 @@ class DailyQuoteService:
         """
         try:
             # 添加延迟控制
-            self._wait_for_rate_limit()
+            self._wait_for_rate_limit('sina')
             
             symbol = DailyQuoteService.convert_code(code)
             
@@ -107,9 +134,10 @@ class DailyQuoteService:
             return None
     
     @staticmethod
+    @lru_cache(maxsize=16384)
     def convert_code(code: str) -> str:
         """
-        将6位股票代码转换为带市场标识的格式
+        将6位股票代码转换为带市场标识的格式（按代码缓存，同一代码返回同一字符串对象）
         
         Args:
             code: 股票代码（6位数字）
@@ -146,7 +174,7 @@ class DailyQuoteService:
         """
         try:
             # 添加延迟控制
-            self._wait_for_rate_limit()
+            self._wait_for_rate_limit('tx')
             
             symbol = DailyQuoteService.convert_code(code)
             
@@ -169,6 +197,62 @@ class DailyQuoteService:
             logger.error(f"使用腾讯API获取股票 {code} 日线数据失败: {e}")
             return None
     
+    def get_daily_quote_em(
+        self,
+        code: str,
+        start_date: str,
+        end_date: str,
+        adjust: str = 'qfq'
+    ) -> Optional[pd.DataFrame]:
+        """
+        使用东方财富日线接口获取日线数据（包含成交量，每个交易日一行，无需分时聚合）
+        
+        Args:
+            code: 股票代码（6位数字）
+            start_date: 开始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+            adjust: 复权方式 ('qfq'=前复权, 'hfq'=后复权, ''=不复权)
+            
+        Returns:
+            日线数据DataFrame，列名: ['date', 'open', 'close', 'high', 'low',
+                                    'volume', 'amount', 'turnover']
+            单位与新浪API一致：成交量为股（接口返回手，已乘以100），换手率为小数（接口返回百分数）
+        """
+        try:
+            # 添加延迟控制（与分时接口同属东方财富）
+            self._wait_for_rate_limit('em')
+            
+            logger.debug(f"使用东方财富日线API获取股票 {code} 日线数据: {start_date} 到 {end_date}")
+            df = ak.stock_zh_a_hist(
+                symbol=code,
+                period='daily',
+                start_date=start_date,
+                end_date=end_date,
+                adjust=adjust
+            )
+            
+            if df is None or df.empty:
+                logger.warning(f"股票 {code} 未获取到数据")
+                return None
+            
+            daily = pd.DataFrame({
+                'date': pd.to_datetime(df['日期'], **_ISO_DATE_KWARGS).dt.date,
+                'open': df['开盘'],
+                'close': df['收盘'],
+                'high': df['最高'],
+                'low': df['最低'],
+                'volume': pd.to_numeric(df['成交量'], errors='coerce') * 100,
+                'amount': df['成交额'],
+                'turnover': pd.to_numeric(df['换手率'], errors='coerce') / 100
+            })
+            
+            logger.debug(f"成功获取股票 {code} {len(daily)} 条日线数据")
+            return daily
+            
+        except Exception as e:
+            logger.error(f"使用东方财富日线API获取股票 {code} 日线数据失败: {e}")
+            return None
+    
     def get_daily_quote_from_minute(
         self,
         code: str, 
@@ -179,7 +263,8 @@ class DailyQuoteService:
         """
         通过分时数据聚合获取日线数据（备选方案）
         
-        注意：此方法速度较慢，建议优先使用新浪API
+        注意：此方法每个交易日需拉取约240条分时数据，速度较慢，
+        仅在东方财富日线接口（get_daily_quote_em）失败时使用
         
         Args:
             code: 股票代码（6位数字）
@@ -192,7 +277,7 @@ class DailyQuoteService:
         """
         try:
             # 添加延迟控制
-            self._wait_for_rate_limit()
+            self._wait_for_rate_limit('em')
             
             logger.debug(f"使用东方财富分时API获取股票 {code} 日线数据: {start_date} 到 {end_date}")
             
@@ -209,26 +294,36 @@ class DailyQuoteService:
                 logger.warning(f"股票 {code} 未获取到分时数据")
                 return None
             
-            # 聚合为日线
-            df['日期'] = pd.to_datetime(df['时间']).dt.date
-            daily = df.groupby('日期').agg({
-                '开盘': 'first',
-                '收盘': 'last',
-                '最高': 'max',
-                '最低': 'min',
-                '成交量': 'sum',
-                '成交额': 'sum'
-            }).reset_index()
-            
-            # 重命名列
-            daily = daily.rename(columns={
-                '日期': 'date',
-                '开盘': 'open',
-                '收盘': 'close',
-                '最高': 'high',
-                '最低': 'low',
-                '成交量': 'volume',
-                '成交额': 'amount'
+            # 聚合为日线：分时数据按时间连续排列，先定位每天的起止下标，
+            # 再用 reduceat / 首尾下标直接求 OHLCV，不经过 groupby 的逐列分派
+            times = pd.to_datetime(df['时间'], **_ISO_DATE_KWARGS)
+            order = None if times.is_monotonic_increasing else np.argsort(times.to_numpy(), kind='stable')
+            
+            def column(name: str) -> np.ndarray:
+                values = pd.to_numeric(df[name]).to_numpy()
+                return values if order is None else values[order]
+            
+            day = times.to_numpy().astype('datetime64[D]')
+            if order is not None:
+                day = day[order]
+            starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+            ends = np.r_[starts[1:], len(day)] - 1
+            
+            def day_sum(values: np.ndarray) -> np.ndarray:
+                # 与 groupby sum 一致：缺失值按 0 计
+                if values.dtype.kind == 'f':
+                    values = np.nan_to_num(values)
+                return np.add.reduceat(values, starts)
+            
+            daily = pd.DataFrame({
+                'date': day[starts].astype(object),
+                'open': column('开盘')[starts],
+                'close': column('收盘')[ends],
+                # fmax/fmin 跳过缺失值，与 groupby max/min 一致
+                'high': np.fmax.reduceat(column('最高'), starts),
+                'low': np.fmin.reduceat(column('最低'), starts),
+                'volume': day_sum(column('成交量')),
+                'amount': day_sum(column('成交额'))
             })
             
             logger.debug(f"成功聚合股票 {code} {len(daily)} 条日线数据")
@@ -252,23 +347,29 @@ class DailyQuoteService:
         
         优化策略：
         1. 优先使用新浪API（包含完整字段，一次调用即可）
-        2. 如果新浪API失败，使用腾讯API（不包含成交量）
-        3. 只有在明确需要成交量且腾讯API成功时，才使用分时API补充
-        4. 避免一次更新调用多个API
+        2. 如果新浪API失败，使用东方财富日线API（包含成交量）
+        3. 仍然失败时使用腾讯API（不包含成交量）
+        4. use_minute=True 时直接走东方财富数据源：先用日线接口，失败才拉取分时数据聚合
+        5. 避免一次更新调用多个API
         
         Args:
             code: 股票代码
             start_date: 开始日期 (YYYYMMDD)
             end_date: 结束日期 (YYYYMMDD)
             adjust: 复权方式
-            use_minute: 是否强制使用分时API（用于获取成交量）
+            use_minute: 是否跳过新浪/腾讯，直接使用东方财富数据源获取成交量
+                        （日线接口优先，分时聚合兜底）
             use_sina: 是否优先使用新浪API（默认True，推荐）
             
         Returns:
             日线数据DataFrame
         """
         if use_minute:
-            # 强制使用分时API（可以获取成交量）
+            # 东方财富日线接口直接返回成交量，每个交易日一行；只有它失败时才拉取分时数据聚合
+            df = self.get_daily_quote_em(code, start_date, end_date, adjust)
+            if df is not None and not df.empty:
+                return df
+            logger.debug(f"股票 {code} 东方财富日线API获取失败，改用分时数据聚合")
             return self.get_daily_quote_from_minute(code, start_date, end_date, adjust)
         
         # 优先使用新浪API（包含成交量和更多字段，一次调用即可）
@@ -281,6 +382,12 @@ class DailyQuoteService:
             # 如果新浪API失败，记录日志但不立即尝试其他API
             logger.debug(f"股票 {code} 新浪API获取失败，尝试备选方案")
         
+        # 备选方案：使用东方财富日线API（包含成交量）
+        df = self.get_daily_quote_em(code, start_date, end_date, adjust)
+        if df is not None and not df.empty:
+            logger.debug(f"股票 {code} 使用东方财富日线API获取数据（包含成交量）")
+            return df
+        
         # 备选方案：使用腾讯API（不包含成交量，但速度快）
         df = self.get_daily_quote_tx(code, start_date, end_date, adjust)
         
@@ -311,48 +418,35 @@ class DailyQuoteService:
             return 0
         
         try:
-            params_list = []
-            for _, row in df.iterrows():
-                # 处理日期格式
-                trade_date = row.get('date')
-                if isinstance(trade_date, str):
-                    trade_date = datetime.strptime(trade_date, '%Y-%m-%d').date()
-                elif isinstance(trade_date, pd.Timestamp):
-                    trade_date = trade_date.date()
-                elif hasattr(trade_date, 'date'):
-                    trade_date = trade_date.date()
-                else:
-                    trade_date = pd.to_datetime(trade_date).date()
-                
-                # 提取数据
-                open_price = float(row.get('open', 0)) if pd.notna(row.get('open')) else None
-                high_price = float(row.get('high', 0)) if pd.notna(row.get('high')) else None
-                low_price = float(row.get('low', 0)) if pd.notna(row.get('low')) else None
-                close_price = float(row.get('close', 0)) if pd.notna(row.get('close')) else None
-                volume = int(row.get('volume', 0)) if pd.notna(row.get('volume')) else None
-                amount = float(row.get('amount', 0)) if pd.notna(row.get('amount')) else None
-                outstanding_share = int(row.get('outstanding_share', 0)) if pd.notna(row.get('outstanding_share')) else None
-                turnover = float(row.get('turnover', 0)) if pd.notna(row.get('turnover')) else None
-                
-                params_list.append((
-                    code,
-                    trade_date,
-                    open_price,
-                    high_price,
-                    low_price,
-                    close_price,
-                    volume,
-                    amount,
-                    outstanding_share,
-                    turnover
-                ))
+            # 整列转换类型，逐行只做元组打包
+            trade_dates = pd.to_datetime(df['date'], **_ISO_DATE_KWARGS).dt.date
+            # 同一日期出现多次时只保留最后一条：多行 INSERT ... ON CONFLICT 中
+            # 同一 (code, trade_date) 出现两次时 PostgreSQL 报 "cannot affect row a second time"
+            unique = ~trade_dates.duplicated(keep='last')
+            if not unique.all():
+                df = df[unique.to_numpy()]
+                trade_dates = trade_dates[unique]
+            params_list = list(zip(
+                itertools.repeat(code),
+                trade_dates.tolist(),
+                self._column_values(df, 'open'),
+                self._column_values(df, 'high'),
+                self._column_values(df, 'low'),
+                self._column_values(df, 'close'),
+                self._column_values(df, 'volume', integer=True),
+                self._column_values(df, 'amount'),
+                self._column_values(df, 'outstanding_share', integer=True),
+                self._column_values(df, 'turnover')
+            ))
             
             if not params_list:
                 return 0
             
-            affected_rows = db_manager.execute_many(
+            # 每批 INSERT_BATCH_SIZE 行拼成一条多行 INSERT，整只股票一次提交
+            affected_rows = db_manager.execute_values(
                 self.INSERT_DAILY_QUOTE_SQL,
-                params_list
+                params_list,
+                page_size=self.INSERT_BATCH_SIZE
             )
             
             logger.info(f"成功保存股票 {code} {affected_rows} 条日线数据")
@@ -362,6 +456,27 @@ class DailyQuoteService:
             logger.error(f"保存股票 {code} 日线数据失败: {e}", exc_info=True)
             raise
     
+    @staticmethod
+    def _column_values(df: pd.DataFrame, column: str, integer: bool = False) -> list:
+        """
+        将一列转换为可直接写入数据库的 Python 值列表
+        
+        Args:
+            df: 日线数据DataFrame
+            column: 列名（不存在时整列为None）
+            integer: 是否按整数写入（小数部分截断）
+            
+        Returns:
+            值列表，缺失或无法解析的值为None
+        """
+        if column not in df.columns:
+            return [None] * len(df)
+        
+        values = pd.to_numeric(df[column], errors='coerce').astype('float64')
+        if integer:
+            values = np.trunc(values).astype('Int64')
+        return values.astype(object).where(values.notna(), None).tolist()
+    
     def _get_stock_list_date(self, code: str) -> Optional[str]:
         """
         获取股票的上市日期
@@ -415,6 +530,40 @@ class DailyQuoteService:
             logger.error(f"查询股票 {code} 最新交易日期失败: {e}")
             return None
     
+    def get_last_trading_date(self, as_of: date) -> Optional[date]:
+        """
+        获取不晚于指定日期的最近交易日（读取本地交易日历表，按日期缓存）
+        
+        Args:
+            as_of: 日期
+            
+        Returns:
+            最近交易日；交易日历不可用或未覆盖该日期时返回None（调用方不据此跳过）
+        """
+        if as_of not in self._last_trading_dates:
+            self._last_trading_dates[as_of] = TradingCalendarService().get_last_trading_date(as_of)
+        return self._last_trading_dates[as_of]
+    
+    def get_latest_dates(self, codes: List[str]) -> Dict[str, str]:
+        """
+        批量获取多只股票最新的交易日期（一次查询）
+        
+        Args:
+            codes: 股票代码列表
+            
+        Returns:
+            字典，key为股票代码，value为最新交易日期（YYYY-MM-DD格式）；没有数据的股票不包含在内
+        """
+        if not codes:
+            return {}
+        
+        results = db_manager.execute_query(self.SELECT_LATEST_DATES_SQL, (list(codes),))
+        return {
+            row['code']: row['latest_date'].strftime('%Y-%m-%d')
+            for row in results
+            if row.get('latest_date')
+        }
+    
     def fetch_and_save(
         self,
         code: str,
@@ -422,7 +571,8 @@ class DailyQuoteService:
         end_date: Optional[str] = None,
             adjust: str = 'qfq',
             use_minute: bool = False,
-            use_sina: bool = True
+            use_sina: bool = True,
+            latest_dates: Optional[Dict[str, str]] = None
     ) -> bool:
         """
         获取并保存日线数据
@@ -436,6 +586,8 @@ class DailyQuoteService:
             adjust: 复权方式
             use_minute: 是否使用分时API（用于获取成交量）
             use_sina: 是否优先使用新浪API
+            latest_dates: 批量预查询的最新日期字典（见 get_latest_dates），
+                提供时直接查找，不再单独查询数据库
             
         Returns:
             是否成功
@@ -443,7 +595,10 @@ class DailyQuoteService:
         try:
             # 如果没有指定开始日期，从最新日期开始
             if start_date is None:
-                latest_date = self.get_latest_date(code)
+                if latest_dates is not None:
+                    latest_date = latest_dates.get(code)
+                else:
+                    latest_date = self.get_latest_date(code)
                 if latest_date:
                     # 从最新日期的下一天开始
                     latest_dt = datetime.strptime(latest_date, '%Y-%m-%d')
@@ -479,6 +634,12 @@ class DailyQuoteService:
                 logger.debug(f"股票 {code} 开始日期 {start_date} 是未来日期，跳过")
                 return True
             
+            # 日期范围内没有交易日（如周末、节假日已更新到上一交易日），不调用API
+            last_trading_date = self.get_last_trading_date(min(end_dt.date(), today))
+            if last_trading_date is not None and start_dt.date() > last_trading_date:
+                logger.debug(f"股票 {code} 日期范围 {start_date} 到 {end_date} 内没有交易日，跳过")
+                return True
+            
             # 获取数据
             df = self.get_daily_quote(code, start_date, end_date, adjust, use_minute, use_sina)
             
@@ -20,6 +20,7 @@ class ETFDailyService:
     def __init__(self):
         """初始化服务，加载 SQL 语句"""
         self.INSERT_DAILY_SQL = sql_manager.get_sql(etf_daily_sql, 'INSERT_DAILY')
+        self.INSERT_DAILY_BATCH_SQL = sql_manager.get_sql(etf_daily_sql, 'INSERT_DAILY_BATCH')
         self.SELECT_LATEST_DATE_SQL = sql_manager.get_sql(etf_daily_sql, 'SELECT_LATEST_DATE')
         self.SELECT_DAILY_DATA_SQL = sql_manager.get_sql(etf_daily_sql, 'SELECT_DAILY_DATA')
         self.COUNT_DAILY_SQL = sql_manager.get_sql(etf_daily_sql, 'COUNT_DAILY')
@@ -90,8 +91,8 @@ class ETFDailyService:
                 for data in data_list
             ]
             
-            affected_rows = db_manager.execute_many(
-                self.INSERT_DAILY_SQL,
+            affected_rows = db_manager.execute_values(
+                self.INSERT_DAILY_BATCH_SQL,
                 params_list
             )
             
@@ -100,9 +101,11 @@ class ETFDailyService:
             
         except Exception as e:
             # 如果批量插入失败，尝试逐条插入以定位问题
-            error_msg = str(e)
-            if 'duplicate key' in error_msg.lower() or 'unique constraint' in error_msg.lower():
-                logger.warning(f"批量插入遇到冲突，尝试逐条插入以定位问题: {error_msg}")
+            # 多行 VALUES 中同一 (code, trade_date) 出现两次时 PostgreSQL 报 "cannot affect row a second time"
+            error_msg = str(e).lower()
+            if ('duplicate key' in error_msg or 'unique constraint' in error_msg
+                    or 'cannot affect row a second time' in error_msg):
+                logger.warning(f"批量插入遇到冲突，尝试逐条插入以定位问题: {e}")
                 return self._insert_one_by_one(data_list)
             else:
                 logger.error(f"批量插入日线数据失败: {e}", exc_info=True)
@@ -4,12 +4,13 @@ AKShare 日线数据服务 SQL 查询语句
 提供 Supabase (PostgreSQL) 数据库的 SQL 语句。
 """
 
+# 多行插入：VALUES %s 由 execute_values 展开为 (code, trade_date, ...) 行列表
 INSERT_DAILY_QUOTE = """
     INSERT INTO stock_daily (
         code, trade_date, open_price, high_price, low_price, 
         close_price, volume, amount, outstanding_share, turnover
     )
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    VALUES %s
     ON CONFLICT (code, trade_date) DO UPDATE SET
         open_price = EXCLUDED.open_price,
         high_price = EXCLUDED.high_price,
@@ -26,3 +27,10 @@ SELECT_LATEST_DATE = """
     FROM stock_daily 
     WHERE code = %s
 """
+
+# 批量查询最新日期：每个代码一次 MAX 子查询，走 (code, trade_date) 唯一索引的反向扫描
+SELECT_LATEST_DATES = """
+    SELECT c.code,
+           (SELECT MAX(d.trade_date) FROM stock_daily d WHERE d.code = c.code) AS latest_date
+    FROM unnest(%s::varchar[]) AS c(code)
+"""
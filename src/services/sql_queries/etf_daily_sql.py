@@ -20,6 +20,23 @@ INSERT_DAILY = """
         turnover = EXCLUDED.turnover
 """
 
+# 批量写入使用单个 VALUES %s 占位符，由 execute_values 展开为多行 VALUES
+INSERT_DAILY_BATCH = """
+    INSERT INTO etf_daily (code, trade_date, open_price, high_price, low_price, 
+                          close_price, volume, amount, change_amount, change_rate, turnover)
+    VALUES %s
+    ON CONFLICT (code, trade_date) DO UPDATE SET
+        open_price = EXCLUDED.open_price,
+        high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price,
+        close_price = EXCLUDED.close_price,
+        volume = EXCLUDED.volume,
+        amount = EXCLUDED.amount,
+        change_amount = EXCLUDED.change_amount,
+        change_rate = EXCLUDED.change_rate,
+        turnover = EXCLUDED.turnover
+"""
+
 SELECT_LATEST_DATE = """
     SELECT MAX(trade_date) as latest_date 
     FROM etf_daily 
@@ -29,3 +29,36 @@ SELECT_STOCK = "SELECT * FROM stocks WHERE code = %s"
 SELECT_ALL_STOCKS = "SELECT * FROM stocks ORDER BY code"
 
 COUNT_STOCKS = "SELECT COUNT(*) as count FROM stocks"
+
+# 是否存在没有日线数据的股票：找到第一行即返回，健康状态（全部有日线）下无需做聚合
+EXISTS_STOCKS_WITHOUT_DAILY = "SELECT EXISTS (SELECT 1 FROM mv_stocks_without_daily)"
+
+# 没有日线数据的股票统计：读取物化视图 mv_stocks_without_daily（见 supabase/003_mv_stocks_without_daily.sql），
+# 同时按 总数 / 市场 / 企业性质 聚合；企业性质分组只返回数量最多的前 N 个（参数）
+# g_market、g_company_type 为 GROUPING() 标志，用于区分结果行属于哪个分组集
+# pct 为该分组占总数的百分比（同一分组集内求和作分母，在截取前N个之前计算）
+STATS_STOCKS_WITHOUT_DAILY = """
+    SELECT g_market, g_company_type, market, company_type, count, pct
+    FROM (
+        SELECT
+            GROUPING(market) AS g_market,
+            GROUPING(company_type) AS g_company_type,
+            COALESCE(market, '未知') AS market,
+            COALESCE(company_type, '未知') AS company_type,
+            COUNT(*) AS count,
+            (COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (
+                PARTITION BY GROUPING(market), GROUPING(company_type)
+            ))::float8 AS pct,
+            ROW_NUMBER() OVER (
+                PARTITION BY GROUPING(market), GROUPING(company_type)
+                ORDER BY COUNT(*) DESC
+            ) AS rn
+        FROM mv_stocks_without_daily
+        GROUP BY GROUPING SETS ((), (market), (company_type))
+    ) t
+    WHERE g_company_type = 1 OR rn <= %s
+    ORDER BY count DESC
+"""
+
+# 刷新物化视图（日线数据入库完成后调用；CONCURRENTLY 依赖 code 唯一索引，刷新期间不阻塞读取）
+REFRESH_STOCKS_WITHOUT_DAILY = "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_stocks_without_daily"
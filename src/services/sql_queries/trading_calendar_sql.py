@@ -21,3 +21,10 @@ SELECT_TRADING_DATE = """
     FROM trading_calendar 
     WHERE trade_date = %s
 """
+
+# 不晚于指定日期的最近交易日；同时返回日历中的最大日期，用于判断日历是否覆盖该日期
+SELECT_LAST_TRADING_DATE = """
+    SELECT MAX(trade_date) FILTER (WHERE trade_date <= %s) AS last_trading_date,
+           MAX(trade_date) AS latest_date
+    FROM trading_calendar
+"""
@@ -9,7 +9,7 @@ INSERT_DAILY_QUOTE = """
         code, trade_date, open_price, high_price, low_price, 
         close_price, volume, amount, outstanding_share, turnover
     )
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    VALUES %s
     ON CONFLICT (code, trade_date) DO UPDATE SET
         open_price = EXCLUDED.open_price,
         high_price = EXCLUDED.high_price,
@@ -26,3 +26,10 @@ SELECT_LATEST_DATE = """
     FROM stock_daily 
     WHERE code = %s
 """
+
+# 批量查询多只股票的最新交易日期（一次往返；每个代码走 (code, trade_date) 主键索引取最大值）
+SELECT_LATEST_DATES = """
+    SELECT c.code,
+           (SELECT MAX(d.trade_date) FROM stock_daily d WHERE d.code = c.code) AS latest_date
+    FROM unnest(%s::varchar[]) AS c(code)
+"""
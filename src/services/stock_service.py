@@ -23,6 +23,9 @@ class StockService:
         self.SELECT_STOCK_SQL = sql_manager.get_sql(stock_sql, 'SELECT_STOCK')
         self.SELECT_ALL_STOCKS_SQL = sql_manager.get_sql(stock_sql, 'SELECT_ALL_STOCKS')
         self.COUNT_STOCKS_SQL = sql_manager.get_sql(stock_sql, 'COUNT_STOCKS')
+        self.EXISTS_STOCKS_WITHOUT_DAILY_SQL = sql_manager.get_sql(stock_sql, 'EXISTS_STOCKS_WITHOUT_DAILY')
+        self.STATS_STOCKS_WITHOUT_DAILY_SQL = sql_manager.get_sql(stock_sql, 'STATS_STOCKS_WITHOUT_DAILY')
+        self.REFRESH_STOCKS_WITHOUT_DAILY_SQL = sql_manager.get_sql(stock_sql, 'REFRESH_STOCKS_WITHOUT_DAILY')
     
     def insert_stock(self, code: str, name: str, market: str, 
                      list_date: Optional[str] = None) -> bool:
@@ -134,6 +137,101 @@ class StockService:
             logger.error(f"统计股票数量失败: {e}")
             return 0
     
+    def get_stocks_without_daily_stats(self, company_type_limit: int = 10,
+                                       session=None) -> Dict[str, any]:
+        """
+        统计没有日线数据的股票（总数、按市场、按企业性质）
+        
+        数据来自物化视图 mv_stocks_without_daily，三种统计通过 GROUPING SETS
+        在一条 SQL 中完成；聚合前先做 EXISTS 探测，没有缺失股票时直接返回。
+        视图需在日线数据入库后调用 refresh_stocks_without_daily() 刷新。
+        
+        Args:
+            company_type_limit: 企业性质分布返回的分组数量（在SQL中截取）
+            session: db_manager.connection() 返回的会话，为 None 时单独取一个连接
+                （探测与统计共用）
+        
+        Returns:
+            统计结果字典：
+            - total_count: 没有日线数据的股票总数
+            - market_stats: [(market, count, pct)]，按数量降序，pct 为占总数的百分比
+            - company_type_stats: [(company_type, count, pct)]，按数量降序，最多 company_type_limit 个
+        """
+        if session is None:
+            # 探测与统计共用一个连接；该连接用完即关，PREPARE 无法复用，统计直接普通执行
+            with db_manager.connection() as own_session:
+                return self._collect_stocks_without_daily_stats(
+                    own_session, company_type_limit, prepare=False
+                )
+        return self._collect_stocks_without_daily_stats(
+            session, company_type_limit, prepare=True
+        )
+    
+    def _collect_stocks_without_daily_stats(self, session, company_type_limit: int,
+                                            prepare: bool) -> Dict[str, any]:
+        """
+        在给定会话中执行探测与统计查询
+        
+        Args:
+            session: db_manager.connection() 返回的会话
+            company_type_limit: 企业性质分布返回的分组数量
+            prepare: 是否以预备语句执行统计（调用方传入、可能复用的会话才值得 PREPARE）
+        
+        Returns:
+            统计结果字典，见 get_stocks_without_daily_stats()
+        """
+        stats = {
+            'total_count': 0,
+            'market_stats': [],
+            'company_type_stats': [],
+        }
+        
+        # 常见的健康状态：所有股票都有日线数据，探测到空视图即返回，跳过聚合
+        has_missing = session.execute_query_tuples(self.EXISTS_STOCKS_WITHOUT_DAILY_SQL)[0][0]
+        if not has_missing:
+            return stats
+        
+        # 结果已在SQL中按数量降序排列；行为元组，按列顺序直接解包
+        params = (company_type_limit,)
+        if prepare:
+            rows = session.execute_prepared(
+                'stocks_missing_stats', self.STATS_STOCKS_WITHOUT_DAILY_SQL, params
+            )
+        else:
+            rows = session.execute_query_tuples(self.STATS_STOCKS_WITHOUT_DAILY_SQL, params)
+        for g_market, g_company_type, market, company_type, count, pct in rows:
+            if g_market and g_company_type:
+                # 空分组集 ()：总数
+                stats['total_count'] = count
+            elif not g_market:
+                stats['market_stats'].append((market, count, pct))
+            else:
+                stats['company_type_stats'].append((company_type, count, pct))
+        
+        return stats
+    
+    def refresh_stocks_without_daily(self, session=None) -> bool:
+        """
+        刷新没有日线数据的股票物化视图
+        
+        Args:
+            session: db_manager.connection() 返回的会话，为 None 时单独取连接
+        
+        Returns:
+            是否成功
+        """
+        executor = session or db_manager
+        try:
+            executor.execute_update(self.REFRESH_STOCKS_WITHOUT_DAILY_SQL)
+            logger.info("已刷新物化视图 mv_stocks_without_daily")
+            return True
+        except Exception as e:
+            logger.error(f"刷新物化视图 mv_stocks_without_daily 失败: {e}")
+            if session is not None:
+                # 回滚失败的语句，会话中后续查询仍可继续执行
+                session.rollback()
+            return False
+    
     def update_company_info(self, code: str, company_type: Optional[str] = None,
                            actual_controller: Optional[str] = None,
                            direct_controller: Optional[str] = None,
@@ -4,7 +4,7 @@
 使用AKShare API获取A股交易日历并存储到数据库。
 """
 import logging
-from datetime import datetime
+from datetime import date
 from typing import List, Optional
 import pandas as pd
 
@@ -24,6 +24,7 @@ class TradingCalendarService:
         self.INSERT_TRADING_DATE_SQL = sql_manager.get_sql(trading_calendar_sql, 'INSERT_TRADING_DATE')
         self.SELECT_LATEST_DATE_SQL = sql_manager.get_sql(trading_calendar_sql, 'SELECT_LATEST_DATE')
         self.SELECT_TRADING_DATE_SQL = sql_manager.get_sql(trading_calendar_sql, 'SELECT_TRADING_DATE')
+        self.SELECT_LAST_TRADING_DATE_SQL = sql_manager.get_sql(trading_calendar_sql, 'SELECT_LAST_TRADING_DATE')
     
     def fetch_trading_calendar(self) -> Optional[pd.DataFrame]:
         """
@@ -85,6 +86,25 @@ class TradingCalendarService:
             logger.error(f"检查交易日失败: {e}", exc_info=True)
             return False
     
+    def get_last_trading_date(self, as_of: date) -> Optional[date]:
+        """
+        获取不晚于指定日期的最近交易日
+        
+        Args:
+            as_of: 日期
+            
+        Returns:
+            最近交易日；日历为空或未覆盖到该日期（日历过期）时返回None
+        """
+        try:
+            result = db_manager.execute_query(self.SELECT_LAST_TRADING_DATE_SQL, (as_of,))
+            if not result or not result[0].get('latest_date') or result[0]['latest_date'] < as_of:
+                return None
+            return result[0].get('last_trading_date')
+        except Exception as e:
+            logger.error(f"获取最近交易日失败: {e}", exc_info=True)
+            return None
+    
     def save_trading_calendar(self, df: pd.DataFrame, update_existing: bool = True) -> int:
         """
         保存交易日历到数据库
@@ -101,38 +121,17 @@ class TradingCalendarService:
             return 0
         
         try:
-            # 准备数据
-            records = []
-            for _, row in df.iterrows():
-                # 提取日期（AKShare返回的列名可能是'trade_date'）
-                trade_date = row.get('trade_date', None)
-                
-                # 处理日期格式
-                if trade_date is None:
-                    continue
-                
-                # 转换为字符串格式
-                if isinstance(trade_date, str):
-                    # 尝试解析日期字符串
-                    try:
-                        date_obj = datetime.strptime(trade_date, '%Y-%m-%d')
-                        trade_date_str = date_obj.strftime('%Y-%m-%d')
-                    except ValueError:
-                        # 尝试其他格式
-                        try:
-                            date_obj = datetime.strptime(trade_date, '%Y/%m/%d')
-                            trade_date_str = date_obj.strftime('%Y-%m-%d')
-                        except ValueError:
-                            logger.warning(f"无法解析日期格式: {trade_date}")
-                            continue
-                elif hasattr(trade_date, 'strftime'):
-                    # pandas Timestamp或datetime对象
-                    trade_date_str = trade_date.strftime('%Y-%m-%d')
-                else:
-                    logger.warning(f"未知的日期类型: {type(trade_date)}")
-                    continue
-                
-                records.append((trade_date_str,))
+            # 准备数据：整列解析日期（AKShare返回的列名可能是'trade_date'），
+            # 先按 YYYY-MM-DD 解析，失败的再按 YYYY/MM/DD 解析
+            trade_dates = df['trade_date'] if 'trade_date' in df.columns else pd.Series(None, index=df.index, dtype=object)
+            parsed = pd.to_datetime(trade_dates, format='%Y-%m-%d', errors='coerce')
+            parsed = parsed.fillna(pd.to_datetime(trade_dates, format='%Y/%m/%d', errors='coerce'))
+            
+            unparsed = parsed.isna() & trade_dates.notna()
+            if unparsed.any():
+                logger.warning(f"无法解析 {int(unparsed.sum())} 个日期，例如: {trade_dates[unparsed].iloc[0]}")
+            
+            records = [(trade_date_str,) for trade_date_str in parsed.dropna().dt.strftime('%Y-%m-%d')]
             
             if not records:
                 logger.warning("没有有效的交易日历数据")
@@ -4,8 +4,12 @@ Tushare日线数据服务模块
 提供使用Tushare获取日线行情数据并更新到数据库的功能。
 """
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Dict, Optional, List
+import numpy as np
 import pandas as pd
 
 from ..clients.tushare_client import get_tushare_client, TushareClient
@@ -15,6 +19,16 @@ from .sql_queries import tushare_daily_sql
 
 logger = logging.getLogger(__name__)
 
+# 日线数据的数值列（按 INSERT_DAILY_QUOTE 的参数顺序）及其中按整数写入的列
+_NUMERIC_COLUMNS = (
+    'open_price', 'high_price', 'low_price', 'close_price',
+    'volume', 'amount', 'outstanding_share', 'turnover'
+)
+_INTEGER_COLUMNS = frozenset(('volume', 'outstanding_share'))
+
+# 日期字符串按 ISO8601 走 C 解析快路径，不逐元素推断格式（pandas 2.0 起支持 format='ISO8601'）
+_ISO_DATE_KWARGS = {'format': 'ISO8601'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
 
 class TushareDailyService:
     """Tushare日线数据服务类"""
@@ -23,6 +37,7 @@ class TushareDailyService:
         """初始化服务，加载 SQL 语句"""
         self.INSERT_DAILY_QUOTE_SQL = sql_manager.get_sql(tushare_daily_sql, 'INSERT_DAILY_QUOTE')
         self.SELECT_LATEST_DATE_SQL = sql_manager.get_sql(tushare_daily_sql, 'SELECT_LATEST_DATE')
+        self.SELECT_LATEST_DATES_SQL = sql_manager.get_sql(tushare_daily_sql, 'SELECT_LATEST_DATES')
         """
         初始化服务
         
@@ -56,11 +71,32 @@ class TushareDailyService:
             logger.error(f"查询股票 {code} 最新交易日期失败: {e}")
             return None
     
+    def get_latest_dates(self, codes: List[str]) -> Dict[str, str]:
+        """
+        批量获取多只股票最新的交易日期（一次查询）
+        
+        Args:
+            codes: 股票代码列表
+            
+        Returns:
+            字典，key为股票代码，value为最新交易日期（YYYY-MM-DD格式）；没有数据的股票不包含在内
+        """
+        if not codes:
+            return {}
+        
+        results = db_manager.execute_query(self.SELECT_LATEST_DATES_SQL, (list(codes),))
+        return {
+            row['code']: row['latest_date'].strftime('%Y-%m-%d')
+            for row in results
+            if row.get('latest_date')
+        }
+    
     def fetch_daily_data(
         self,
         code: str,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        latest_dates: Optional[Dict[str, str]] = None
     ) -> Optional[pd.DataFrame]:
         """
         获取日线数据
@@ -69,6 +105,8 @@ class TushareDailyService:
             code: 股票代码（6位数字）
             start_date: 开始日期（YYYYMMDD格式），如果为None则从最新日期开始
             end_date: 结束日期（YYYYMMDD格式），如果为None则使用今天
+            latest_dates: 批量预查询的最新日期字典（见 get_latest_dates），
+                          提供时不再逐只查询数据库
             
         Returns:
             格式化后的日线数据DataFrame
@@ -76,7 +114,10 @@ class TushareDailyService:
         try:
             # 如果没有指定开始日期，从最新日期开始
             if start_date is None:
-                latest_date = self.get_latest_date(code)
+                if latest_dates is not None:
+                    latest_date = latest_dates.get(code)
+                else:
+                    latest_date = self.get_latest_date(code)
                 if latest_date:
                     # 从最新日期的下一天开始
                     latest_dt = datetime.strptime(latest_date, '%Y-%m-%d')
@@ -129,43 +170,30 @@ class TushareDailyService:
             return 0
         
         try:
-            params_list = []
-            for _, row in df.iterrows():
-                # 提取数据
-                trade_date = row.get('trade_date')
-                if isinstance(trade_date, str):
-                    trade_date = datetime.strptime(trade_date, '%Y-%m-%d').date()
-                elif hasattr(trade_date, 'date'):
-                    trade_date = trade_date.date()
+            # 先整列转换为写入数据库的 Python 值（缺失值为None），再用 itertuples 直接产出参数元组
+            clean = pd.DataFrame({
+                'code': code,
+                'trade_date': pd.to_datetime(df['trade_date'], **_ISO_DATE_KWARGS).dt.date
+            }, index=df.index)
+            for column in _NUMERIC_COLUMNS:
+                if column in df.columns:
+                    values = pd.to_numeric(df[column], errors='coerce').astype('float64')
                 else:
-                    trade_date = pd.to_datetime(trade_date).date()
-                
-                open_price = float(row.get('open_price', 0)) if pd.notna(row.get('open_price')) else None
-                high_price = float(row.get('high_price', 0)) if pd.notna(row.get('high_price')) else None
-                low_price = float(row.get('low_price', 0)) if pd.notna(row.get('low_price')) else None
-                close_price = float(row.get('close_price', 0)) if pd.notna(row.get('close_price')) else None
-                volume = int(row.get('volume', 0)) if pd.notna(row.get('volume')) else None
-                amount = float(row.get('amount', 0)) if pd.notna(row.get('amount')) else None
-                outstanding_share = int(row.get('outstanding_share', 0)) if pd.notna(row.get('outstanding_share')) else None
-                turnover = float(row.get('turnover', 0)) if pd.notna(row.get('turnover')) else None
-                
-                params_list.append((
-                    code,
-                    trade_date,
-                    open_price,
-                    high_price,
-                    low_price,
-                    close_price,
-                    volume,
-                    amount,
-                    outstanding_share,
-                    turnover
-                ))
+                    values = pd.Series(np.nan, index=df.index)
+                if column in _INTEGER_COLUMNS:
+                    values = np.trunc(values).astype('Int64')
+                clean[column] = values.astype(object).where(values.notna(), None)
+            
+            # 同一日期出现多次时只保留最后一条：多行 INSERT ... ON CONFLICT 中
+            # 同一 (code, trade_date) 出现两次时 PostgreSQL 报 "cannot affect row a second time"
+            clean = clean.drop_duplicates('trade_date', keep='last')
+            
+            params_list = list(clean.itertuples(index=False, name=None))
             
             if not params_list:
                 return 0
             
-            affected_rows = db_manager.execute_many(
+            affected_rows = db_manager.execute_values(
                 self.INSERT_DAILY_QUOTE_SQL,
                 params_list
             )
@@ -181,7 +209,8 @@ class TushareDailyService:
         self,
         code: str,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        latest_dates: Optional[Dict[str, str]] = None
     ) -> bool:
         """
         获取并保存日线数据
@@ -190,13 +219,14 @@ class TushareDailyService:
             code: 股票代码
             start_date: 开始日期（YYYYMMDD格式），如果为None则从最新日期开始
             end_date: 结束日期（YYYYMMDD格式），如果为None则使用今天
+            latest_dates: 批量预查询的最新日期字典（见 get_latest_dates）
             
         Returns:
             是否成功
         """
         try:
             # 获取数据
-            df = self.fetch_daily_data(code, start_date, end_date)
+            df = self.fetch_daily_data(code, start_date, end_date, latest_dates)
             
             if df is None or df.empty:
                 logger.warning(f"股票 {code} 未获取到数据")
@@ -222,22 +252,63 @@ class TushareDailyService:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         delay: float = 0.0,
-        failed_codes_file: Optional[str] = None
+        failed_codes_file: Optional[str] = None,
+        workers: int = 1
     ) -> dict:
         """
         批量更新多只股票的日线数据
         
+        workers > 1 时使用线程池并发更新：各线程共享同一个客户端，API调用间隔仍由客户端
+        的限流统一保证，并发只是让网络等待与数据库写入相互重叠。
+        
         Args:
             codes: 股票代码列表
             start_date: 开始日期（YYYYMMDD格式）
             end_date: 结束日期（YYYYMMDD格式）
             delay: 每次API调用之间的延迟（秒）
             failed_codes_file: 失败代码文件路径，如果提供则立即保存失败的代码
+            workers: 并发线程数，默认1（串行）
             
         Returns:
             统计信息字典，包含success_count, failed_count等
         """
-        import time
+        file_lock = threading.Lock()
+        
+        def record_failed(code: str) -> None:
+            """立即保存失败的代码到文件"""
+            if not failed_codes_file:
+                return
+            try:
+                with file_lock, open(failed_codes_file, 'a', encoding='utf-8') as f:
+                    f.write(f"{code}\n")
+            except Exception as save_err:
+                logger.warning(f"保存失败代码 {code} 到文件失败: {save_err}")
+        
+        # 未指定开始日期时，一次查询预取所有股票的最新日期，避免每只股票各查一次数据库
+        latest_dates = None
+        if start_date is None:
+            try:
+                latest_dates = self.get_latest_dates(codes)
+            except Exception as e:
+                logger.warning(f"批量查询最新日期失败，改为逐只查询: {e}")
+        
+        def update_one(code: str) -> bool:
+            """更新单只股票，返回是否成功"""
+            try:
+                success = self.fetch_and_save(code, start_date, end_date, latest_dates)
+                
+                # 添加延迟，避免API限流
+                # 注意：TushareClient内部已经有默认延迟（1.3秒），确保每分钟不超过50次
+                # 这里可以添加额外延迟以进一步降低调用频率
+                if delay > 0:
+                    time.sleep(delay)
+            except Exception as e:
+                logger.error(f"更新股票 {code} 失败: {e}")
+                success = False
+            
+            if not success:
+                record_failed(code)
+            return success
         
         success_count = 0
         failed_count = 0
@@ -245,44 +316,16 @@ class TushareDailyService:
         
         logger.info(f"开始批量更新 {len(codes)} 只股票的日线数据...")
         
-        for i, code in enumerate(codes, 1):
-            if i % 10 == 0:
-                logger.info(f"已处理 {i}/{len(codes)} 只股票...")
-            
-            try:
-                success = self.fetch_and_save(code, start_date, end_date)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for i, (code, success) in enumerate(zip(codes, executor.map(update_one, codes)), 1):
                 if success:
                     success_count += 1
                 else:
                     failed_count += 1
                     failed_codes.append(code)
-                    # 立即保存失败的代码到文件
-                    if failed_codes_file:
-                        try:
-                            with open(failed_codes_file, 'a', encoding='utf-8') as f:
-                                f.write(f"{code}\n")
-                        except Exception as save_err:
-                            logger.warning(f"保存失败代码 {code} 到文件失败: {save_err}")
                 
-                # 添加延迟，避免API限流
-                # 注意：TushareClient内部已经有默认延迟（1.3秒），确保每分钟不超过50次
-                # 这里可以添加额外延迟以进一步降低调用频率
-                if delay > 0 and i < len(codes):
-                    # 客户端已经有延迟，这里添加额外延迟
-                    time.sleep(delay)
-                    
-            except Exception as e:
-                logger.error(f"更新股票 {code} 失败: {e}")
-                failed_count += 1
-                failed_codes.append(code)
-                # 立即保存失败的代码到文件
-                if failed_codes_file:
-                    try:
-                        with open(failed_codes_file, 'a', encoding='utf-8') as f:
-                            f.write(f"{code}\n")
-                    except Exception as save_err:
-                        logger.warning(f"保存失败代码 {code} 到文件失败: {save_err}")
-                continue
+                if i % 10 == 0:
+                    logger.info(f"已处理 {i}/{len(codes)} 只股票...")
         
         result = {
             'total': len(codes),
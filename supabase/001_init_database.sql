@@ -31,6 +31,7 @@ COMMENT ON COLUMN stocks.created_at IS '创建时间';
 COMMENT ON COLUMN stocks.updated_at IS '更新时间';
 
 CREATE INDEX IF NOT EXISTS idx_stocks_market ON stocks(market);
+CREATE INDEX IF NOT EXISTS idx_stocks_market_code ON stocks(market, code);
 CREATE INDEX IF NOT EXISTS idx_stocks_name ON stocks(name);
 CREATE INDEX IF NOT EXISTS idx_stocks_company_type ON stocks(company_type);
 CREATE INDEX IF NOT EXISTS idx_stocks_actual_controller ON stocks(actual_controller);
@@ -383,3 +384,19 @@ CREATE TRIGGER update_etf_net_value_updated_at
     BEFORE UPDATE ON etf_net_value
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+-- ============================================
+-- 物化视图：没有日线数据的股票
+-- ============================================
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_stocks_without_daily AS
+WITH daily_codes AS (
+    SELECT DISTINCT code FROM stock_daily
+)
+SELECT s.code, s.market, s.company_type
+FROM stocks s
+LEFT JOIN daily_codes dc ON dc.code = s.code
+WHERE dc.code IS NULL;
+
+COMMENT ON MATERIALIZED VIEW mv_stocks_without_daily IS '没有日线数据的股票';
+
+CREATE UNIQUE INDEX IF NOT EXISTS uk_mv_stocks_without_daily_code ON mv_stocks_without_daily(code);
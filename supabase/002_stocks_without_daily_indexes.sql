@@ -0,0 +1,16 @@
+-- 索引补充脚本：加速“没有日线数据的股票”统计（src/scripts/query_stocks_without_daily_data.py）
+-- 创建时间: 2026-10-15
+-- 说明: 001_init_database.sql 已包含以下索引，此脚本用于已初始化的数据库，可重复执行
+
+-- stock_daily(code)：反连接构建 DISTINCT code 集合时可走 Index Only Scan
+CREATE INDEX IF NOT EXISTS idx_stock_daily_code ON stock_daily(code);
+
+-- stocks(market, code)：按市场分组时可直接从索引流式读取
+CREATE INDEX IF NOT EXISTS idx_stocks_market_code ON stocks(market, code);
+
+-- 刷新统计信息，便于规划器选择索引
+ANALYZE stock_daily;
+ANALYZE stocks;
+
+-- 验证（应看到 stock_daily 上的 Index Only Scan 而不是 Seq Scan）:
+-- EXPLAIN SELECT DISTINCT code FROM stock_daily;
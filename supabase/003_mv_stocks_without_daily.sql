@@ -0,0 +1,19 @@
+-- 物化视图：没有日线数据的股票（供 src/scripts/query_stocks_without_daily_data.py 统计使用）
+-- 创建时间: 2026-10-15
+-- 说明: 预先计算 stocks 与 stock_daily 的反连接结果，统计时只需扫描视图中的少量行。
+--       视图在日线数据批量更新完成后由 StockService.refresh_stocks_without_daily() 刷新，
+--       也可以手动执行: REFRESH MATERIALIZED VIEW CONCURRENTLY mv_stocks_without_daily;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_stocks_without_daily AS
+WITH daily_codes AS (
+    SELECT DISTINCT code FROM stock_daily
+)
+SELECT s.code, s.market, s.company_type
+FROM stocks s
+LEFT JOIN daily_codes dc ON dc.code = s.code
+WHERE dc.code IS NULL;
+
+COMMENT ON MATERIALIZED VIEW mv_stocks_without_daily IS '没有日线数据的股票';
+
+-- REFRESH ... CONCURRENTLY 需要唯一索引
+CREATE UNIQUE INDEX IF NOT EXISTS uk_mv_stocks_without_daily_code ON mv_stocks_without_daily(code);
@@ -0,0 +1,3 @@
+"""
+图表模块测试
+"""
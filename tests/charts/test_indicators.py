@@ -0,0 +1,142 @@
+"""
+技术指标计算测试
+
+以 talib 直接计算的结果为基准，校验 calculate_indicators 以及 numba 计算内核，
+包括数据点很少（n < 3，指标无法计算）和不足一个周期（参数自动调整）的情况。
+"""
+import unittest
+
+import numpy as np
+import pandas as pd
+import talib
+
+from src.charts import _indicators_nb
+from src.charts.indicators import (
+    BOLL_COLUMNS,
+    BOLL_DEV,
+    MACD_COLUMNS,
+    _boll_params,
+    _macd_params,
+    calculate_boll,
+    calculate_indicators,
+    calculate_macd,
+)
+
+
+def _make_close(n: int) -> pd.DataFrame:
+    """构造 n 个带波动的收盘价"""
+    rng = np.random.default_rng(n)
+    close = 10.0 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame({"close": close}, index=pd.bdate_range("2024-01-01", periods=n))
+
+
+def _talib_reference(close: np.ndarray, period: str = "D") -> dict:
+    """按 indicators 模块解析出的参数直接调用 talib 计算全部指标列"""
+    n = len(close)
+    _, macd_periods = _macd_params(period, n)
+    _, boll_period = _boll_params(period, n)
+    fast_period, slow_period, signal_period = macd_periods
+    ema_fast = talib.EMA(close, timeperiod=fast_period)
+    ema_slow = talib.EMA(close, timeperiod=slow_period)
+    dif = ema_fast - ema_slow
+    dea = talib.EMA(dif, timeperiod=signal_period)
+    upper, middle, lower = talib.BBANDS(
+        close, timeperiod=boll_period, nbdevup=BOLL_DEV, nbdevdn=BOLL_DEV, matype=0
+    )
+    return dict(zip(
+        MACD_COLUMNS + BOLL_COLUMNS,
+        (ema_fast, ema_slow, dif, dea, 2 * (dif - dea), upper, middle, lower),
+    ))
+
+
+class TestCalculateIndicators(unittest.TestCase):
+    """测试 calculate_indicators 与 talib 结果一致"""
+    
+    def assert_matches_talib(self, n: int):
+        """校验 n 个数据点时各指标列与 talib 基准一致"""
+        df = _make_close(n)
+        result = calculate_indicators(df)
+        expected = _talib_reference(df["close"].to_numpy(np.float64))
+        for column, values in expected.items():
+            np.testing.assert_allclose(
+                result[column].to_numpy(np.float64), values,
+                rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column
+            )
+    
+    def test_full_length(self):
+        """测试数据充足时（标准参数）"""
+        self.assert_matches_talib(250)
+    
+    def test_shorter_than_slow_period(self):
+        """测试不足一个慢线周期时（参数自动调整）"""
+        for n in (3, 5, 19, 25):
+            with self.subTest(n=n):
+                self.assert_matches_talib(n)
+    
+    def test_too_few_points(self):
+        """测试 n < 3 时指标列全部为 pd.NA"""
+        for n in (1, 2):
+            with self.subTest(n=n):
+                result = calculate_indicators(_make_close(n))
+                for column in MACD_COLUMNS + BOLL_COLUMNS:
+                    self.assertTrue(result[column].isna().all(), column)
+    
+    def test_matches_separate_calculations(self):
+        """测试与分别计算 MACD、BOLL 的结果一致"""
+        df = _make_close(60)
+        combined = calculate_indicators(df)
+        separate = calculate_boll(calculate_macd(df))
+        for column in MACD_COLUMNS + BOLL_COLUMNS:
+            np.testing.assert_allclose(
+                combined[column].to_numpy(np.float64), separate[column].to_numpy(np.float64),
+                rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column
+            )
+
+
+@unittest.skipUnless(_indicators_nb.NUMBA_AVAILABLE, "numba 未安装")
+class TestNumbaKernel(unittest.TestCase):
+    """测试 numba 计算内核与 talib 结果一致"""
+    
+    def test_compute_indicators(self):
+        """测试 compute_indicators 各输出列"""
+        for n in (3, 5, 25, 250):
+            with self.subTest(n=n):
+                close = _make_close(n)["close"].to_numpy(np.float64)
+                fast_period, slow_period, signal_period = _macd_params("D", n)[1]
+                boll_period = _boll_params("D", n)[1]
+                values = _indicators_nb.compute_indicators(
+                    close, fast_period, slow_period, signal_period, boll_period, BOLL_DEV
+                )
+                expected = _talib_reference(close)
+                for column, actual in zip(MACD_COLUMNS + BOLL_COLUMNS, values):
+                    np.testing.assert_allclose(
+                        actual, expected[column],
+                        rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column
+                    )
+    
+    def test_split_macd_and_any_valid(self):
+        """测试 split_macd / any_valid 与 numpy 实现一致"""
+        macd = np.array([np.nan, -1.5, 0.0, 2.0, np.nan, -0.5])
+        for actual, expected in zip(_indicators_nb._split_macd_nb(macd), _indicators_nb._split_macd_np(macd)):
+            np.testing.assert_array_equal(actual, expected)
+        for values in (macd, np.full(3, np.nan), np.empty(0)):
+            self.assertEqual(_indicators_nb._any_valid_nb(values), _indicators_nb._any_valid_np(values))
+
+
+class TestNumpyHelpers(unittest.TestCase):
+    """测试绘图用的 numpy 辅助函数"""
+    
+    def test_split_macd(self):
+        """测试正负两部分拆分，NaN 保持不变"""
+        positive, negative = _indicators_nb._split_macd_np(np.array([np.nan, -1.0, 0.0, 2.0]))
+        np.testing.assert_array_equal(positive, [np.nan, 0.0, 0.0, 2.0])
+        np.testing.assert_array_equal(negative, [np.nan, -1.0, 0.0, 0.0])
+    
+    def test_any_valid(self):
+        """测试全 NaN 与含有效值的数组"""
+        self.assertFalse(_indicators_nb._any_valid_np(np.full(3, np.nan)))
+        self.assertTrue(_indicators_nb._any_valid_np(np.array([np.nan, 1.0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
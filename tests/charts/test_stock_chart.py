@@ -0,0 +1,92 @@
+"""
+K线图生成测试
+
+测试数据很少（指标无法计算）时图表仍能正常生成。
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import matplotlib
+matplotlib.use("Agg")
+
+import pandas as pd
+
+from src.charts.stock_chart import StockChartGenerator
+
+
+def _make_daily(n: int) -> pd.DataFrame:
+    """构造 n 根日线数据"""
+    close = [10.0 + i for i in range(n)]
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": [c + 1 for c in close],
+            "low": [c - 1 for c in close],
+            "close": close,
+            "volume": [1000.0] * n,
+        },
+        index=pd.bdate_range("2024-01-01", periods=n),
+    )
+
+
+class TestShortSeries(unittest.TestCase):
+    """测试极短序列（指标列为 pd.NA）"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.generator = StockChartGenerator(chart_dir=self.tmpdir.name, image_format="png")
+    
+    def tearDown(self):
+        """清理临时目录"""
+        self.tmpdir.cleanup()
+    
+    def _generate(self, n: int) -> str:
+        """使用模拟数据源生成 n 根K线的图表"""
+        df = _make_daily(n)
+        with patch("src.charts.stock_chart.fetch_data_service") as service:
+            service.fetch_stock_data.return_value = df
+            service.get_stock_name_from_supabase.return_value = "C"
+            return self.generator.generate(
+                "C",
+                start_date=df.index[0].strftime("%Y-%m-%d"),
+                end_date=df.index[-1].strftime("%Y-%m-%d"),
+            )
+    
+    def test_generate_one_bar(self):
+        """测试1根K线"""
+        self.assertTrue(os.path.exists(self._generate(1)))
+    
+    def test_generate_two_bars(self):
+        """测试2根K线"""
+        self.assertTrue(os.path.exists(self._generate(2)))
+    
+    def test_generate_batch_with_short_series(self):
+        """测试批量生成时短序列与正常序列混合"""
+        frames = {"A": _make_daily(300), "B": _make_daily(2), "D": _make_daily(1)}
+        with patch("src.charts.stock_chart.fetch_data_service") as service:
+            service.fetch_stock_data.side_effect = lambda code, *args, **kwargs: frames[code]
+            service.get_stock_name_from_supabase.side_effect = lambda code: code
+            filepaths = self.generator.generate_batch([
+                {"stock_code": code, "start_date": "2024-01-01", "end_date": "2025-12-31"}
+                for code in ("B", "A", "B", "D")
+            ])
+        self.assertEqual(len(filepaths), 4)
+        for filepath in filepaths:
+            self.assertTrue(os.path.exists(filepath))
+    
+    def test_add_plots_skip_missing_indicators(self):
+        """测试指标为 pd.NA 时不添加BOLL和MACD"""
+        from src.charts.indicators import calculate_indicators
+        
+        df = calculate_indicators(_make_daily(2))
+        add_plots, has_boll, has_macd = self.generator._create_add_plots(df)
+        self.assertEqual(add_plots, [])
+        self.assertFalse(has_boll)
+        self.assertFalse(has_macd)
+
+
+if __name__ == "__main__":
+    unittest.main()
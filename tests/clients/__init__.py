@@ -0,0 +1,3 @@
+"""
+数据源客户端测试
+"""
@@ -0,0 +1,168 @@
+"""
+AKShare客户端解析测试
+
+用小的模拟数据表校验整列（向量化）解析的结果与原逐行解析一致：
+控制人数据（每只股票取最新记录）、股票列表、批量市值和股东信息。
+原逐行解析把缺失值输出为 NaN 或 "nan" 文本、非 YYYY-MM-DD 的日期原样保留，
+整列解析统一为 None 和 YYYY-MM-DD，测试中按后者断言。
+"""
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.clients.akshare_client import AKShareClient
+from src.core.cache_manager import clear_all_caches
+
+
+def _controller_frame() -> pd.DataFrame:
+    """构造控制人数据：包含重复代码、缺失的控制人和多种日期格式"""
+    return pd.DataFrame({
+        '证券代码': ['000001', '000001', '000002', '000001', '000003', '000004', '000005', '000006', '000002'],
+        '变动日期': ['2022-03-01', '2024/01/15', '2023-06-30', '2023-02-01', '2024-05-20',
+                   '2021-01-01', '2024-12-31 00:00:00', None, pd.Timestamp('2023-01-01')],
+        '实际控制人名称': ['甲', '深圳市人民政府国有资产监督管理委员会', np.nan, '乙', '无',
+                     np.nan, ' 张三 ', '王五', '丙'],
+        '直接控制人名称': ['A', '深圳投资控股有限公司', '某集团有限公司', 'B', np.nan,
+                     np.nan, np.nan, 'X公司', 'C'],
+        '控股比例': ['10%', '45.5%', np.nan, '20', '30.00', '5', 'abc', 12.5, '1'],
+        '控制类型': ['国有', '地方国资', np.nan, 'x', '民营', 'nan', '自然人', np.nan, 'y'],
+    })
+
+
+class TestParseAllControllerData(unittest.TestCase):
+    """测试控制人数据解析"""
+    
+    EXPECTED = {
+        '000001': {
+            'actual_controller': '深圳市人民政府国有资产监督管理委员会',
+            'direct_controller': '深圳投资控股有限公司',
+            'control_ratio': 45.5,
+            'control_type': '地方国资',
+            'change_date': '2024-01-15',
+        },
+        '000002': {
+            'actual_controller': None,
+            'direct_controller': '某集团有限公司',
+            'control_ratio': None,
+            'control_type': None,
+            'change_date': '2023-06-30',
+        },
+        '000005': {
+            'actual_controller': '张三',
+            'direct_controller': None,
+            'control_ratio': None,
+            'control_type': '自然人',
+            'change_date': '2024-12-31',
+        },
+        '000006': {
+            'actual_controller': '王五',
+            'direct_controller': 'X公司',
+            'control_ratio': 12.5,
+            'control_type': None,
+            'change_date': None,
+        },
+    }
+    
+    def test_latest_record_per_code(self):
+        """测试每只股票取变动日期最新的记录，没有任何控制人的股票不输出"""
+        self.assertEqual(AKShareClient.parse_all_controller_data(_controller_frame()), self.EXPECTED)
+    
+    def test_category_columns(self):
+        """测试文本列为分类类型时结果不变（get_all_controller_data 会转换）"""
+        df = _controller_frame()
+        for column in ('证券代码', '控制类型', '直接控制人名称'):
+            df[column] = df[column].astype('category')
+        self.assertEqual(AKShareClient.parse_all_controller_data(df), self.EXPECTED)
+    
+    def test_empty(self):
+        """测试空数据"""
+        self.assertEqual(AKShareClient.parse_all_controller_data(None), {})
+        self.assertEqual(AKShareClient.parse_all_controller_data(pd.DataFrame()), {})
+
+
+class TestBatchParsers(unittest.TestCase):
+    """测试股票列表、批量市值和股东信息的整列解析"""
+    
+    def setUp(self):
+        """清除缓存，确保每次都调用模拟接口"""
+        clear_all_caches()
+    
+    def tearDown(self):
+        """清除测试写入的缓存"""
+        clear_all_caches()
+    
+    def _call(self, api_name: str, df: pd.DataFrame, func, *args):
+        """模拟 AKShare 接口返回 df 后调用 func"""
+        with patch(f'src.clients.akshare_client.ak.{api_name}', return_value=df), \
+                patch('src.core.cache_manager._disk_cache') as disk_cache:
+            disk_cache.get.return_value = None
+            return func(*args)
+    
+    def test_get_stock_list(self):
+        """测试股票列表：去除空白、跳过代码或名称为空的行、按代码首位判断市场"""
+        df = pd.DataFrame({
+            'code': ['000001', ' 600000 ', '920001', '830001', '', '300001', np.nan, '500001'],
+            'name': ['平安银行', '浦发银行', 'X', 'Y', 'Z', ' ', 'W', 'V'],
+        })
+        stocks = self._call('stock_info_a_code_name', df, AKShareClient.get_stock_list)
+        self.assertEqual(
+            [(s['code'], s['name'], s['market']) for s in stocks],
+            [('000001', '平安银行', 'SZ'), ('600000', '浦发银行', 'SH'), ('920001', 'X', 'BJ'),
+             ('830001', 'Y', 'BJ'), ('500001', 'V', 'SZ')]
+        )
+    
+    def test_get_all_market_value(self):
+        """测试批量市值：解析带单位的数值，跳过无代码或市值全为0的行"""
+        df = pd.DataFrame({
+            '代码': ['000001', '600000', ' 920001 ', '', np.nan, '000002'],
+            '最新价': [10.5, np.nan, '3.2', 1, 1, 5],
+            '总市值': [1e10, 0, np.nan, 1, 1, 0],
+            '流通市值': [8e9, 5e9, '1.5亿', 1, 1, 0],
+            '总股本': [1e9, 2e9, np.nan, 1, 1, 1],
+            '流通股': [8e8, np.nan, 100.9, 1, 1, 1],
+        })
+        market_values = self._call('stock_zh_a_spot_em', df, AKShareClient.get_all_market_value)
+        self.assertEqual(market_values, [
+            {'code': '000001', 'total_market_cap': 1e10, 'circulating_market_cap': 8e9,
+             'price': 10.5, 'total_shares': 1000000000, 'circulating_shares': 800000000},
+            {'code': '600000', 'total_market_cap': 0.0, 'circulating_market_cap': 5e9,
+             'price': None, 'total_shares': 2000000000, 'circulating_shares': None},
+            {'code': '920001', 'total_market_cap': None, 'circulating_market_cap': 1.5,
+             'price': 3.2, 'total_shares': None, 'circulating_shares': 100},
+        ])
+        self.assertIsInstance(market_values[0]['total_shares'], int)
+    
+    def test_get_stock_shareholders(self):
+        """测试股东信息：跳过空名称，解析比例/数量/多种日期格式，判断股东类型"""
+        df = pd.DataFrame({
+            '股东名称': ['中国工商银行股份有限公司', '某某集团有限公司', '张三', np.nan, ' ', 'nan', '华夏基金', '李四'],
+            '持股比例': [10.5, '5.2%', np.nan, 1, 2, 3, 'abc', '0.5'],
+            '持股数量': [1000000, '2,000,000股', np.nan, 1, 2, 3, 1234.7, '300'],
+            '截至日期': ['2024-09-30', '2024/06/30', pd.Timestamp('2024-03-31'), '2024-09-30',
+                     None, None, '2024年12月31日', np.nan],
+            '公告日期': ['2024-10-30'] * 8,
+        })
+        shareholders = self._call(
+            'stock_main_stock_holder', df, AKShareClient.get_stock_shareholders, '000001'
+        )
+        self.assertEqual(
+            [(s['shareholder_name'], s['holding_ratio'], s['holding_amount'],
+              s['report_date'], s['shareholder_type']) for s in shareholders],
+            [
+                ('中国工商银行股份有限公司', 10.5, 1000000, '2024-09-30', '机构'),
+                ('某某集团有限公司', 5.2, 2000000, '2024-06-30', '法人'),
+                ('张三', None, None, '2024-03-31', '个人'),
+                ('华夏基金', None, 1234, '2024-12-31', '机构'),
+                ('李四', 0.5, 300, None, '个人'),
+            ]
+        )
+        for shareholder in shareholders:
+            self.assertEqual(shareholder['code'], '000001')
+            self.assertIsNone(shareholder['change_amount'])
+            self.assertIsNone(shareholder['change_ratio'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+核心模块测试
+"""
@@ -0,0 +1,152 @@
+"""
+缓存管理测试
+
+测试 TimedCache 的过期与容量淘汰、DiskCache 的过期与清理，以及 cached_api_call 的缓存行为。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from src.core import cache_manager
+from src.core.cache_manager import CACHE_MISS, DiskCache, TimedCache, cached_api_call
+
+
+class TestTimedCache(unittest.TestCase):
+    """测试内存缓存"""
+    
+    def test_get_and_expire(self):
+        """测试过期后返回 None 并删除条目"""
+        cache = TimedCache(default_ttl=60)
+        with patch('src.core.cache_manager.time.monotonic', return_value=1000.0):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=10)
+        with patch('src.core.cache_manager.time.monotonic', return_value=1030.0):
+            self.assertEqual(cache.get('a'), 1)
+            self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.size(), 1)
+    
+    def test_clear_expired(self):
+        """测试 clear_expired 只删除过期条目"""
+        cache = TimedCache(default_ttl=60)
+        with patch('src.core.cache_manager.time.monotonic', return_value=1000.0):
+            cache.set('a', 1)
+            cache.set('b', 2, ttl=10)
+            cache.set('c', 3, ttl=20)
+        with patch('src.core.cache_manager.time.monotonic', return_value=1030.0):
+            self.assertEqual(cache.clear_expired(), 2)
+            self.assertEqual(cache.get('a'), 1)
+    
+    def test_maxsize_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = TimedCache(default_ttl=60, maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.size(), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+
+class TestDiskCache(unittest.TestCase):
+    """测试磁盘缓存"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / 'cache.sqlite3'
+        self.cache = DiskCache(self.path)
+    
+    def tearDown(self):
+        """关闭连接并清理临时目录"""
+        if self.cache._conn is not None:
+            self.cache._conn.close()
+        self.tmpdir.cleanup()
+    
+    def test_get_and_expire(self):
+        """测试读取与过期：过期条目在读取时删除"""
+        self.cache.set('a', {'x': 1}, ttl=60)
+        self.cache.set('b', [1, 2], ttl=-1)
+        self.assertEqual(self.cache.get('a'), {'x': 1})
+        self.assertEqual(self.cache.size(), 2)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.size(), 1)
+        self.assertIsNone(self.cache.get('missing'))
+    
+    def test_clear_expired(self):
+        """测试 clear_expired 只删除过期条目"""
+        self.cache.set('a', 1, ttl=60)
+        self.cache.set('b', 2, ttl=-1)
+        self.cache.set('c', 3, ttl=-1)
+        self.assertEqual(self.cache.clear_expired(), 2)
+        self.assertEqual(self.cache.get('a'), 1)
+    
+    def test_expired_rows_removed_on_open(self):
+        """测试重新打开数据库时删除过期条目"""
+        self.cache.set('a', 1, ttl=60)
+        self.cache.set('b', 2, ttl=-1)
+        self.cache._conn.close()
+        self.cache = DiskCache(self.path)
+        self.assertEqual(self.cache.size(), 1)
+        self.assertEqual(self.cache.get('a'), 1)
+    
+    def test_version_prefix(self):
+        """测试版本号变化后旧缓存不再命中"""
+        self.cache.set('a', 1, ttl=60)
+        other = DiskCache(self.path, version=2)
+        try:
+            self.assertIsNone(other.get('a'))
+        finally:
+            other._conn.close()
+
+
+class TestCachedApiCall(unittest.TestCase):
+    """测试 cached_api_call 装饰器（仅内存缓存）"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.cache = TimedCache(default_ttl=60)
+        self.source = Mock(side_effect=lambda code: {'code': code} if code != 'none' else None)
+        self.source.__name__ = 'fetch'
+        self.fetch = cached_api_call(self.cache)(self.source)
+    
+    def test_hit_and_peek(self):
+        """测试第二次调用命中缓存，peek 不调用原函数"""
+        self.assertIs(self.fetch.peek('000001'), CACHE_MISS)
+        self.assertEqual(self.fetch('000001'), {'code': '000001'})
+        self.assertEqual(self.fetch('000001'), {'code': '000001'})
+        self.assertEqual(self.source.call_count, 1)
+        self.assertEqual(self.fetch.peek('000001'), {'code': '000001'})
+    
+    def test_none_not_cached(self):
+        """测试返回 None 时不缓存"""
+        self.assertIsNone(self.fetch('none'))
+        self.assertIsNone(self.fetch('none'))
+        self.assertEqual(self.source.call_count, 2)
+        self.assertEqual(self.cache.size(), 0)
+    
+    def test_empty_result_not_persisted(self):
+        """测试空结果只缓存在内存中，不写入磁盘缓存"""
+        fetch_list = Mock(side_effect=lambda code: [] if code == 'empty' else [code])
+        fetch_list.__name__ = 'fetch_list'
+        fetch_list = cached_api_call(self.cache, ttl=cache_manager.DISK_CACHE_MIN_TTL)(fetch_list)
+        with patch.object(cache_manager, '_disk_cache') as disk_cache:
+            disk_cache.get.return_value = None
+            self.assertEqual(fetch_list('empty'), [])
+            disk_cache.set.assert_not_called()
+            self.assertEqual(fetch_list('000003'), ['000003'])
+            disk_cache.set.assert_called_once()
+        self.assertEqual(fetch_list.peek('empty'), [])
+    
+    def test_short_ttl_skips_disk(self):
+        """测试 TTL 小于 DISK_CACHE_MIN_TTL 时不写入磁盘缓存"""
+        with patch.object(cache_manager, '_disk_cache') as disk_cache:
+            self.fetch('000002')
+        disk_cache.set.assert_not_called()
+        disk_cache.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+服务模块测试
+"""
@@ -0,0 +1,118 @@
+"""
+日线行情服务测试
+
+测试分时数据聚合为日线（get_daily_quote_from_minute）与 groupby 聚合结果一致，
+以及保存日线数据时对重复日期的处理。
+"""
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.services.akshare_daily_service import DailyQuoteService
+
+
+def _make_minutes(days, bars_per_day: int = 4) -> pd.DataFrame:
+    """构造若干交易日的1分钟分时数据（东方财富接口的列名，每天不超过30条）"""
+    rng = np.random.default_rng(0)
+    times = [f"{day} 09:{30 + i:02d}:00" for day in days for i in range(bars_per_day)]
+    n = len(times)
+    close = 10.0 + np.cumsum(rng.normal(0, 0.1, n))
+    return pd.DataFrame({
+        '时间': times,
+        '开盘': close - 0.05,
+        '收盘': close,
+        '最高': close + 0.1,
+        '最低': close - 0.1,
+        '成交量': rng.integers(100, 1000, n),
+        '成交额': rng.uniform(1e4, 1e5, n),
+    })
+
+
+def _groupby_reference(df: pd.DataFrame) -> pd.DataFrame:
+    """用 groupby 按日期聚合的基准结果"""
+    df = df.assign(date=pd.to_datetime(df['时间']).dt.date).sort_values('时间', kind='stable')
+    return df.groupby('date', sort=True).agg(
+        open=('开盘', 'first'),
+        close=('收盘', 'last'),
+        high=('最高', 'max'),
+        low=('最低', 'min'),
+        volume=('成交量', 'sum'),
+        amount=('成交额', 'sum'),
+    ).reset_index()
+
+
+class TestDailyQuoteFromMinute(unittest.TestCase):
+    """测试分时数据聚合为日线"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.service = DailyQuoteService(api_delay=0)
+    
+    def _aggregate(self, minutes: pd.DataFrame) -> pd.DataFrame:
+        """使用模拟的分时接口聚合日线"""
+        with patch('src.services.akshare_daily_service.ak.stock_zh_a_hist_min_em', return_value=minutes):
+            return self.service.get_daily_quote_from_minute('000001', '20240102', '20240105')
+    
+    def assert_matches_reference(self, minutes: pd.DataFrame):
+        """校验聚合结果与 groupby 基准一致"""
+        result = self._aggregate(minutes)
+        expected = _groupby_reference(minutes)
+        self.assertEqual(list(result['date']), list(expected['date']))
+        for column in ('open', 'close', 'high', 'low', 'volume', 'amount'):
+            np.testing.assert_allclose(
+                result[column].to_numpy(np.float64), expected[column].to_numpy(np.float64),
+                err_msg=column
+            )
+    
+    def test_sorted_minutes(self):
+        """测试按时间排列的分时数据"""
+        self.assert_matches_reference(_make_minutes(['2024-01-02', '2024-01-03', '2024-01-04']))
+    
+    def test_unsorted_minutes(self):
+        """测试乱序的分时数据"""
+        minutes = _make_minutes(['2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assert_matches_reference(minutes.sample(frac=1, random_state=1).reset_index(drop=True))
+    
+    def test_single_bar_days(self):
+        """测试每天只有一条分时数据"""
+        self.assert_matches_reference(_make_minutes(['2024-01-02', '2024-01-03'], bars_per_day=1))
+    
+    def test_missing_values(self):
+        """测试缺失值：最高/最低跳过缺失值，成交量/成交额按 0 计"""
+        minutes = _make_minutes(['2024-01-02', '2024-01-03'])
+        minutes.loc[1, '最高'] = np.nan
+        minutes.loc[5, '最低'] = np.nan
+        minutes.loc[2, '成交额'] = np.nan
+        self.assert_matches_reference(minutes)
+    
+    def test_empty_minutes(self):
+        """测试未获取到分时数据时返回 None"""
+        self.assertIsNone(self._aggregate(pd.DataFrame()))
+
+
+
+class TestSaveDailyQuote(unittest.TestCase):
+    """测试日线数据保存"""
+    
+    def test_duplicate_dates_keep_last(self):
+        """测试同一日期出现多次时只写入最后一条"""
+        df = pd.DataFrame({
+            'date': ['2024-01-02', '2024-01-03', '2024-01-02'],
+            'open': [1.0, 2.0, 3.0],
+            'high': [1.5, 2.5, 3.5],
+            'low': [0.5, 1.5, 2.5],
+            'close': [1.2, 2.2, 3.2],
+            'volume': [100, 200, 300],
+        })
+        with patch('src.services.akshare_daily_service.db_manager') as db:
+            db.execute_values.side_effect = lambda sql, params, page_size: len(params)
+            self.assertEqual(DailyQuoteService(api_delay=0).save_daily_quote('000001', df), 2)
+        params = db.execute_values.call_args[0][1]
+        self.assertEqual([(row[1].isoformat(), row[2]) for row in params],
+                         [('2024-01-03', 2.0), ('2024-01-02', 3.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Tushare日线数据服务测试
+
+测试保存日线数据时对重复日期的处理。
+"""
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from src.services.tushare_daily_service import TushareDailyService
+
+
+class TestSaveDailyData(unittest.TestCase):
+    """测试日线数据保存"""
+    
+    def test_duplicate_dates_keep_last(self):
+        """测试同一日期出现多次时只写入最后一条"""
+        df = pd.DataFrame({
+            'trade_date': ['2024-01-02', '2024-01-03', '2024-01-02'],
+            'open_price': [1.0, 2.0, 3.0],
+            'close_price': [1.2, 2.2, 3.2],
+            'volume': [100.0, 200.0, 300.0],
+        })
+        with patch('src.services.tushare_daily_service.db_manager') as db:
+            db.execute_values.side_effect = lambda sql, params: len(params)
+            service = TushareDailyService(client=Mock())
+            self.assertEqual(service.save_daily_data('000001', df), 2)
+        params = db.execute_values.call_args[0][1]
+        self.assertEqual([(row[1].isoformat(), row[2], row[6]) for row in params],
+                         [('2024-01-03', 2.0, 200), ('2024-01-02', 3.0, 300)])
+
+
+if __name__ == "__main__":
+    unittest.main()